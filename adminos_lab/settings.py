@@ -63,6 +63,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "registers.replicas.replica_stickiness_middleware",
+    "registers.transactions.sqlite_write_lock_middleware",
 ]
 
 ROOT_URLCONF = "adminos_lab.urls"
@@ -96,6 +98,14 @@ DATABASES = {
 }
 DATABASES["default"].setdefault("ATOMIC_REQUESTS", True)
 
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    # Seconds a writer waits for the lock. Write requests take it when their
+    # transaction begins; see registers.transactions.
+    DATABASES["default"].setdefault(
+        "OPTIONS", {"timeout": env.int("SQLITE_BUSY_TIMEOUT", default=20)}
+    )
+    DATABASES["default"].setdefault("TEST", {"NAME": str(BASE_DIR / "test_db.sqlite3")})
+
 if DATABASES["default"]["ENGINE"].endswith("postgresql"):
     DATABASES["default"].setdefault("CONN_MAX_AGE", env.int("POSTGRES_CONN_MAX_AGE", default=60))
     DATABASES["default"].setdefault(
@@ -103,6 +113,31 @@ if DATABASES["default"]["ENGINE"].endswith("postgresql"):
         {"connect_timeout": env.int("POSTGRES_CONNECT_TIMEOUT", default=5)},
     )
 
+# Optional read replica for read-only views (see registers.replicas). Point it
+# at a second SQLite file to try the routing locally, e.g.
+# DATABASE_REPLICA_URL=sqlite:///db.replica.sqlite3 after migrating it with
+# ``manage.py migrate --database replica``.
+DATABASE_READ_REPLICA = ""
+if env("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    for key in ("OPTIONS", "CONN_MAX_AGE"):
+        if key in DATABASES["default"]:
+            DATABASES["replica"].setdefault(key, DATABASES["default"][key])
+    # A real replica cannot host a test database, so tests mirror the primary.
+    DATABASES["replica"].setdefault("TEST", {"MIRROR": "default"})
+    DATABASE_READ_REPLICA = "replica"
+
+DATABASE_ROUTERS = ["registers.replicas.ReplicaRouter"]
+# Seconds a client's reads stay on the primary after it writes.
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", default=15)
+
+# ---------------------------------------------------------------------------
+# Cache configuration
+# ---------------------------------------------------------------------------
+# Response cache invalidation counters live here, so use a shared backend
+# such as redis://127.0.0.1:6379/1 when running more than one process.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 # ---------------------------------------------------------------------------
 # Password validation
 # ---------------------------------------------------------------------------
@@ -139,6 +174,21 @@ STATICFILES_DIRS = [_project_path("static")]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = _project_path(env("DJANGO_MEDIA_ROOT", default="media"))
 
+CHUNKED_UPLOAD_ROOT = _project_path(env("DJANGO_CHUNKED_UPLOAD_ROOT", default=".tmp/uploads"))
+# Largest file, in bytes, a resumable upload session may declare.
+CHUNKED_UPLOAD_MAX_SIZE = env.int("DJANGO_CHUNKED_UPLOAD_MAX_SIZE", default=2 * 1024**3)
+# Document blobs are deleted only by ``collect_blobs``, which skips any blob
+# touched in the last BLOB_GC_GRACE seconds so in-flight uploads keep theirs.
+BLOB_GC_GRACE = env.int("BLOB_GC_GRACE", default=24 * 60 * 60)
+
+# Hand document downloads to the front proxy: "nginx" sends X-Accel-Redirect
+# (pointing at an internal location that aliases MEDIA_ROOT), "sendfile" sends
+# X-Sendfile. Leave empty to stream files from Django.
+DOCUMENT_DOWNLOAD_ACCEL = env("DJANGO_DOCUMENT_DOWNLOAD_ACCEL", default="")
+DOCUMENT_ACCEL_REDIRECT_PREFIX = env(
+    "DJANGO_DOCUMENT_ACCEL_REDIRECT_PREFIX", default="/protected-media/"
+)
+
 BACKUP_ROOT = _project_path(env("DJANGO_BACKUP_ROOT", default="backups"))
 BACKUP_DATABASE_DIR = _project_path(
     env("DJANGO_BACKUP_DATABASE_DIR", default=str(BACKUP_ROOT / "database"))
@@ -153,6 +203,80 @@ WEASYPRINT_BASEURL = env(
 )
 WEASYPRINT_TEMP_DIR = _project_path(env("WEASYPRINT_TEMP_DIR", default=".tmp/weasyprint"))
 REPORTLAB_TEMP_DIR = _project_path(env("REPORTLAB_TEMP_DIR", default=".tmp/reportlab"))
+# Threads reserved for PDF rendering so it never runs on the ASGI event loop.
+PDF_RENDER_WORKERS = env.int("PDF_RENDER_WORKERS", default=2)
+# Admission control: requests beyond PDF_RENDER_WORKERS wait in a queue of
+# PDF_RENDER_QUEUE for up to PDF_RENDER_QUEUE_TIMEOUT seconds, then get a 503
+# with Retry-After. PDF_RENDER_GLOBAL_SLOTS caps renders across all workers
+# on the host through lock files in PDF_RENDER_LOCK_DIR; 0 disables it.
+PDF_RENDER_QUEUE = env.int("PDF_RENDER_QUEUE", default=4)
+PDF_RENDER_QUEUE_TIMEOUT = env.float("PDF_RENDER_QUEUE_TIMEOUT", default=2.0)
+PDF_RENDER_GLOBAL_SLOTS = env.int("PDF_RENDER_GLOBAL_SLOTS", default=0)
+PDF_RENDER_LOCK_DIR = _project_path(env("PDF_RENDER_LOCK_DIR", default=".tmp/pdf-slots"))
+PDF_RENDER_RETRY_AFTER = env.int("PDF_RENDER_RETRY_AFTER", default=5)
+
+# ---------------------------------------------------------------------------
+# Batch endpoint
+# ---------------------------------------------------------------------------
+# Largest number of operations accepted by /batch/ in one request.
+BATCH_MAX_OPERATIONS = env.int("BATCH_MAX_OPERATIONS", default=100)
+
+# ---------------------------------------------------------------------------
+# Idempotency keys
+# ---------------------------------------------------------------------------
+# Seconds a response stored for an Idempotency-Key is replayed. Run
+# ``purge_idempotency_keys`` periodically to delete older records.
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60)
+
+# ---------------------------------------------------------------------------
+# Delta sync
+# ---------------------------------------------------------------------------
+# /sync/ holds back rows changed in the last SYNC_SAFETY_LAG seconds so slow
+# transactions and replica lag cannot slip behind a client's cursor. Keep it
+# above both. Tombstones older than SYNC_TOMBSTONE_DAYS are purged by
+# ``purge_sync_tombstones``; clients with older cursors must sync afresh.
+SYNC_SAFETY_LAG = env.int("SYNC_SAFETY_LAG", default=5)
+SYNC_TOMBSTONE_DAYS = env.int("SYNC_TOMBSTONE_DAYS", default=90)
+
+# ---------------------------------------------------------------------------
+# Reminder event stream
+# ---------------------------------------------------------------------------
+# Seconds between the shared poller's checks for reminders falling due, and
+# between keep-alive comments on idle streams.
+REMINDER_STREAM_INTERVAL = env.float("REMINDER_STREAM_INTERVAL", default=5.0)
+REMINDER_STREAM_HEARTBEAT = env.float("REMINDER_STREAM_HEARTBEAT", default=15.0)
+# Each poll looks this many seconds behind the previous one so reminders from
+# transactions that commit late are still pushed. Keep it above the longest
+# write transaction.
+REMINDER_STREAM_SAFETY_LAG = env.float("REMINDER_STREAM_SAFETY_LAG", default=5.0)
+
+# ---------------------------------------------------------------------------
+# Reminder delivery
+# ---------------------------------------------------------------------------
+# ``dispatch_reminders`` hands due reminders to REMINDER_BACKEND. The default
+# emails REMINDER_RECIPIENTS and refuses to run while that list is empty.
+# With DEBUG on, the file email backend writes messages to EMAIL_FILE_PATH
+# instead of sending them; otherwise they go out over SMTP.
+REMINDER_BACKEND = env("REMINDER_BACKEND", default="registers.reminders.EmailReminderBackend")
+REMINDER_RECIPIENTS = env.list("REMINDER_RECIPIENTS", default=[])
+# Seconds after which a reminder claimed by a dispatch run that never finished
+# (e.g. a crashed worker) is claimed again.
+REMINDER_CLAIM_TIMEOUT = env.int("REMINDER_CLAIM_TIMEOUT", default=15 * 60)
+EMAIL_BACKEND = env(
+    "DJANGO_EMAIL_BACKEND",
+    default=(
+        "django.core.mail.backends.filebased.EmailBackend"
+        if DEBUG
+        else "django.core.mail.backends.smtp.EmailBackend"
+    ),
+)
+EMAIL_FILE_PATH = _project_path(env("DJANGO_EMAIL_FILE_PATH", default=".tmp/emails"))
+EMAIL_HOST = env("DJANGO_EMAIL_HOST", default="localhost")
+EMAIL_PORT = env.int("DJANGO_EMAIL_PORT", default=25)
+EMAIL_HOST_USER = env("DJANGO_EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = env("DJANGO_EMAIL_HOST_PASSWORD", default="")
+EMAIL_USE_TLS = env.bool("DJANGO_EMAIL_USE_TLS", default=False)
+DEFAULT_FROM_EMAIL = env("DJANGO_DEFAULT_FROM_EMAIL", default="registers@localhost")
 
 # ---------------------------------------------------------------------------
 # Default primary key field type
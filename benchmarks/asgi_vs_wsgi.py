@@ -0,0 +1,204 @@
+"""Compare request concurrency of the WSGI and ASGI handlers in-process.
+
+The WSGI side mimics a threaded worker (one thread per in-flight request),
+the ASGI side drives the handler from a single event loop the way uvicorn
+does. Both run against a throwaway test database seeded with registers,
+schedule entries and reminders, so no server or network is involved.
+
+Usage::
+
+    python benchmarks/asgi_vs_wsgi.py --requests 200 --concurrency 1 8 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from registers.models import Register, Reminder, ScheduleEntry  # noqa: E402
+
+ENDPOINTS = {
+    "bundles": ("registers:bundle-list-create", ""),
+    "search": ("registers:search", "query=register"),
+    "reminders": ("registers:pending-reminders", ""),
+    "health": ("registers:health", ""),
+}
+
+
+def _seed(registers: int) -> None:
+    today = timezone.now().date()
+    created = Register.objects.bulk_create(
+        Register(name=f"Register {index:04d}") for index in range(registers)
+    )
+    ScheduleEntry.objects.bulk_create(
+        ScheduleEntry(
+            register=register,
+            bundle_type=ScheduleEntry.BUNDLE_CHOICES[offset % 3][0],
+            scheduled_for=today - timedelta(days=offset),
+        )
+        for register in created
+        for offset in range(5)
+    )
+    Reminder.objects.bulk_create(
+        Reminder(
+            register=register,
+            remind_at=timezone.now() + timedelta(days=1),
+            message=f"Review {register.name}",
+        )
+        for register in created[:100]
+    )
+
+
+def _wsgi_call(app, path: str) -> float:
+    route, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": route,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+    }
+    def start_response(status, headers):
+        if not status.startswith("200"):
+            raise RuntimeError(f"{path} returned {status}")
+
+    start = time.perf_counter()
+    response = app(environ, start_response)
+    b"".join(response)
+    response.close()
+    return time.perf_counter() - start
+
+
+def run_wsgi(path: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    app = get_wsgi_application()
+
+    def worker(_):
+        try:
+            return _wsgi_call(app, path)
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(worker, range(total)))
+    return time.perf_counter() - start, latencies
+
+
+async def _asgi_call(app, path: str) -> float:
+    route, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": route,
+        "raw_path": route.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+    pending = [{"type": "http.request", "body": b"", "more_body": False}]
+    finished = asyncio.Event()
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Django listens for a disconnect until the response is sent.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+
+    start = time.perf_counter()
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return time.perf_counter() - start
+
+
+async def run_asgi(path: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    app = get_asgi_application()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def worker():
+        async with gate:
+            return await _asgi_call(app, path)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(worker() for _ in range(total)))
+    return time.perf_counter() - start, list(latencies)
+
+
+def _report(label: str, elapsed: float, latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return (
+        f"{label:<6} {len(latencies) / elapsed:>9.1f} req/s"
+        f"  p50 {statistics.median(ordered) * 1000:>7.2f} ms"
+        f"  p95 {p95 * 1000:>7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--registers", type=int, default=500)
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS)
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        _seed(args.registers)
+        for endpoint in args.endpoints:
+            name, query = ENDPOINTS[endpoint]
+            path = f"{reverse(name)}?{query}" if query else reverse(name)
+            for concurrency in args.concurrency:
+                wsgi = run_wsgi(path, args.requests, concurrency)
+                asgi = asyncio.run(run_asgi(path, args.requests, concurrency))
+                print(f"{endpoint} @ concurrency {concurrency}")
+                print("  " + _report("wsgi", *wsgi))
+                print("  " + _report("asgi", *asgi))
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
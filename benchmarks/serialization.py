@@ -0,0 +1,114 @@
+"""Compare model-instance and projection serialization of list responses.
+
+For each row count the schedule entry list is built twice: once the old
+way (``select_related`` model instances, a dict per entry, ``JsonResponse``)
+and once through :data:`registers.views.SCHEDULE_ENTRY_LIST` and
+:func:`registers.serializers.json_response`. Both run against a throwaway
+test database, so timings include the query as well as the encoding.
+
+Usage::
+
+    python benchmarks/serialization.py --rows 50 1000 10000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, connections  # noqa: E402
+from django.http import JsonResponse  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from registers.models import Register, ScheduleEntry  # noqa: E402
+from registers.serializers import json_response  # noqa: E402
+from registers.views import SCHEDULE_ENTRY_LIST  # noqa: E402
+
+
+def _seed(rows: int) -> None:
+    today = timezone.now().date()
+    registers = Register.objects.bulk_create(
+        Register(name=f"Register {index:04d}") for index in range(100)
+    )
+    ScheduleEntry.objects.bulk_create(
+        (
+            ScheduleEntry(
+                register=registers[index % len(registers)],
+                bundle_type=ScheduleEntry.BUNDLE_CHOICES[index % 3][0],
+                scheduled_for=today - timedelta(days=index % 365),
+                completed=index % 2 == 0,
+            )
+            for index in range(rows)
+        ),
+        batch_size=1000,
+    )
+
+
+def with_instances(limit: int) -> bytes:
+    qs = ScheduleEntry.objects.select_related("register").order_by("-scheduled_for")[:limit]
+    data = [
+        {
+            "id": entry.id,
+            "register": entry.register.name,
+            "bundle_type": entry.bundle_type,
+            "scheduled_for": entry.scheduled_for.isoformat(),
+            "completed": entry.completed,
+        }
+        for entry in qs
+    ]
+    return JsonResponse({"results": data}).content
+
+
+def with_projection(limit: int) -> bytes:
+    qs = ScheduleEntry.objects.order_by("-scheduled_for")[:limit]
+    return json_response({"results": SCHEDULE_ENTRY_LIST.rows(qs)}).content
+
+
+def _time(function, limit: int, repeat: int) -> float:
+    function(limit)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(limit)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        _seed(max(args.rows))
+        print(f"{'rows':>7} {'instances':>11} {'projection':>11} {'speed-up':>9}")
+        for rows in args.rows:
+            instances = _time(with_instances, rows, args.repeat)
+            projection = _time(with_projection, rows, args.repeat)
+            print(
+                f"{rows:>7} {instances:>8.2f} ms {projection:>8.2f} ms "
+                f"{instances / projection:>8.1f}x"
+            )
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
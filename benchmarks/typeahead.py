@@ -0,0 +1,92 @@
+"""Measure typeahead latency of the in-process trigram index.
+
+Builds :class:`registers.typeahead.TrigramIndex` over synthetic register
+names (parish, record type, year and a serial number) and times lookups for
+misspelled and partially typed names drawn from the same vocabulary. The
+PostgreSQL path is served by the ``pg_trgm`` GIN index instead; check it with
+``EXPLAIN ANALYZE`` on a copy of production data.
+
+Usage::
+
+    python benchmarks/typeahead.py --registers 100000 --queries 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from registers.typeahead import TrigramIndex  # noqa: E402
+
+PARISHES = (
+    "Ashford Barnham Carlton Dunmore Eastwick Fenwick Glenholm Harrowby Ingleby Kelmscott "
+    "Langford Marston Norbury Oakham Pembury Quarrington Rothbury Stanwick Thornbury Upwell"
+).split()
+RECORDS = "Baptisms Births Burials Marriages Banns Confirmations Census Tithes".split()
+
+
+def _names(count: int, rng: random.Random) -> list[str]:
+    return [
+        f"{rng.choice(PARISHES)} {rng.choice(RECORDS)} {rng.randint(1700, 1950)} "
+        f"vol {index}"
+        for index in range(count)
+    ]
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(text) - 1)
+    return text[:position] + text[position + 1 :]
+
+
+def _queries(names: list[str], count: int, rng: random.Random) -> list[str]:
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        if rng.random() < 0.5:
+            queries.append(_typo(name.rsplit(" vol ", 1)[0], rng))
+        else:
+            queries.append(name[: rng.randint(3, 12)])
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registers", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = _names(args.registers, rng)
+    started = time.perf_counter()
+    index = TrigramIndex(enumerate(names, start=1))
+    print(f"built index of {len(index)} names in {time.perf_counter() - started:.2f}s")
+
+    timings = []
+    for query in _queries(names, args.queries, rng):
+        started = time.perf_counter()
+        index.search(query, args.limit)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f"{len(timings)} lookups: p50 {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "registers.replicas.replica_stickiness_middleware",
+    "registers.transactions.sqlite_write_lock_middleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -77,9 +79,23 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "OPTIONS": {"timeout": 20},
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    },
+    # A second SQLite file standing in for a read replica. Reads only go
+    # there when DATABASE_READ_REPLICA names it.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.replica.sqlite3",
+        "OPTIONS": {"timeout": 20},
+        "TEST": {"NAME": BASE_DIR / "test_db_replica.sqlite3"},
+    },
 }
 
+DATABASE_ROUTERS = ["registers.replicas.ReplicaRouter"]
+DATABASE_READ_REPLICA = ""
+REPLICA_STICKY_SECONDS = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
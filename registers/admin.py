@@ -1,7 +1,60 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
 
 from . import models
 
+# Below this many rows an exact COUNT(*) is cheap and estimates are too rough.
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+
+def estimated_row_count(model, using: str = "default") -> int | None:
+    """Row count from the planner statistics, or ``None`` when unavailable."""
+
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                    [connection.ops.quote_name(table)],
+                )
+            elif connection.vendor == "sqlite":
+                # Populated by ANALYZE; the first number of each stat is the row count.
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            else:
+                return None
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    counts = [int(str(stat).split()[0]) for (stat,) in rows if stat is not None]
+    # PostgreSQL reports -1 for tables that were never analysed.
+    estimate = max(counts, default=-1)
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use planner statistics instead of COUNT(*) for unfiltered changelists."""
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables with millions of rows."""
+
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) shown as "N total".
+    show_full_result_count = False
+
 
 @admin.register(models.Register)
 class RegisterAdmin(admin.ModelAdmin):
@@ -11,7 +64,7 @@ class RegisterAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.ScheduleEntry)
-class ScheduleEntryAdmin(admin.ModelAdmin):
+class ScheduleEntryAdmin(LargeTableAdmin):
     list_display = (
         "register",
         "bundle_type",
@@ -19,13 +72,38 @@ class ScheduleEntryAdmin(admin.ModelAdmin):
         "completed",
         "created_at",
     )
-    list_filter = ("bundle_type", "completed", "scheduled_for")
-    search_fields = ("register__name", "notes")
+    list_filter = ("bundle_type", "completed")
+    list_select_related = ("register",)
+    date_hierarchy = "scheduled_for"
+    autocomplete_fields = ("register", "recurrence_rule")
+    # Register names match by prefix, which the UPPER(name) pattern index
+    # serves on PostgreSQL; notes stay searchable as before.
+    search_fields = ("^register__name", "notes")
+
+
+@admin.register(models.RecurrenceRule)
+class RecurrenceRuleAdmin(admin.ModelAdmin):
+    list_display = (
+        "register",
+        "bundle_type",
+        "frequency",
+        "starts_on",
+        "ends_on",
+        "materialized_through",
+        "is_active",
+    )
+    list_filter = ("frequency", "bundle_type", "is_active")
+    list_select_related = ("register",)
+    autocomplete_fields = ("register",)
+    search_fields = ("register__name",)
+    readonly_fields = ("materialized_through",)
 
 
 @admin.register(models.Reminder)
 class ReminderAdmin(admin.ModelAdmin):
     list_display = ("register", "schedule_entry", "remind_at", "is_sent")
+    list_select_related = ("register",)
+    autocomplete_fields = ("register", "schedule_entry")
     list_filter = ("is_sent", "remind_at")
     search_fields = ("register__name", "message")
 
@@ -40,12 +118,32 @@ class DocumentVersionInline(admin.TabularInline):
 @admin.register(models.Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ("title", "register", "created_at", "updated_at")
+    list_select_related = ("register",)
+    autocomplete_fields = ("register",)
     search_fields = ("title", "register__name")
     inlines = [DocumentVersionInline]
 
 
 @admin.register(models.ActivityLog)
-class ActivityLogAdmin(admin.ModelAdmin):
+class ActivityLogAdmin(LargeTableAdmin):
     list_display = ("register", "action", "user", "created_at")
-    list_filter = ("action", "created_at")
-    search_fields = ("register__name", "details")
+    list_filter = ("action",)
+    list_select_related = ("register", "user")
+    date_hierarchy = "created_at"
+    autocomplete_fields = ("register", "schedule_entry", "user")
+    search_fields = ("^register__name", "details")
+
+
+@admin.register(models.PreviewJob)
+class PreviewJobAdmin(admin.ModelAdmin):
+    list_display = ("version", "status", "attempts", "updated_at")
+    list_filter = ("status",)
+    readonly_fields = ("version", "attempts", "error")
+
+
+@admin.register(models.UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("filename", "document", "received", "total_size", "completed_at", "created_at")
+    list_filter = ("completed_at",)
+    search_fields = ("filename", "document__title")
+    readonly_fields = ("token", "received", "sha256", "version", "completed_at")
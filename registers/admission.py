@@ -0,0 +1,185 @@
+"""Admission control for expensive renders such as register PDFs.
+
+An :class:`AdmissionLimiter` admits at most ``process_slots`` renders per
+process and, when ``global_slots`` is set, at most that many across every
+process sharing ``lock_dir``. Cross-process slots are ``flock`` locks on
+numbered files, so the kernel frees the slot of a worker that dies
+mid-render. Requests beyond the limits wait in a short queue for up to
+``wait`` seconds; when the queue is full or the wait runs out they are
+rejected straight away so the caller can answer 503 instead of piling up.
+
+Counters of admitted and rejected requests are also kept in the cache,
+which gives totals across processes when the cache is shared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any
+
+from django.core.cache import cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+KEY_PREFIX = "registers:admission"
+POLL_INTERVAL = 0.05
+
+
+class Rejected(Exception):
+    """No render slot became free in time."""
+
+
+class AdmissionLimiter:
+    def __init__(
+        self,
+        name: str,
+        *,
+        process_slots: int,
+        queue: int,
+        wait: float,
+        global_slots: int = 0,
+        lock_dir: str | Path | None = None,
+    ) -> None:
+        if global_slots and (fcntl is None or lock_dir is None):
+            raise ValueError("Cross-process slots need flock support and a lock directory.")
+        self.name = name
+        self.process_slots = process_slots
+        self.queue = queue
+        self.wait = wait
+        self.global_slots = global_slots
+        self.lock_dir = Path(lock_dir) if lock_dir else None
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self) -> IO[bytes] | None:
+        """Take a slot, blocking for at most :attr:`wait` seconds.
+
+        Returns the locked slot file when cross-process slots are enabled;
+        pass it back to :meth:`release`. Raises :class:`Rejected` otherwise.
+        """
+
+        deadline = time.monotonic() + self.wait
+        if not self._acquire_local(deadline):
+            self._reject()
+        try:
+            slot = self._acquire_global(deadline) if self.global_slots else None
+        except BaseException:
+            self._release_local()
+            raise
+        if self.global_slots and slot is None:
+            self._release_local()
+            self._reject()
+
+        with self._condition:
+            self.admitted += 1
+        self._count("admitted")
+        return slot
+
+    async def aacquire(self) -> IO[bytes] | None:
+        """:meth:`acquire` from async code, waiting on a worker thread.
+
+        If the caller is cancelled while waiting, a slot obtained afterwards
+        is released instead of leaking.
+        """
+
+        future = asyncio.get_running_loop().run_in_executor(None, self.acquire)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._release_abandoned)
+            raise
+
+    def release(self, slot: IO[bytes] | None) -> None:
+        if slot is not None:
+            fcntl.flock(slot, fcntl.LOCK_UN)
+            slot.close()
+        self._release_local()
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            process = {
+                "active": self.active,
+                "queued": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+        return {
+            "process_slots": self.process_slots,
+            "global_slots": self.global_slots,
+            "queue": self.queue,
+            "process": process,
+            "admitted_total": cache.get(self._key("admitted"), 0),
+            "rejected_total": cache.get(self._key("rejected"), 0),
+        }
+
+    def _acquire_local(self, deadline: float) -> bool:
+        with self._condition:
+            if self.active >= self.process_slots:
+                if self.waiting >= self.queue:
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self.active < self.process_slots,
+                        timeout=deadline - time.monotonic(),
+                    )
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    return False
+            self.active += 1
+            return True
+
+    def _acquire_global(self, deadline: float) -> IO[bytes] | None:
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        # Start at a different slot in each process to spread contention.
+        first = os.getpid() % self.global_slots
+        while True:
+            for offset in range(self.global_slots):
+                index = (first + offset) % self.global_slots
+                handle = open(self.lock_dir / f"{self.name}-{index}.lock", "ab")
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    handle.close()
+                    continue
+                return handle
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def _release_abandoned(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.release(future.result())
+
+    def _release_local(self) -> None:
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def _reject(self) -> None:
+        with self._condition:
+            self.rejected += 1
+        self._count("rejected")
+        raise Rejected(self.name)
+
+    def _key(self, counter: str) -> str:
+        return f"{KEY_PREFIX}:{self.name}:{counter}"
+
+    def _count(self, counter: str) -> None:
+        key = self._key(counter)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, None):
+                cache.incr(key)
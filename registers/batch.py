@@ -0,0 +1,133 @@
+"""Run several API writes from one HTTP request.
+
+Each operation is resolved against the URLconf and handed to the existing
+view as an in-process sub-request that shares the caller's user, session
+and headers, so validation and side effects are exactly those of the
+individual endpoints. All operations run in one transaction: normally
+each gets its own savepoint, so a failing operation is rolled back alone;
+in atomic mode the first failure rolls back the whole batch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404, HttpRequest, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("POST", "PUT", "PATCH", "DELETE")
+SHARED_ATTRIBUTES = ("user", "auser", "session", "_messages")
+
+
+class BatchFailed(Exception):
+    """An operation of an atomic batch failed; carries the results so far."""
+
+    def __init__(self, results: list[dict[str, Any]]) -> None:
+        super().__init__(f"Operation {len(results) - 1} failed")
+        self.results = results
+
+
+def not_batchable(view):
+    """Keep ``view`` out of batches, e.g. the batch endpoint itself."""
+
+    view.batch_forbidden = True
+    return view
+
+
+def _sub_request(parent: HttpRequest, operation: dict[str, Any]) -> HttpRequest:
+    method, url = operation["method"], urlsplit(operation["path"])
+    body = operation.get("body")
+    data = json.dumps(body if body is not None else {}).encode("utf-8")
+    request = HttpRequest()
+    request.method = method
+    request.path = request.path_info = url.path
+    request.GET = QueryDict(url.query)
+    request.COOKIES = parent.COOKIES
+    request.META = {
+        **parent.META,
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(data)),
+    }
+    # The batch's own key must not be reused by every operation in it.
+    request.META.pop("HTTP_IDEMPOTENCY_KEY", None)
+    if operation.get("idempotency_key"):
+        request.META["HTTP_IDEMPOTENCY_KEY"] = operation["idempotency_key"]
+    request.content_type, request.content_params = "application/json", {}
+    request._body = data
+    for name in SHARED_ATTRIBUTES:
+        if hasattr(parent, name):
+            setattr(request, name, getattr(parent, name))
+    return request
+
+
+def _dispatch(parent: HttpRequest, operation: dict[str, Any]) -> HttpResponse:
+    path = operation["path"]
+    try:
+        match = resolve(urlsplit(path).path, getattr(parent, "urlconf", None))
+    except Resolver404:
+        raise Http404(f"No endpoint at {path}") from None
+    if getattr(match.func, "batch_forbidden", False):
+        raise PermissionDenied("This endpoint cannot be used inside a batch.")
+
+    request = _sub_request(parent, operation)
+    request.resolver_match = match
+    if iscoroutinefunction(match.func):
+        return async_to_sync(match.func)(request, *match.args, **match.kwargs)
+    return match.func(request, *match.args, **match.kwargs)
+
+
+def _run(parent: HttpRequest, operation: dict[str, Any]) -> dict[str, Any]:
+    try:
+        response = _dispatch(parent, operation)
+    except Http404 as exc:
+        return {"status": 404, "body": {"errors": {"path": [str(exc)]}}}
+    except PermissionDenied as exc:
+        return {"status": 403, "body": {"errors": {"path": [str(exc) or "Forbidden"]}}}
+    except Exception:
+        logger.exception("Batch operation %s %s failed", operation["method"], operation["path"])
+        return {"status": 500, "body": {"errors": {"operation": ["Internal error."]}}}
+
+    if response.streaming:
+        errors = {"path": ["Streaming responses cannot be batched."]}
+        return {"status": 400, "body": {"errors": errors}}
+    body = None
+    if response.get("Content-Type", "").startswith("application/json") and response.content:
+        body = json.loads(response.content)
+    return {"status": response.status_code, "body": body}
+
+
+def run_batch(
+    request: HttpRequest, operations: list[dict[str, Any]], *, atomic: bool = False
+) -> list[dict[str, Any]]:
+    """Run ``operations`` in order and return one result per operation.
+
+    Raises :class:`BatchFailed` in atomic mode once an operation fails,
+    after rolling back everything the batch wrote.
+    """
+
+    results: list[dict[str, Any]] = []
+    with transaction.atomic():
+        for operation in operations:
+            with transaction.atomic():
+                result = _run(request, operation)
+                failed = result["status"] >= 400
+                if failed:
+                    transaction.set_rollback(True)
+            results.append(result)
+            if failed and atomic:
+                transaction.set_rollback(True)
+                break
+    if atomic and results and results[-1]["status"] >= 400:
+        raise BatchFailed(results)
+    return results
@@ -0,0 +1,179 @@
+"""Generation-keyed response caching for read-mostly JSON endpoints.
+
+Each register has a generation counter, plus one counter covering all
+registers. Writes bump the counters (see :mod:`registers.signals`) and cache
+keys embed the current generation, so a write makes every dependent entry
+unreachable at once without having to find and delete it. The schedule
+entry list filtered with ``?register=`` is keyed on that register's counter;
+search and reminders span all registers and use the shared one. Hit and miss
+counters per endpoint are kept in the same cache for monitoring.
+
+Generations live in the configured cache, so multi-process deployments need
+a shared backend (``CACHE_URL``) for invalidation to reach every worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import wraps
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+
+from .replicas import current_read_alias
+
+ALL_REGISTERS = "all"
+KEY_PREFIX = "registers:response-cache"
+DEFAULT_TIMEOUT = 300
+
+# Endpoints decorated with cached_response, for the stats endpoint.
+CACHED_ENDPOINTS: list[str] = []
+
+
+def _generation_key(scope: str | int) -> str:
+    return f"{KEY_PREFIX}:generation:{scope}"
+
+
+def _stat_key(endpoint: str, outcome: str) -> str:
+    return f"{KEY_PREFIX}:stats:{endpoint}:{outcome}"
+
+
+def _seed() -> int:
+    # Seed from the clock so a counter evicted from the cache never restarts
+    # at a value that older entries were stored under.
+    return time.time_ns() // 1000
+
+
+def _bump(scopes: Iterable[str | int]) -> None:
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, _seed(), None):
+                cache.incr(key)
+
+
+def bump_generations(register_ids: Iterable[int] = ()) -> None:
+    """Invalidate cached responses for the given registers and all-register listings.
+
+    Counters are bumped immediately and again once the transaction commits:
+    a reader that raced the write and cached pre-commit data under the
+    intermediate generation is then superseded as well.
+    """
+
+    scopes = [ALL_REGISTERS, *{register_id for register_id in register_ids if register_id}]
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_after_bulk_write(register_ids: Iterable[int] = ()) -> None:
+    """Invalidate cached responses after a write that bypassed model signals.
+
+    ``bulk_create`` and ``QuerySet.update`` send no ``post_save``, so the
+    handlers in :mod:`registers.signals` never see those rows. Code that
+    writes that way calls this with the registers whose rows it touched;
+    with none, only the all-register listings are invalidated, which is
+    enough for registers that did not exist before.
+    """
+
+    bump_generations(register_ids)
+
+
+def _current_generation(scope: str | int) -> int:
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _seed(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _record(endpoint: str, outcome: str) -> None:
+    key = _stat_key(endpoint, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    stats = {}
+    for endpoint in CACHED_ENDPOINTS:
+        hits = cache.get(_stat_key(endpoint, "hit"), 0)
+        misses = cache.get(_stat_key(endpoint, "miss"), 0)
+        total = hits + misses
+        stats[endpoint] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def all_registers(request: HttpRequest) -> str:
+    """Scope of views whose responses can change with a write to any register."""
+
+    return ALL_REGISTERS
+
+
+def register_scope(request: HttpRequest) -> str | int:
+    """Scope of views that ``?register=`` restricts to a single register."""
+
+    try:
+        return int(request.GET["register"])
+    except (KeyError, ValueError):
+        return ALL_REGISTERS
+
+
+def cached_response(
+    endpoint: str,
+    *,
+    scope: Callable[[HttpRequest], str | int],
+    timeout: int = DEFAULT_TIMEOUT,
+):
+    """Cache successful GET responses of a view by generation.
+
+    ``scope`` maps a request to the generation counter its response depends
+    on: :func:`all_registers`, or the id of the one register a view really
+    restricts its results to. The wrapper is synchronous so that async
+    endpoints can run the cache lookups and their queries in one thread hop.
+    """
+
+    CACHED_ENDPOINTS.append(endpoint)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+
+            request_scope = scope(request)
+            generation = _current_generation(request_scope)
+            query = hashlib.sha256(request.GET.urlencode().encode()).hexdigest()
+            # A copy read from a lagging replica must not reach pinned clients.
+            alias = current_read_alias()
+            key = f"{KEY_PREFIX}:{endpoint}:{alias}:{request_scope}:{generation}:{query}"
+
+            cached = cache.get(key)
+            if cached is not None:
+                _record(endpoint, "hit")
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _record(endpoint, "miss")
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response["Content-Type"]), timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
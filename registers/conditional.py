@@ -0,0 +1,65 @@
+"""Conditional GET for JSON list endpoints.
+
+Every model carries ``updated_at``, so the newest timestamp together with the
+row count of a filtered queryset changes whenever any row in it is created,
+edited or deleted. Hashing those aggregates into an ETag lets clients
+revalidate a list with a single aggregate query, and an unchanged list is
+answered with ``304 Not Modified`` before the body is built.
+
+Only an ETag is sent: a deletion lowers the count without moving the newest
+timestamp, so ``Last-Modified`` alone would let ``If-Modified-Since`` clients
+keep a stale list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+from typing import Any, Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+
+Validator = Callable[..., dict[str, Any] | None]
+
+
+def list_etag(request: HttpRequest, values: dict[str, Any]) -> str:
+    """Weak ETag over the aggregates and the query string that produced them."""
+
+    parts = [request.GET.urlencode()]
+    parts.extend(f"{key}={values[key]!r}" for key in sorted(values))
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def conditional_list(validator: Validator):
+    """Answer GET and HEAD requests with 304 when the list has not changed.
+
+    ``validator`` is called with the view's arguments and returns the
+    aggregates describing the list, or ``None`` when the request cannot be
+    validated (e.g. invalid filters), in which case the view runs as usual.
+    Both run synchronously; async endpoints call the decorated view in one
+    ``sync_to_async`` hop.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            values = validator(request, *args, **kwargs)
+            if values is None:
+                return view(request, *args, **kwargs)
+
+            etag = list_etag(request, values)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304) and not response.has_header("ETag"):
+                response["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,114 @@
+"""Helpers for serving document files efficiently.
+
+Large scans are either handed to the front proxy (``X-Accel-Redirect`` for
+nginx, ``X-Sendfile`` for Apache/lighttpd) or streamed from disk, with
+single-range ``Range`` requests answered as ``206 Partial Content``.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import re
+from typing import BinaryIO, Iterator
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import DocumentVersion
+
+RANGE_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested byte range lies outside the file."""
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return the inclusive ``(start, end)`` of a single-range header.
+
+    ``None`` means the header should be ignored and the full file served,
+    which is what RFC 9110 allows for malformed or multi-range requests.
+    """
+
+    match = _RANGE_RE.match(header.replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+def _iter_range(handle: BinaryIO, start: int, length: int) -> Iterator[bytes]:
+    with handle:
+        handle.seek(start)
+        remaining = length
+        while remaining:
+            block = handle.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def _content_type(version: DocumentVersion) -> str:
+    return mimetypes.guess_type(version.filename)[0] or "application/octet-stream"
+
+
+def accelerated_response(version: DocumentVersion, mode: str) -> HttpResponse:
+    """Delegate the transfer to the front proxy; it also handles ``Range``."""
+
+    response = HttpResponse(content_type=_content_type(version))
+    if mode == "nginx":
+        prefix = getattr(settings, "DOCUMENT_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{version.file.name}"
+    else:
+        response["X-Sendfile"] = version.file.path
+    response["Content-Disposition"] = content_disposition_header(True, version.filename)
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def file_response(version: DocumentVersion, range_header: str = "") -> HttpResponse:
+    """Serve the file from disk, honouring a single byte range."""
+
+    size = version.file.size
+    try:
+        byte_range = parse_range(range_header, size) if range_header else None
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            version.file.open("rb"),
+            as_attachment=True,
+            filename=version.filename,
+            content_type=_content_type(version),
+        )
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(version.file.open("rb"), start, length),
+            status=206,
+            content_type=_content_type(version),
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = content_disposition_header(True, version.filename)
+    response["Accept-Ranges"] = "bytes"
+    return response
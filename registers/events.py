@@ -0,0 +1,216 @@
+"""Server-sent events for reminders, fed by a single poller per process.
+
+Every open stream subscribes to one :class:`ReminderBroadcaster`, which
+queries the database once per tick no matter how many clients are
+connected and fans the results out to per-client queues. On PostgreSQL the
+poller also ``LISTEN``s for notifications sent when reminders are saved, so
+new reminders are pushed immediately instead of on the next tick.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "registers_reminders"
+UPCOMING_WINDOW = timedelta(days=7)
+# Longest pause, in seconds, between attempts to LISTEN after failures.
+MAX_LISTEN_BACKOFF = 300.0
+
+
+def fetch_reminder_events(since: datetime, until: datetime) -> list[dict[str, Any]]:
+    """Reminders created, or falling due, in the half-open window ``(since, until]``."""
+
+    reminders = (
+        Reminder.objects.filter(is_sent=False)
+        .filter(
+            Q(created_at__gt=since, created_at__lte=until, remind_at__lte=until + UPCOMING_WINDOW)
+            | Q(remind_at__gt=since, remind_at__lte=until)
+        )
+        .select_related("register")
+        .order_by("remind_at")
+    )
+    return [
+        {
+            "event": "due" if reminder.remind_at <= until else "created",
+            "id": reminder.id,
+            "register": reminder.register.name,
+            "remind_at": reminder.remind_at.isoformat(),
+            "message": reminder.message,
+        }
+        for reminder in reminders
+    ]
+
+
+def format_event(event: dict[str, Any]) -> str:
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+
+
+def notify_reminder_saved(reminder_id: int) -> None:
+    """Wake PostgreSQL listeners; other databases rely on the poll interval."""
+
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, str(reminder_id)])
+
+
+class _LoopChannel:
+    """Subscribers and poller of one event loop; queues and tasks are tied to it."""
+
+    def __init__(self) -> None:
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+        self.listener = None
+        # Failed LISTEN attempts in a row, and the loop time of the next one.
+        self.listen_failures = 0
+        self.listen_retry_at = 0.0
+
+
+class ReminderBroadcaster:
+    """Share one reminder poller between every stream in this process.
+
+    Each poll looks back over ``REMINDER_STREAM_SAFETY_LAG`` seconds, because
+    a reminder whose transaction commits late carries a ``created_at`` the
+    previous poll has already passed; events sent within that window are
+    remembered so they are not pushed twice.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float | None = None,
+        safety_lag: float | None = None,
+        queue_size: int = 100,
+        fetch: Callable[[datetime, datetime], list[dict[str, Any]]] = fetch_reminder_events,
+    ) -> None:
+        self.interval = interval
+        self.safety_lag = safety_lag
+        self.queue_size = queue_size
+        self._fetch = sync_to_async(fetch)
+        self._channels: WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopChannel] = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(channel.subscribers) for channel in list(self._channels.values()))
+
+    def subscribe(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        channel = self._channels.get(loop)
+        if channel is None:
+            # Streams on another loop (e.g. a test client's) get their own poller.
+            channel = self._channels[loop] = _LoopChannel()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        if channel.task is None or channel.task.done():
+            channel.task = loop.create_task(self._run(channel, timezone.now()))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        for channel in list(self._channels.values()):
+            if queue in channel.subscribers:
+                channel.subscribers.discard(queue)
+                if not channel.subscribers and channel.task is not None:
+                    channel.task.cancel()
+                    channel.task = None
+
+    def publish(self, channel: _LoopChannel, events: list[dict[str, Any]]) -> None:
+        for queue in list(channel.subscribers):
+            for event in events:
+                if queue.full():
+                    # A stalled client loses its oldest events, not our memory.
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def _run(self, channel: _LoopChannel, watermark: datetime) -> None:
+        sent: dict[tuple[str, int], datetime] = {}
+        try:
+            while channel.subscribers:
+                await self._wait(channel)
+                now = timezone.now()
+                since = watermark - self._safety_lag()
+                events = [
+                    event
+                    for event in await self._fetch(since, now)
+                    if (event["event"], event["id"]) not in sent
+                ]
+                watermark = now
+                # Events first sent before the next window starts cannot recur.
+                horizon = now - self._safety_lag()
+                sent = {key: at for key, at in sent.items() if at > horizon}
+                sent.update(((event["event"], event["id"]), now) for event in events)
+                if events:
+                    self.publish(channel, events)
+        finally:
+            await self._close_listener(channel)
+
+    def _interval(self) -> float:
+        if self.interval is not None:
+            return self.interval
+        return getattr(settings, "REMINDER_STREAM_INTERVAL", 5.0)
+
+    def _safety_lag(self) -> timedelta:
+        if self.safety_lag is not None:
+            return timedelta(seconds=self.safety_lag)
+        return timedelta(seconds=getattr(settings, "REMINDER_STREAM_SAFETY_LAG", 5.0))
+
+    async def _wait(self, channel: _LoopChannel) -> None:
+        loop = asyncio.get_running_loop()
+        if connection.vendor == "postgresql" and loop.time() >= channel.listen_retry_at:
+            try:
+                await self._wait_for_notification(channel)
+                channel.listen_failures = 0
+                return
+            except Exception:
+                # Poll plainly, and back off before trying to LISTEN again.
+                channel.listen_failures += 1
+                delay = min(self._interval() * 2**channel.listen_failures, MAX_LISTEN_BACKOFF)
+                channel.listen_retry_at = loop.time() + delay
+                logger.warning(
+                    "Listening for reminder notifications failed; retrying in %.0fs",
+                    delay,
+                    exc_info=True,
+                )
+                await self._close_listener(channel)
+        await asyncio.sleep(self._interval())
+
+    async def _wait_for_notification(self, channel: _LoopChannel) -> None:  # pragma: no cover
+        if channel.listener is None:
+            import psycopg
+
+            params = connection.get_connection_params()
+            conninfo = {
+                key: value
+                for key, value in params.items()
+                if key in {"dbname", "user", "password", "host", "port", "sslmode", "connect_timeout"}
+            }
+            channel.listener = await psycopg.AsyncConnection.connect(autocommit=True, **conninfo)
+            await channel.listener.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        # notifies() takes timeout and stop_after from psycopg 3.2 onwards.
+        async for _ in channel.listener.notifies(timeout=self._interval(), stop_after=1):
+            break
+
+    async def _close_listener(self, channel: _LoopChannel) -> None:
+        if channel.listener is not None:
+            listener, channel.listener = channel.listener, None
+            await listener.close()
+
+
+broadcaster = ReminderBroadcaster()
@@ -3,11 +3,25 @@
 from __future__ import annotations
 
 import json
+from pathlib import PurePath
 from typing import Any
 
 from django import forms
+from django.conf import settings
 
-from .models import ActivityLog, Document, DocumentVersion, Register, ScheduleEntry
+from .batch import METHODS as BATCH_METHODS
+from .models import (
+    ActivityLog,
+    Document,
+    DocumentVersion,
+    Register,
+    ScheduleEntry,
+    UploadSession,
+)
+from .sync import DEFAULT_LIMIT as SYNC_DEFAULT_LIMIT
+from .sync import MAX_LIMIT as SYNC_MAX_LIMIT
+from .sync import InvalidCursor, decode_cursor
+from .typeahead import DEFAULT_LIMIT, MAX_LIMIT
 
 
 class RegisterSearchForm(forms.Form):
@@ -24,6 +38,7 @@ class RegisterSearchForm(forms.Form):
             ("false", "Outstanding"),
         ),
         coerce=lambda value: {"true": True, "false": False}.get(value, None),
+        empty_value=None,
     )
 
     def cleaned_filters(self) -> dict[str, Any]:
@@ -37,6 +52,145 @@ class RegisterSearchForm(forms.Form):
         return filters
 
 
+class SyncForm(forms.Form):
+    cursor = forms.CharField(required=False)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=SYNC_MAX_LIMIT)
+
+    def clean_cursor(self) -> dict[str, Any]:
+        try:
+            return decode_cursor(self.cleaned_data.get("cursor") or "")
+        except InvalidCursor as exc:
+            raise forms.ValidationError(str(exc)) from exc
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        cleaned["limit"] = cleaned.get("limit") or SYNC_DEFAULT_LIMIT
+        return cleaned
+
+
+class TypeaheadForm(forms.Form):
+    q = forms.CharField(max_length=255, strip=True)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        cleaned["limit"] = cleaned.get("limit") or DEFAULT_LIMIT
+        return cleaned
+
+
+class BulkCompletionForm(forms.Form):
+    """Select schedule entries to complete by id or by filter."""
+
+    MAX_IDS = 1000
+
+    ids = forms.JSONField(required=False)
+    register = forms.ModelChoiceField(queryset=Register.objects.all(), required=False)
+    bundle_type = forms.ChoiceField(
+        choices=(("", "All"),) + tuple(ScheduleEntry.BUNDLE_CHOICES),
+        required=False,
+    )
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean_ids(self) -> list[int]:
+        ids = self.cleaned_data.get("ids") or []
+        if not isinstance(ids, list) or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in ids
+        ):
+            raise forms.ValidationError("Provide a list of integer ids")
+        if len(ids) > self.MAX_IDS:
+            raise forms.ValidationError(f"At most {self.MAX_IDS} ids can be completed at once")
+        return ids
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        selection = ("ids", "register", "bundle_type", "date_from", "date_to")
+        if not any(cleaned.get(name) for name in selection):
+            # Refuse to complete every entry in the system by accident.
+            raise forms.ValidationError("Provide ids or at least one filter")
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            self.add_error("date_to", "The end date must not be before the start date")
+        return cleaned
+
+    def queryset(self):
+        qs = ScheduleEntry.objects.all()
+        if self.cleaned_data.get("ids"):
+            qs = qs.filter(pk__in=self.cleaned_data["ids"])
+        if self.cleaned_data.get("register"):
+            qs = qs.filter(register=self.cleaned_data["register"])
+        if self.cleaned_data.get("bundle_type"):
+            qs = qs.filter(bundle_type=self.cleaned_data["bundle_type"])
+        if self.cleaned_data.get("date_from"):
+            qs = qs.filter(scheduled_for__gte=self.cleaned_data["date_from"])
+        if self.cleaned_data.get("date_to"):
+            qs = qs.filter(scheduled_for__lte=self.cleaned_data["date_to"])
+        return qs
+
+
+class BatchForm(forms.Form):
+    """An ordered list of write operations for the batch endpoint."""
+
+    operations = forms.JSONField()
+    atomic = forms.BooleanField(required=False)
+
+    def clean_operations(self) -> list[dict[str, Any]]:
+        operations = self.cleaned_data["operations"]
+        if not isinstance(operations, list) or not operations:
+            raise forms.ValidationError("Provide a non-empty list of operations")
+        limit = getattr(settings, "BATCH_MAX_OPERATIONS", 100)
+        if len(operations) > limit:
+            raise forms.ValidationError(f"At most {limit} operations can be sent at once")
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                raise forms.ValidationError(f"Operation {index} must be an object")
+            if operation.get("method") not in BATCH_METHODS:
+                raise forms.ValidationError(
+                    f"Operation {index} needs a method of {', '.join(BATCH_METHODS)}"
+                )
+            if not str(operation.get("path", "")).startswith("/"):
+                raise forms.ValidationError(f"Operation {index} needs an absolute path")
+            if not isinstance(operation.get("body", {}), dict):
+                raise forms.ValidationError(f"Operation {index} body must be an object")
+            if not isinstance(operation.get("idempotency_key", ""), str):
+                raise forms.ValidationError(f"Operation {index} idempotency_key must be a string")
+        return operations
+
+
+class CompletionAnalyticsForm(forms.Form):
+    GROUP_CHOICES = (("week", "Week"), ("day", "Day"))
+
+    date_from = forms.DateField()
+    date_to = forms.DateField()
+    register = forms.ModelChoiceField(queryset=Register.objects.all(), required=False)
+    bundle_type = forms.ChoiceField(
+        choices=(("", "All"),) + tuple(ScheduleEntry.BUNDLE_CHOICES),
+        required=False,
+    )
+    group = forms.ChoiceField(choices=GROUP_CHOICES, required=False)
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            self.add_error("date_to", "The end date must not be before the start date")
+        cleaned["group"] = cleaned.get("group") or "week"
+        return cleaned
+
+
+class ExportForm(forms.Form):
+    format = forms.ChoiceField(choices=(("csv", "CSV"), ("jsonl", "JSON Lines")), required=False)
+    gzip = forms.BooleanField(required=False)
+    register = forms.IntegerField(required=False, min_value=1)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        cleaned["format"] = cleaned.get("format") or "csv"
+        return cleaned
+
+
 class ScheduleEntryForm(forms.ModelForm):
     class Meta:
         model = ScheduleEntry
@@ -94,3 +248,29 @@ class DocumentVersionForm(forms.ModelForm):
         if commit:
             version.save()
         return version
+
+
+class UploadSessionForm(forms.ModelForm):
+    class Meta:
+        model = UploadSession
+        fields = ["document", "filename", "total_size", "notes"]
+
+    def clean_filename(self) -> str:
+        name = PurePath(self.cleaned_data["filename"].replace("\\", "/")).name
+        if not name:
+            raise forms.ValidationError("A file name is required")
+        return name
+
+    def clean_total_size(self) -> int:
+        total_size = self.cleaned_data["total_size"]
+        limit = getattr(settings, "CHUNKED_UPLOAD_MAX_SIZE", 2 * 1024**3)
+        if total_size > limit:
+            raise forms.ValidationError(f"Uploads are limited to {limit} bytes.")
+        return total_size
+
+    def save(self, user=None, commit: bool = True) -> UploadSession:
+        session = super().save(commit=False)
+        session.uploaded_by = user
+        if commit:
+            session.save()
+        return session
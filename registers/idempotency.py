@@ -0,0 +1,127 @@
+"""``Idempotency-Key`` support for write endpoints.
+
+A request carrying the header claims the key by inserting an
+:class:`~registers.models.IdempotencyRecord` inside the same transaction
+as the view's own writes, and the response is saved on that row before
+the transaction commits. A retry with the same key is answered from the
+row without running the view. A concurrent retry blocks on the unique
+constraint until the first request finishes, then replays it. Server
+errors release the key, so the request can be retried for real.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyRecord
+
+HEADER = "Idempotency-Key"
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def key_ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_TTL", DEFAULT_TTL))
+
+
+def _scope(request: HttpRequest) -> str:
+    user = getattr(request, "user", None)
+    user_id = user.pk if user is not None and user.is_authenticated else ""
+    return f"{request.method} {request.path} {user_id}"[:300]
+
+
+def _request_hash(request: HttpRequest) -> str:
+    digest = hashlib.sha256()
+    if request.content_type == "multipart/form-data":
+        # Reading the raw body would load whole scans into memory.
+        for name, values in sorted(request.POST.lists()):
+            digest.update(f"{name}={values!r}\n".encode())
+        for name, files in sorted(request.FILES.lists()):
+            for upload in files:
+                digest.update(f"{name}:{upload.name}:{upload.size}\n".encode())
+                for chunk in upload.chunks():
+                    digest.update(chunk)
+                upload.seek(0)
+    else:
+        digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _replay(record: IdempotencyRecord, request_hash: str) -> HttpResponse:
+    if record.request_hash != request_hash:
+        return JsonResponse(
+            {"errors": {"idempotency_key": ["This key was used with a different request."]}},
+            status=422,
+        )
+    response = HttpResponse(
+        bytes(record.body), status=record.status_code, content_type=record.content_type
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view):
+    """Store and replay responses of ``view`` for requests with an ``Idempotency-Key``."""
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        key = request.headers.get(HEADER, "").strip()
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return JsonResponse(
+                {"errors": {"idempotency_key": ["Use at most 255 characters."]}}, status=400
+            )
+
+        scope = _scope(request)
+        request_hash = _request_hash(request)
+        records = IdempotencyRecord.objects.filter(key=key, scope=scope)
+        cutoff = timezone.now() - key_ttl()
+        live = records.filter(created_at__gte=cutoff)
+        record = live.first()
+        if record is not None:
+            return _replay(record, request_hash)
+
+        try:
+            with transaction.atomic():
+                # An expired row would otherwise block the claim below.
+                records.filter(created_at__lt=cutoff).delete()
+                record = IdempotencyRecord.objects.create(
+                    key=key, scope=scope, request_hash=request_hash
+                )
+                response = view(request, *args, **kwargs)
+                if response.status_code >= 500 or response.streaming:
+                    # Not replayable: release the key so a retry runs again.
+                    record.delete()
+                    return response
+                record.status_code = response.status_code
+                record.content_type = response.get("Content-Type", "")
+                record.body = response.content
+                record.save(update_fields=["status_code", "content_type", "body"])
+                return response
+        except IntegrityError:
+            # Another request claimed the key first and has committed.
+            record = live.first()
+            if record is None:
+                raise
+            return _replay(record, request_hash)
+
+    return wrapper
+
+
+def purge_expired(*, batch_size: int = 5000) -> int:
+    """Delete records older than the TTL, in batches to keep locks short."""
+
+    expired = IdempotencyRecord.objects.filter(created_at__lt=timezone.now() - key_ttl())
+    deleted = 0
+    while True:
+        ids = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyRecord.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,219 @@
+"""Bulk import of legacy registers, schedule entries and reminders from CSV.
+
+Files are read row by row and handled in batches: each batch is validated,
+its register names are resolved through an in-memory name to id map, and
+the valid rows are written with ``bulk_create``. The number of rows consumed
+from a file is stored in :class:`ImportCheckpoint` inside the same
+transaction as the batch, so an import that stops halfway resumes exactly
+after the last committed batch.
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import typeahead
+from .cache import invalidate_after_bulk_write
+from .models import ImportCheckpoint, Register, Reminder, ScheduleEntry
+
+DEFAULT_BATCH_SIZE = 1000
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f"}
+
+
+class RowError(ValueError):
+    """A CSV row that cannot be imported."""
+
+
+def _text(row: dict[str, str], column: str, *, required: bool = False, max_length: int = 0) -> str:
+    value = (row.get(column) or "").strip()
+    if required and not value:
+        raise RowError(f"{column} is required")
+    if max_length and len(value) > max_length:
+        raise RowError(f"{column} is longer than {max_length} characters")
+    return value
+
+
+def _bool(row: dict[str, str], column: str, default: bool) -> bool:
+    value = _text(row, column).lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f"{column} must be true or false, not {value!r}")
+
+
+def _date(row: dict[str, str], column: str) -> date:
+    value = _text(row, column, required=True)
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise RowError(f"{column} must be a YYYY-MM-DD date, not {value!r}") from exc
+
+
+def _datetime(row: dict[str, str], column: str, *, required: bool = True) -> datetime | None:
+    value = _text(row, column, required=required)
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        try:
+            parsed = datetime.combine(date.fromisoformat(value), datetime.min.time())
+        except ValueError as exc:
+            raise RowError(f"{column} must be an ISO 8601 date and time, not {value!r}") from exc
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class RegisterNames:
+    """Register name to id map loaded once per import."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.ambiguous: set[str] = set()
+        for pk, name in Register.objects.order_by("pk").values_list("pk", "name").iterator():
+            self.add(name, pk)
+
+    def add(self, name: str, pk: int) -> None:
+        if name in self.ids and self.ids[name] != pk:
+            self.ambiguous.add(name)
+        self.ids.setdefault(name, pk)
+
+    def resolve(self, name: str) -> int:
+        if not name:
+            raise RowError("register is required")
+        if name in self.ambiguous:
+            raise RowError(f"register name {name!r} matches several registers")
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise RowError(f"unknown register {name!r}") from None
+
+
+def _register_row(row: dict[str, str], names: RegisterNames) -> Register | None:
+    name = _text(row, "name", required=True, max_length=255)
+    if name in names.ids:
+        # Already imported, e.g. by an earlier run that stopped before its checkpoint.
+        return None
+    return Register(
+        name=name,
+        description=_text(row, "description"),
+        is_active=_bool(row, "is_active", True),
+    )
+
+
+BUNDLE_TYPES = {key for key, _ in ScheduleEntry.BUNDLE_CHOICES}
+
+
+def _entry_row(row: dict[str, str], names: RegisterNames) -> ScheduleEntry:
+    bundle_type = _text(row, "bundle_type", required=True).lower()
+    if bundle_type not in BUNDLE_TYPES:
+        raise RowError(f"bundle_type must be one of {', '.join(sorted(BUNDLE_TYPES))}")
+    completed_at = _datetime(row, "completed_at", required=False)
+    return ScheduleEntry(
+        register_id=names.resolve(_text(row, "register")),
+        bundle_type=bundle_type,
+        scheduled_for=_date(row, "scheduled_for"),
+        completed=_bool(row, "completed", completed_at is not None),
+        completed_at=completed_at,
+        notes=_text(row, "notes"),
+    )
+
+
+def _reminder_row(row: dict[str, str], names: RegisterNames) -> Reminder:
+    return Reminder(
+        register_id=names.resolve(_text(row, "register")),
+        remind_at=_datetime(row, "remind_at"),
+        message=_text(row, "message", required=True, max_length=255),
+        is_sent=_bool(row, "is_sent", False),
+    )
+
+
+ROW_PARSERS: dict[str, tuple[type[models.Model], Callable]] = {
+    "registers": (Register, _register_row),
+    "entries": (ScheduleEntry, _entry_row),
+    "reminders": (Reminder, _reminder_row),
+}
+
+
+class ImportResult:
+    def __init__(self) -> None:
+        self.imported = 0
+        self.skipped = 0
+        self.errors: list[tuple[int, str]] = []
+
+
+def _batches(rows: Iterator[dict[str, str]], size: int) -> Iterator[list[dict[str, str]]]:
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def import_csv(
+    kind: str,
+    path: str | Path,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False,
+    on_batch: Callable[[int], None] | None = None,
+) -> ImportResult:
+    """Import one CSV file of ``kind``, resuming from its checkpoint."""
+
+    model, parse = ROW_PARSERS[kind]
+    source = f"{kind}:{Path(path).resolve()}"
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+    if restart:
+        checkpoint.rows_done = 0
+        checkpoint.save(update_fields=["rows_done", "updated_at"])
+
+    names = RegisterNames()
+    result = ImportResult()
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        # Rows before the checkpoint are read but not parsed again.
+        rows = itertools.islice(reader, checkpoint.rows_done, None)
+        row_number = checkpoint.rows_done
+        for batch in _batches(rows, batch_size):
+            objects = []
+            for row in batch:
+                row_number += 1
+                try:
+                    obj = parse(row, names)
+                except RowError as exc:
+                    result.errors.append((row_number, str(exc)))
+                    continue
+                if obj is None:
+                    result.skipped += 1
+                    continue
+                if kind == "registers":
+                    # Later rows of the same file must see this name as taken.
+                    names.add(obj.name, 0)
+                objects.append(obj)
+
+            with transaction.atomic():
+                created = model.objects.bulk_create(objects, batch_size=batch_size)
+                ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                    rows_done=row_number, updated_at=timezone.now()
+                )
+                if kind == "registers":
+                    invalidate_after_bulk_write()
+                    typeahead.mark_stale()
+                else:
+                    invalidate_after_bulk_write({obj.register_id for obj in created})
+            if kind == "registers":
+                for register in created:
+                    names.ids[register.name] = register.pk
+            result.imported += len(created)
+            if on_batch:
+                on_batch(row_number)
+    return result
@@ -0,0 +1,15 @@
+"""Delete document blobs that no version references any more."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from registers.models import StoredBlob
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced document blobs untouched for BLOB_GC_GRACE seconds."
+
+    def handle(self, *args, **options):
+        deleted = StoredBlob.collect_garbage()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced blobs."))
@@ -0,0 +1,45 @@
+"""Deliver reminders that have fallen due."""
+
+from __future__ import annotations
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from registers.reminders import dispatch_due_reminders, get_backend
+
+
+class Command(BaseCommand):
+    help = "Claim due reminders in batches and deliver them through the reminder backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of reminders claimed and marked sent at a time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of threads delivering reminders concurrently.",
+        )
+        parser.add_argument(
+            "--backend",
+            default=None,
+            help="Dotted path of a reminder backend overriding REMINDER_BACKEND.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            backend = get_backend(options["backend"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+        sent, failed = dispatch_due_reminders(
+            backend=backend,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminders."))
+        if failed:
+            self.stderr.write(f"{failed} reminders failed and remain pending.")
@@ -0,0 +1,57 @@
+"""Stream schedule entries or activity logs to a CSV or JSON Lines file."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registers.exports import EXPORTS, FORMATS, encode_export, export_rows
+
+
+class Command(BaseCommand):
+    help = "Export schedule entries or activity logs as CSV or JSON Lines in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip.")
+        parser.add_argument("--register", type=int, help="Only export rows of this register id.")
+        parser.add_argument("--date-from", type=date.fromisoformat, help="First day (YYYY-MM-DD).")
+        parser.add_argument("--date-to", type=date.fromisoformat, help="Last day (YYYY-MM-DD).")
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write to; defaults to standard output.",
+        )
+
+    def handle(self, *args, **options):
+        spec = EXPORTS[options["dataset"]]
+        rows = export_rows(
+            spec,
+            register=options["register"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+        )
+        chunks = encode_export(spec, rows, options["format"], compress=options["gzip"])
+
+        if options["output"]:
+            try:
+                with open(options["output"], "wb") as handle:
+                    for chunk in chunks:
+                        handle.write(chunk)
+            except OSError as exc:
+                raise CommandError(f"Could not write {options['output']}: {exc}") from exc
+            return
+
+        stream = getattr(self.stdout, "_out", sys.stdout)
+        target = getattr(stream, "buffer", None)
+        if target is None and options["gzip"]:
+            raise CommandError("Use --output for gzip output when stdout is not a binary stream.")
+        for chunk in chunks:
+            if target is not None:
+                target.write(chunk)
+            else:
+                stream.write(chunk.decode("utf-8"))
+        (target or stream).flush()
@@ -0,0 +1,104 @@
+"""Render queued document thumbnails in a pool of worker processes."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from registers.models import PreviewJob
+from registers.previews import render_job
+
+
+class Command(BaseCommand):
+    help = "Generate first-page thumbnails for document versions waiting in the preview queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes; 0 renders in this process.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of jobs claimed from the queue at a time.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=3,
+            help="Give up on a job after this many failed attempts.",
+        )
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=10,
+            help="Reclaim jobs left processing by a crashed worker after this long.",
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options["max_attempts"]
+        self.stale_before = timezone.now() - timedelta(minutes=options["stale_minutes"])
+        workers = options["workers"]
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+        rendered = 0
+        try:
+            while True:
+                jobs = self._claim(options["batch_size"])
+                if not jobs:
+                    break
+                tasks = [self._task(job) for job in jobs]
+                if pool is None:
+                    results = [render_job(*task) for task in tasks]
+                else:
+                    results = pool.map(render_job, *zip(*tasks))
+                for job_id, status, error in results:
+                    self._finish(job_id, status, error)
+                    rendered += status == PreviewJob.DONE
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {rendered} previews."))
+
+    def _task(self, job: PreviewJob) -> tuple[int, str, str]:
+        version = job.version
+        return job.pk, version.file.path, version.file.storage.path(version.preview_name)
+
+    def _claim(self, batch_size: int) -> list[PreviewJob]:
+        claimable = Q(status=PreviewJob.PENDING) | Q(
+            status=PreviewJob.PROCESSING, updated_at__lt=self.stale_before
+        )
+        with transaction.atomic():
+            ids = list(
+                PreviewJob.objects.select_for_update(skip_locked=True)
+                .filter(claimable)
+                .order_by("created_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            PreviewJob.objects.filter(pk__in=ids).update(
+                status=PreviewJob.PROCESSING,
+                attempts=F("attempts") + 1,
+                updated_at=timezone.now(),
+            )
+        return list(PreviewJob.objects.filter(pk__in=ids).select_related("version"))
+
+    def _finish(self, job_id: int, status: str, error: str) -> None:
+        job = PreviewJob.objects.filter(pk=job_id, status=PreviewJob.PROCESSING)
+        if status == PreviewJob.FAILED:
+            # Transient failures go back on the queue until attempts run out.
+            job.filter(attempts__lt=self.max_attempts).update(
+                status=PreviewJob.PENDING, error=error, updated_at=timezone.now()
+            )
+        # Only jobs still processing are updated, so a version replaced
+        # mid-render keeps the fresh pending job queued for its new file.
+        job.update(status=status, error=error, updated_at=timezone.now())
@@ -0,0 +1,69 @@
+"""Import legacy registers, schedule entries and reminders from CSV files."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registers.imports import DEFAULT_BATCH_SIZE, import_csv
+
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Import registers, schedule entries and reminders from CSV in resumable batches. "
+        "Entries and reminders refer to registers by name, so registers are imported first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--registers", help="CSV with name, description, is_active.")
+        parser.add_argument(
+            "--entries",
+            help="CSV with register, bundle_type, scheduled_for, completed, completed_at, notes.",
+        )
+        parser.add_argument("--reminders", help="CSV with register, remind_at, message, is_sent.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore saved checkpoints and read the files from the beginning.",
+        )
+
+    def handle(self, *args, **options):
+        files = [
+            (kind, options[kind])
+            for kind in ("registers", "entries", "reminders")
+            if options[kind]
+        ]
+        if not files:
+            raise CommandError("Give at least one of --registers, --entries or --reminders.")
+
+        failed = 0
+        for kind, path in files:
+            try:
+                result = import_csv(
+                    kind,
+                    path,
+                    batch_size=options["batch_size"],
+                    restart=options["restart"],
+                    on_batch=lambda rows, kind=kind: self.stdout.write(
+                        f"{kind}: {rows} rows processed"
+                    ),
+                )
+            except OSError as exc:
+                raise CommandError(f"Could not read {path}: {exc}") from exc
+
+            for row_number, message in result.errors[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(f"{path}, row {row_number}: {message}")
+            if len(result.errors) > MAX_REPORTED_ERRORS:
+                self.stderr.write(f"... and {len(result.errors) - MAX_REPORTED_ERRORS} more errors")
+            failed += len(result.errors)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Imported {result.imported} {kind} "
+                    f"({result.skipped} already present, {len(result.errors)} invalid)."
+                )
+            )
+
+        if failed:
+            self.stderr.write(f"{failed} rows were rejected; fix them and import them separately.")
@@ -0,0 +1,23 @@
+"""Generate schedule entries from recurrence rules ahead of time."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from registers.recurrence import DEFAULT_HORIZON_DAYS, materialize_rules
+
+
+class Command(BaseCommand):
+    help = "Materialize schedule entries for active recurrence rules over a rolling horizon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DEFAULT_HORIZON_DAYS,
+            help="Number of days ahead to keep materialized.",
+        )
+
+    def handle(self, *args, **options):
+        generated = materialize_rules(days=options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Materialized {generated} schedule entries."))
@@ -0,0 +1,18 @@
+"""Delete stored idempotent responses whose keys have expired."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from registers.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency records older than IDEMPOTENCY_KEY_TTL seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency records."))
@@ -0,0 +1,15 @@
+"""Delete sync tombstones older than the retention period."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from registers.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete deletion records older than SYNC_TOMBSTONE_DAYS days."
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sync tombstones."))
@@ -0,0 +1,25 @@
+"""Bring the daily completion rollups up to date."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from registers.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute completion rollups for the days touched since the last refresh."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every rollup from the schedule entries instead.",
+        )
+
+    def handle(self, *args, **options):
+        recomputed = refresh_rollups(full=options["full"])
+        if recomputed is None:
+            self.stdout.write(self.style.SUCCESS("Rebuilt all completion rollups."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Recomputed rollups for {recomputed} days."))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 03:05
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_version_counter(apps, schema_editor):
+    Document = apps.get_model("registers", "Document")
+    DocumentVersion = apps.get_model("registers", "DocumentVersion")
+    latest = (
+        DocumentVersion.objects.filter(document=OuterRef("pk"))
+        .order_by()
+        .values("document")
+        .annotate(latest=Max("version"))
+        .values("latest")
+    )
+    Document.objects.update(version_counter=Coalesce(Subquery(latest), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0003_content_addressed_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="version_counter",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_version_counter, migrations.RunPython.noop),
+    ]
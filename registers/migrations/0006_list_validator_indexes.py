@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0005_preview_job"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="register",
+            index=models.Index(
+                fields=["updated_at"], name="registers_r_updated_25dd04_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                fields=["is_sent", "remind_at", "updated_at"],
+                name="registers_r_is_sent_cf1146_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleentry",
+            index=models.Index(
+                fields=["bundle_type", "updated_at"],
+                name="registers_s_bundle__928292_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleentry",
+            index=models.Index(
+                fields=["register", "updated_at"], name="registers_s_registe_825754_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.2 on 2026-10-19 03:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0006_list_validator_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurrenceRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "bundle_type",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("pending", "Pending"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("monthly", "Monthly"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "weekdays",
+                    models.CharField(
+                        blank=True,
+                        help_text="Weekly rules: comma-separated ISO weekdays (1 = Monday). Defaults to the weekday of the start date.",
+                        max_length=13,
+                    ),
+                ),
+                (
+                    "day_of_month",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        help_text="Monthly rules: day to schedule on, moved to the last day of shorter months. Defaults to the day of the start date.",
+                        null=True,
+                    ),
+                ),
+                ("starts_on", models.DateField()),
+                ("ends_on", models.DateField(blank=True, null=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "materialized_through",
+                    models.DateField(blank=True, editable=False, null=True),
+                ),
+                (
+                    "register",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurrence_rules",
+                        to="registers.register",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["register", "starts_on"],
+            },
+        ),
+        migrations.AddField(
+            model_name="scheduleentry",
+            name="recurrence_rule",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="schedule_entries",
+                to="registers.recurrencerule",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="scheduleentry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("recurrence_rule__isnull", False)),
+                fields=("recurrence_rule", "scheduled_for"),
+                name="unique_recurrence_occurrence",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recurrencerule",
+            index=models.Index(
+                fields=["is_active", "materialized_through"],
+                name="registers_r_is_acti_b9c3e4_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0007_recurrence_rule"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="activitylog",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("updated", "Updated"),
+                    ("digital_entry", "Digital Entry"),
+                    ("document_uploaded", "Document Uploaded"),
+                    ("completed", "Completed"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
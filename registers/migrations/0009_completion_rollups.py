@@ -0,0 +1,107 @@
+# Generated by Django 5.2 on 2026-10-19 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0008_activity_completed_action"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompletionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "bundle_type",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("pending", "Pending"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("scheduled", models.PositiveIntegerField(default=0)),
+                ("completed", models.PositiveIntegerField(default=0)),
+                ("overdue", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["day", "register", "bundle_type"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("refreshed_at", models.DateTimeField(blank=True, null=True)),
+                ("refreshed_on", models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="StaleRollupDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="scheduleentry",
+            index=models.Index(
+                fields=["updated_at", "scheduled_for"],
+                name="registers_s_updated_6e007e_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="completionrollup",
+            name="register",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="completion_rollups",
+                to="registers.register",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="completionrollup",
+            index=models.Index(
+                fields=["register", "day"], name="registers_c_registe_30265d_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="completionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "register", "bundle_type"),
+                name="unique_completion_rollup",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0010_import_checkpoint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(
+                fields=["created_at"], name="registers_a_created_b60fa3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="register",
+            index=models.Index(fields=["name"], name="registers_r_name_3dc9e2_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleentry",
+            index=models.Index(
+                fields=["scheduled_for", "created_at"],
+                name="registers_s_schedul_46fe5b_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-19 03:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0013_idempotency_record"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=50)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="register",
+            name="registers_r_updated_25dd04_idx",
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(
+                fields=["updated_at", "id"], name="registers_d_updated_12e1bf_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="register",
+            index=models.Index(
+                fields=["updated_at", "id"], name="registers_r_updated_2c0b49_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                fields=["updated_at", "id"], name="registers_r_updated_ac199a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleentry",
+            index=models.Index(
+                fields=["updated_at", "id"], name="registers_s_updated_5b3423_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="registers_t_deleted_77ac50_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+INDEX_NAME = "registers_register_name_upper_like"
+
+
+def create_prefix_index(apps, schema_editor):
+    # istartswith compiles to UPPER(name::text) LIKE ...; only an expression
+    # index with text_pattern_ops serves that under non-C collations.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+        "ON registers_register (UPPER(name::text) text_pattern_ops)"
+    )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0014_sync_tombstones"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
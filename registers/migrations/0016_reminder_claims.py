@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registers", "0015_register_name_prefix_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reminder",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="reminder",
+            name="claimed_by",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import calendar
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import PurePath
+from typing import Iterator
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .cache import invalidate_after_bulk_write
+from .previews import preview_name
+from .storage import get_document_storage
+from .transactions import write_atomic
+
 
 User = get_user_model()
 
@@ -27,6 +42,11 @@ class Register(TimeStampedModel):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"]),
+            # Delta sync pages through (updated_at, id); also serves Max("updated_at").
+            models.Index(fields=["updated_at", "id"]),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - human readable representation
         return self.name
@@ -53,19 +73,190 @@ class ScheduleEntry(TimeStampedModel):
     notes = models.TextField(blank=True)
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True)
+    recurrence_rule = models.ForeignKey(
+        "RecurrenceRule",
+        related_name="schedule_entries",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
 
     class Meta:
         ordering = ["-scheduled_for", "-created_at"]
+        constraints = [
+            # Lets the materializer insert with ignore_conflicts and rerun safely.
+            models.UniqueConstraint(
+                fields=["recurrence_rule", "scheduled_for"],
+                condition=models.Q(recurrence_rule__isnull=False),
+                name="unique_recurrence_occurrence",
+            ),
+        ]
         indexes = [
             models.Index(fields=["bundle_type", "scheduled_for"]),
+            # Default ordering and the admin date hierarchy.
+            models.Index(fields=["scheduled_for", "created_at"]),
+            # Cover the filters and Max("updated_at") of list validators.
+            models.Index(fields=["bundle_type", "updated_at"]),
+            models.Index(fields=["register", "updated_at"]),
+            # Finds the days touched since the last rollup refresh.
+            models.Index(fields=["updated_at", "scheduled_for"]),
+            # Delta sync pages through (updated_at, id).
+            models.Index(fields=["updated_at", "id"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rescheduling leaves the old day's rollup stale, and moving an entry
+        # changes the old register's cached lists; see registers.signals.
+        instance._stored_scheduled_for = instance.__dict__.get("scheduled_for")
+        instance._stored_register_id = instance.__dict__.get("register_id")
+        return instance
+
     def mark_complete(self) -> None:
         self.completed = True
         if not self.completed_at:
             self.completed_at = timezone.now()
         self.save(update_fields=["completed", "completed_at", "updated_at"])
 
+    @classmethod
+    def complete_many(cls, queryset: models.QuerySet, *, user: User | None = None) -> list[int]:
+        """Complete every outstanding entry in ``queryset`` with one UPDATE.
+
+        ``completed_at`` is only filled in where it is still empty, and one
+        activity log row is written per entry that changed. Returns the ids
+        of those entries.
+        """
+
+        now = timezone.now()
+        outstanding = queryset.filter(models.Q(completed=False) | models.Q(completed_at__isnull=True))
+        with write_atomic():
+            # Locking first keeps concurrent sign-offs from logging an entry twice.
+            entries = list(
+                outstanding.select_for_update()
+                .order_by("pk")
+                .values_list("pk", "register_id", "bundle_type", "scheduled_for")
+            )
+            if not entries:
+                return []
+            # Update exactly the locked rows; re-running the filter could pick
+            # up entries that started matching since and skip their log rows.
+            cls.objects.filter(pk__in=[pk for pk, *_ in entries]).update(
+                completed=True,
+                completed_at=Coalesce("completed_at", Value(now)),
+                updated_at=now,
+            )
+            labels = dict(cls.BUNDLE_CHOICES)
+            ActivityLog.objects.bulk_create(
+                ActivityLog(
+                    register_id=register_id,
+                    schedule_entry_id=pk,
+                    action="completed",
+                    details=f"{labels.get(bundle_type, bundle_type)} bundle for {scheduled_for} completed",
+                    user=user,
+                )
+                for pk, register_id, bundle_type, scheduled_for in entries
+            )
+            invalidate_after_bulk_write({register_id for _, register_id, *_ in entries})
+        return [pk for pk, *_ in entries]
+
+
+class RecurrenceRule(TimeStampedModel):
+    """A repeating pattern that schedule entries are materialized from.
+
+    Entries are generated ahead of time by the ``materialize_schedule``
+    command, which continues from ``materialized_through`` (or today, if
+    that is later); editing a rule therefore only affects dates that have not
+    been materialized yet.
+    """
+
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+    FREQUENCY_CHOICES = [
+        (DAILY, "Daily"),
+        (WEEKLY, "Weekly"),
+        (MONTHLY, "Monthly"),
+    ]
+
+    register = models.ForeignKey(
+        Register, related_name="recurrence_rules", on_delete=models.CASCADE
+    )
+    bundle_type = models.CharField(max_length=10, choices=ScheduleEntry.BUNDLE_CHOICES)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    weekdays = models.CharField(
+        max_length=13,
+        blank=True,
+        help_text="Weekly rules: comma-separated ISO weekdays (1 = Monday). "
+        "Defaults to the weekday of the start date.",
+    )
+    day_of_month = models.PositiveSmallIntegerField(
+        blank=True,
+        null=True,
+        help_text="Monthly rules: day to schedule on, moved to the last day of shorter "
+        "months. Defaults to the day of the start date.",
+    )
+    starts_on = models.DateField()
+    ends_on = models.DateField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    materialized_through = models.DateField(blank=True, null=True, editable=False)
+
+    class Meta:
+        ordering = ["register", "starts_on"]
+        indexes = [
+            models.Index(fields=["is_active", "materialized_through"]),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - human readable representation
+        return f"{self.register} {self.get_bundle_type_display()} ({self.get_frequency_display()})"
+
+    def weekday_set(self) -> set[int]:
+        if not self.weekdays:
+            return {self.starts_on.isoweekday()}
+        return {int(day) for day in self.weekdays.split(",") if day.strip()}
+
+    def clean(self) -> None:
+        if self.ends_on and self.starts_on and self.ends_on < self.starts_on:
+            raise ValidationError({"ends_on": "The end date must not be before the start date."})
+        if self.weekdays:
+            try:
+                days = self.weekday_set()
+            except ValueError:
+                days = {0}
+            if not days or not days <= set(range(1, 8)):
+                raise ValidationError({"weekdays": "Use comma-separated numbers from 1 to 7."})
+        if self.day_of_month is not None and not 1 <= self.day_of_month <= 31:
+            raise ValidationError({"day_of_month": "Use a day between 1 and 31."})
+
+    def occurrences(self, start: date, end: date) -> Iterator[date]:
+        """Dates the rule schedules between ``start`` and ``end`` inclusive."""
+
+        start = max(start, self.starts_on)
+        if self.ends_on:
+            end = min(end, self.ends_on)
+        if start > end:
+            return
+
+        if self.frequency == self.MONTHLY:
+            target = self.day_of_month or self.starts_on.day
+            year, month = start.year, start.month
+            while True:
+                last_day = calendar.monthrange(year, month)[1]
+                candidate = date(year, month, min(target, last_day))
+                if candidate > end:
+                    return
+                if candidate >= start:
+                    yield candidate
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        weekdays = self.weekday_set() if self.frequency == self.WEEKLY else None
+        day = start
+        while day <= end:
+            if weekdays is None or day.isoweekday() in weekdays:
+                yield day
+            day += timedelta(days=1)
+
 
 class Reminder(TimeStampedModel):
     """Represents a reminder message for upcoming schedule entries."""
@@ -83,9 +274,16 @@ class Reminder(TimeStampedModel):
     remind_at = models.DateTimeField()
     message = models.CharField(max_length=255)
     is_sent = models.BooleanField(default=False)
+    # Set by ``dispatch_reminders`` while a worker is delivering the reminder.
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    claimed_by = models.UUIDField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["remind_at"]
+        indexes = [
+            models.Index(fields=["is_sent", "remind_at", "updated_at"]),
+            models.Index(fields=["updated_at", "id"]),
+        ]
 
     def mark_sent(self) -> None:
         self.is_sent = True
@@ -100,20 +298,128 @@ class Document(TimeStampedModel):
     )
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
+    version_counter = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["title"]
         unique_together = (("register", "title"),)
+        indexes = [
+            models.Index(fields=["updated_at", "id"]),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - human readable representation
         return self.title
 
     def latest_version(self) -> "DocumentVersion | None":
-        return self.versions.order_by("-version").first()
+        # Look the counter up in the same statement so stale instances still
+        # resolve the newest version through the (document, version) index.
+        current = Document.objects.filter(pk=self.pk).values("version_counter")
+        latest = self.versions.filter(version=models.Subquery(current)).first()
+        if latest is None:
+            # The newest version was deleted; fall back to the remaining ones.
+            latest = self.versions.order_by("-version").first()
+        return latest
+
+    def allocate_version_number(self) -> int:
+        """Reserve the next version number for this document.
+
+        The counter is incremented in a single ``UPDATE``, which holds the row
+        lock until the surrounding transaction ends, so concurrent uploads to
+        the same document always receive distinct numbers.
+        """
+
+        with write_atomic():
+            Document.objects.filter(pk=self.pk).update(
+                version_counter=models.F("version_counter") + 1
+            )
+            self.version_counter = Document.objects.values_list(
+                "version_counter", flat=True
+            ).get(pk=self.pk)
+        return self.version_counter
+
+
+class StoredBlob(TimeStampedModel):
+    """Reference count for a content-addressed file shared by document versions."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - human readable representation
+        return f"{self.sha256} ({self.ref_count} refs)"
+
+    @classmethod
+    def claim(cls, sha256: str, size: int) -> None:
+        """Lock the row for ``sha256``, creating an unreferenced one if needed.
+
+        Must run inside a transaction. Touching ``updated_at`` keeps
+        :meth:`collect_garbage` away from the blob until the caller has had
+        time to commit its reference.
+        """
+
+        blob, created = cls.objects.select_for_update().get_or_create(
+            sha256=sha256, defaults={"size": size}
+        )
+        if not created:
+            cls.objects.filter(pk=blob.pk).update(updated_at=timezone.now())
+
+    @classmethod
+    def retain(cls, sha256: str, size: int) -> None:
+        blob, created = cls.objects.get_or_create(
+            sha256=sha256, defaults={"size": size, "ref_count": 1}
+        )
+        if not created:
+            cls.objects.filter(pk=blob.pk).update(
+                ref_count=models.F("ref_count") + 1, updated_at=timezone.now()
+            )
+
+    @classmethod
+    def release(cls, sha256: str) -> None:
+        """Drop one reference; the file stays until :meth:`collect_garbage`."""
+
+        cls.objects.filter(sha256=sha256, ref_count__gt=0).update(
+            ref_count=models.F("ref_count") - 1, updated_at=timezone.now()
+        )
 
-    def next_version_number(self) -> int:
-        latest = self.latest_version()
-        return (latest.version if latest else 0) + 1
+    @classmethod
+    def collect_garbage(cls, *, grace: timedelta | None = None) -> int:
+        """Delete blobs nothing references and return how many were removed.
+
+        Covers rows whose count has dropped to zero as well as files with no
+        row at all, which a save that rolled back leaves behind. Only blobs
+        untouched for ``grace`` (``BLOB_GC_GRACE`` seconds by default) are
+        considered, so an upload that has claimed or written a blob but not
+        yet committed its reference is left alone.
+        """
+
+        if grace is None:
+            grace = timedelta(seconds=getattr(settings, "BLOB_GC_GRACE", 24 * 60 * 60))
+        cutoff = timezone.now() - grace
+        storage = get_document_storage()
+        candidates = set(
+            cls.objects.filter(ref_count=0, updated_at__lt=cutoff).values_list("sha256", flat=True)
+        )
+        old_files = [digest for digest, modified in storage.iter_blobs() if modified < cutoff]
+        for start in range(0, len(old_files), 500):
+            batch = set(old_files[start : start + 500])
+            candidates |= batch - set(
+                cls.objects.filter(sha256__in=batch).values_list("sha256", flat=True)
+            )
+        return sum(cls._collect(sha256, cutoff) for sha256 in sorted(candidates))
+
+    @classmethod
+    def _collect(cls, sha256: str, cutoff: datetime) -> bool:
+        with write_atomic():
+            # Creating the row for an orphan waits out any upload inserting it.
+            blob, created = cls.objects.select_for_update().get_or_create(sha256=sha256)
+            if blob.ref_count or (not created and blob.updated_at >= cutoff):
+                return False
+            storage = get_document_storage()
+            name = storage.blob_name(sha256)
+            storage.delete(name)
+            storage.delete(preview_name(name))
+            blob.delete()
+        return True
 
 
 class DocumentVersion(TimeStampedModel):
@@ -123,7 +429,10 @@ class DocumentVersion(TimeStampedModel):
         Document, related_name="versions", on_delete=models.CASCADE
     )
     version = models.PositiveIntegerField(default=0)
-    file = models.FileField(upload_to="documents/%Y/%m/%d/")
+    file = models.FileField(upload_to="documents/%Y/%m/%d/", storage=get_document_storage)
+    original_filename = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
     uploaded_by = models.ForeignKey(
         User, related_name="uploaded_documents", null=True, blank=True, on_delete=models.SET_NULL
     )
@@ -133,14 +442,124 @@ class DocumentVersion(TimeStampedModel):
         unique_together = ("document", "version")
         ordering = ["-version", "-created_at"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_sha256 = instance.__dict__.get("sha256", "")
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.version:
-            self.version = self.document.next_version_number()
-        super().save(*args, **kwargs)
+        if self.file and not self.file._committed:
+            # Commit the upload up front so the digest is known before the row is written.
+            self.original_filename = PurePath(self.file.name).name
+            self.file.save(self.file.name, self.file.file, save=False)
+            self.sha256 = self.file.storage.digest_from_name(self.file.name)
+            self.size = self.file.size
+        elif self.file and not self.sha256:
+            # The caller stored the blob itself; it still has to be counted.
+            self.sha256 = self.file.storage.digest_from_name(self.file.name)
+            if self.sha256:
+                self.size = self.file.size
+
+        previous = getattr(self, "_stored_sha256", "")
+        with write_atomic():
+            if not self.version:
+                self.version = self.document.allocate_version_number()
+            elif self._state.adding:
+                # Keep the counter ahead of explicitly numbered versions.
+                Document.objects.filter(
+                    pk=self.document_id, version_counter__lt=self.version
+                ).update(version_counter=self.version)
+            super().save(*args, **kwargs)
+            if self.sha256 != previous:
+                if self.sha256:
+                    StoredBlob.retain(self.sha256, self.size)
+                if previous:
+                    StoredBlob.release(previous)
+                # Previews are keyed by content, so a replaced file needs a new one.
+                PreviewJob.enqueue(self)
+        self._stored_sha256 = self.sha256
 
     @property
     def filename(self) -> str:
-        return self.file.name.split("/")[-1]
+        return self.original_filename or self.file.name.split("/")[-1]
+
+    @property
+    def preview_name(self) -> str:
+        return preview_name(self.file.name)
+
+    def has_preview(self) -> bool:
+        return bool(self.file) and self.file.storage.exists(self.preview_name)
+
+
+class PreviewJob(TimeStampedModel):
+    """Queued thumbnail generation for a :class:`DocumentVersion`."""
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+        (UNSUPPORTED, "Unsupported"),
+    ]
+
+    version = models.OneToOneField(
+        DocumentVersion, related_name="preview_job", on_delete=models.CASCADE
+    )
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    @classmethod
+    def enqueue(cls, version: DocumentVersion) -> "PreviewJob":
+        job, _ = cls.objects.update_or_create(
+            version=version,
+            defaults={"status": cls.PENDING, "attempts": 0, "error": ""},
+        )
+        return job
+
+
+class UploadSession(TimeStampedModel):
+    """A resumable, chunked upload that becomes a :class:`DocumentVersion`."""
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    document = models.ForeignKey(
+        Document, related_name="upload_sessions", on_delete=models.CASCADE
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    notes = models.TextField(blank=True)
+    uploaded_by = models.ForeignKey(
+        User, related_name="upload_sessions", null=True, blank=True, on_delete=models.SET_NULL
+    )
+    version = models.ForeignKey(
+        DocumentVersion,
+        related_name="upload_sessions",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - human readable representation
+        return f"{self.filename} ({self.received}/{self.total_size})"
 
 
 class ActivityLog(TimeStampedModel):
@@ -151,6 +570,7 @@ class ActivityLog(TimeStampedModel):
         ("updated", "Updated"),
         ("digital_entry", "Digital Entry"),
         ("document_uploaded", "Document Uploaded"),
+        ("completed", "Completed"),
     ]
 
     register = models.ForeignKey(
@@ -171,6 +591,9 @@ class ActivityLog(TimeStampedModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
 
     def describe(self) -> str:
         timestamp = timezone.localtime(self.created_at).strftime("%Y-%m-%d %H:%M")
@@ -193,3 +616,105 @@ class ActivityLog(TimeStampedModel):
             user=user,
             schedule_entry=schedule_entry,
         )
+
+
+class CompletionRollup(models.Model):
+    """Daily schedule entry counts per register and bundle type.
+
+    Rows are maintained by the ``refresh_rollups`` command (see
+    :mod:`registers.rollups`); ``overdue`` counts outstanding entries of days
+    that had passed when the row was last refreshed.
+    """
+
+    register = models.ForeignKey(
+        Register, related_name="completion_rollups", on_delete=models.CASCADE
+    )
+    bundle_type = models.CharField(max_length=10, choices=ScheduleEntry.BUNDLE_CHOICES)
+    day = models.DateField()
+    scheduled = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    overdue = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "register", "bundle_type"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "register", "bundle_type"], name="unique_completion_rollup"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["register", "day"]),
+        ]
+
+
+class StaleRollupDay(models.Model):
+    """A day whose rollup must be recomputed although no entry on it changed.
+
+    ``updated_at`` only reveals an entry's current day, so deletions and
+    reschedules record the day they left here.
+    """
+
+    day = models.DateField(unique=True)
+
+    @classmethod
+    def mark(cls, day: date) -> None:
+        cls.objects.bulk_create([cls(day=day)], ignore_conflicts=True)
+
+
+class RollupState(models.Model):
+    """Watermarks of the last rollup refresh."""
+
+    name = models.CharField(max_length=50, unique=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    refreshed_on = models.DateField(null=True, blank=True)
+
+
+class ImportCheckpoint(TimeStampedModel):
+    """How far ``import_registers`` got through a CSV file."""
+
+    source = models.CharField(max_length=500, unique=True)
+    rows_done = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - human readable representation
+        return f"{self.source} ({self.rows_done} rows)"
+
+
+class IdempotencyRecord(models.Model):
+    """The stored response to a write sent with an ``Idempotency-Key`` header.
+
+    ``scope`` holds the method, path and user the key was used with, and
+    ``request_hash`` the payload, so a key cannot replay another request's
+    response. Rows older than ``IDEMPOTENCY_KEY_TTL`` seconds are ignored
+    and removed by the ``purge_idempotency_keys`` command.
+    """
+
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=300)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.BinaryField(default=b"")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "scope"], name="unique_idempotency_key"),
+        ]
+
+
+class Tombstone(models.Model):
+    """Record of a deleted register, schedule entry, reminder or document.
+
+    Written by a ``post_delete`` signal so the delta sync endpoint can tell
+    offline clients which objects to drop. ``model`` holds the collection
+    name used by :mod:`registers.sync`.
+    """
+
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at", "id"]),
+        ]
@@ -36,8 +36,8 @@ def _document_summary(documents: Iterable[DocumentVersion]) -> str:
     return "\n".join(lines) or "No documents uploaded."
 
 
-def render_register_pdf(register: Register) -> bytes:
-    """Render a single page PDF summarising a register."""
+def collect_register_summaries(register: Register) -> tuple[str, str]:
+    """Query the schedule and document summaries shown in the register PDF."""
 
     entries = register.schedule_entries.all().select_related("register")[:10]
     documents = (
@@ -45,9 +45,11 @@ def render_register_pdf(register: Register) -> bytes:
         .select_related("document")
         .order_by("-created_at")[:10]
     )
+    return _bundle_summary(entries), _document_summary(documents)
 
-    schedule_summary = _bundle_summary(entries)
-    document_summary = _document_summary(documents)
+
+def render_summaries_pdf(register: Register, schedule_summary: str, document_summary: str) -> bytes:
+    """Lay out already collected summaries as PDF bytes without touching the database."""
 
     if HAS_WEASYPRINT:
         template = loader.get_template("registers/register_pdf.html")
@@ -83,3 +85,9 @@ def render_register_pdf(register: Register) -> bytes:
     pdf.showPage()
     pdf.save()
     return buffer.getvalue()
+
+
+def render_register_pdf(register: Register) -> bytes:
+    """Render a single page PDF summarising a register."""
+
+    return render_summaries_pdf(register, *collect_register_summaries(register))
@@ -0,0 +1,63 @@
+"""First-page thumbnails for scanned documents using Pillow when available.
+
+Rendering runs in worker processes started by the ``generate_previews``
+command, so this module deliberately avoids importing models: the pool only
+ever receives file paths.
+"""
+
+from __future__ import annotations
+
+import os
+
+try:  # pragma: no cover - optional dependency
+    from PIL import Image, UnidentifiedImageError
+
+    HAS_PILLOW = True
+except (ImportError, ModuleNotFoundError):  # pragma: no cover - gracefully fall back
+    HAS_PILLOW = False
+
+PREVIEW_SUFFIX = ".preview.png"
+THUMBNAIL_SIZE = (256, 256)
+
+
+class PreviewUnsupported(Exception):
+    """The file is not an image format that can be previewed."""
+
+
+def preview_name(file_name: str) -> str:
+    """Storage name of the cached preview, kept beside the source blob."""
+
+    return f"{file_name}{PREVIEW_SUFFIX}"
+
+
+def render_thumbnail(source: str, destination: str, size: tuple[int, int] = THUMBNAIL_SIZE) -> None:
+    """Write a PNG thumbnail of the first page of ``source`` to ``destination``."""
+
+    if not HAS_PILLOW:
+        raise PreviewUnsupported("Pillow is not installed.")
+    try:
+        image = Image.open(source)
+    except UnidentifiedImageError as exc:
+        raise PreviewUnsupported(f"Unrecognised image format: {exc}") from exc
+
+    with image:
+        image.seek(0)
+        # Lets JPEG decoders downscale while decoding instead of afterwards.
+        image.draft("RGB", size)
+        frame = image.convert("RGB")
+        frame.thumbnail(size)
+        partial = f"{destination}.incoming"
+        frame.save(partial, "PNG", optimize=True)
+    os.replace(partial, destination)
+
+
+def render_job(job_id: int, source: str, destination: str) -> tuple[int, str, str]:
+    """Process-pool entry point returning ``(job_id, status, error)``."""
+
+    try:
+        render_thumbnail(source, destination)
+    except PreviewUnsupported as exc:
+        return job_id, "unsupported", str(exc)
+    except Exception as exc:  # pragma: no cover - reported back to the job row
+        return job_id, "failed", f"{exc.__class__.__name__}: {exc}"
+    return job_id, "done", ""
@@ -0,0 +1,81 @@
+"""Materialize schedule entries from recurrence rules over a rolling horizon.
+
+Each rule remembers the last date it was materialized through, so a run only
+generates the dates between that watermark and the end of the horizon and
+never looks at earlier history. Entries are inserted in bulk with
+``ignore_conflicts`` against the rule/date unique constraint, which makes an
+interrupted or concurrent run safe to repeat.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_after_bulk_write
+from .models import RecurrenceRule, ScheduleEntry
+from .transactions import write_atomic
+
+DEFAULT_HORIZON_DAYS = 60
+INSERT_BATCH_SIZE = 500
+
+
+def materialize_rule(rule: RecurrenceRule, through: date, *, today: date) -> int:
+    """Create the rule's entries up to ``through``; returns how many were inserted."""
+
+    # Past dates are never backfilled: not for new rules, nor for rules that
+    # are reactivated or were skipped for a while.
+    start = max(rule.starts_on, today)
+    if rule.materialized_through:
+        start = max(start, rule.materialized_through + timedelta(days=1))
+
+    existing = set(
+        rule.schedule_entries.filter(scheduled_for__range=(start, through)).values_list(
+            "scheduled_for", flat=True
+        )
+    )
+    entries = [
+        ScheduleEntry(
+            register_id=rule.register_id,
+            bundle_type=rule.bundle_type,
+            scheduled_for=day,
+            recurrence_rule=rule,
+        )
+        for day in rule.occurrences(start, through)
+        if day not in existing
+    ]
+    ScheduleEntry.objects.bulk_create(
+        entries, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True
+    )
+    RecurrenceRule.objects.filter(pk=rule.pk).update(
+        materialized_through=through, updated_at=timezone.now()
+    )
+    if entries:
+        invalidate_after_bulk_write([rule.register_id])
+    return len(entries)
+
+
+def materialize_rules(*, days: int = DEFAULT_HORIZON_DAYS, today: date | None = None) -> int:
+    """Extend every active rule to ``today + days``; returns the number of entries inserted."""
+
+    today = today or timezone.localdate()
+    through = today + timedelta(days=days)
+    pending = RecurrenceRule.objects.filter(is_active=True).filter(
+        Q(materialized_through__isnull=True) | Q(materialized_through__lt=through)
+    )
+
+    inserted = 0
+    for rule_id in pending.values_list("pk", flat=True).iterator():
+        with write_atomic():
+            # Skip rules another node is materializing right now.
+            rule = (
+                RecurrenceRule.objects.select_for_update(skip_locked=True)
+                .filter(pk=rule_id, is_active=True)
+                .first()
+            )
+            if rule is None or (rule.materialized_through and rule.materialized_through >= through):
+                continue
+            inserted += materialize_rule(rule, through, today=today)
+    return inserted
@@ -0,0 +1,146 @@
+"""Deliver due reminders in batches through a pluggable backend.
+
+Each batch is claimed in a short transaction: the rows are selected with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and stamped with ``claimed_at`` and a
+per-run ``claimed_by`` token, then the transaction commits so no lock is
+held during delivery. Other runs skip claimed reminders, so several nodes
+running ``dispatch_reminders`` at once never send the same reminder twice.
+Delivery happens in a thread pool without touching the database, and the
+successful reminders of a batch are marked sent with a single UPDATE.
+Failed reminders are released and retried by the next run; claims older
+than ``REMINDER_CLAIM_TIMEOUT`` seconds, left by a worker that crashed, are
+treated as free again.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import send_mail
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .cache import invalidate_after_bulk_write
+from .models import Reminder
+from .transactions import write_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "registers.reminders.EmailReminderBackend"
+
+
+class ReminderBackend:
+    """Delivers a single reminder; raise to leave it pending for a retry.
+
+    ``send`` is called from worker threads with the reminder and its register
+    already loaded, and must not query the database.
+    """
+
+    def send(self, reminder: Reminder) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class EmailReminderBackend(ReminderBackend):
+    """Email reminders to ``REMINDER_RECIPIENTS`` via Django's email backend.
+
+    With the locmem or file email backends this doubles as a local stand-in
+    for real delivery. Without recipients the backend cannot be created, so
+    a misconfigured run stops before claiming any reminder.
+    """
+
+    def __init__(self, recipients: list[str] | None = None) -> None:
+        if recipients is None:
+            recipients = list(getattr(settings, "REMINDER_RECIPIENTS", []))
+        if not recipients:
+            raise ImproperlyConfigured("REMINDER_RECIPIENTS is empty; set it to send reminders.")
+        self.recipients = recipients
+
+    def send(self, reminder: Reminder) -> None:
+        send_mail(
+            subject=f"Reminder: {reminder.register.name}",
+            message=reminder.message,
+            from_email=None,
+            recipient_list=self.recipients,
+        )
+
+
+def get_backend(path: str | None = None) -> ReminderBackend:
+    path = path or getattr(settings, "REMINDER_BACKEND", DEFAULT_BACKEND)
+    return import_string(path)()
+
+
+def _deliver(backend: ReminderBackend, reminder: Reminder) -> bool:
+    try:
+        backend.send(reminder)
+    except Exception:
+        logger.exception("Delivering reminder %s failed", reminder.pk)
+        return False
+    return True
+
+
+def claim_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, "REMINDER_CLAIM_TIMEOUT", 15 * 60))
+
+
+def _claim_batch(
+    token: uuid.UUID, now: datetime, batch_size: int, skip: set[int]
+) -> list[Reminder]:
+    claimed_at = timezone.now()
+    with write_atomic():
+        pks = list(
+            Reminder.objects.select_for_update(skip_locked=True)
+            .filter(is_sent=False, remind_at__lte=now)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=claimed_at - claim_timeout()))
+            # Failures stay pending for the next run, not this one.
+            .exclude(pk__in=skip)
+            .order_by("remind_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        Reminder.objects.filter(pk__in=pks).update(claimed_at=claimed_at, claimed_by=token)
+    return list(
+        Reminder.objects.select_related("register")
+        .filter(pk__in=pks, claimed_by=token)
+        .order_by("remind_at", "pk")
+    )
+
+
+def dispatch_due_reminders(
+    *,
+    backend: ReminderBackend | None = None,
+    batch_size: int = 100,
+    workers: int = 4,
+    now: datetime | None = None,
+) -> tuple[int, int]:
+    """Send every reminder due by ``now``; returns ``(sent, failed)`` counts."""
+
+    backend = backend or get_backend()
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    failed_ids: set[int] = set()
+    sent = 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminders") as pool:
+        while batch := _claim_batch(token, now, batch_size, failed_ids):
+            outcomes = pool.map(lambda reminder: _deliver(backend, reminder), batch)
+            delivered, failed = [], []
+            for reminder, ok in zip(batch, outcomes):
+                (delivered if ok else failed).append(reminder)
+            if delivered:
+                Reminder.objects.filter(pk__in=[r.pk for r in delivered]).update(
+                    is_sent=True, claimed_at=None, claimed_by=None, updated_at=timezone.now()
+                )
+                invalidate_after_bulk_write(r.register_id for r in delivered)
+            if failed:
+                failed_ids.update(r.pk for r in failed)
+                Reminder.objects.filter(pk__in=[r.pk for r in failed], claimed_by=token).update(
+                    claimed_at=None, claimed_by=None
+                )
+            sent += len(delivered)
+
+    return sent, len(failed_ids)
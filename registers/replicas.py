@@ -0,0 +1,137 @@
+"""Route reads of selected views to a read replica.
+
+Views decorated with :func:`read_from_replica` send their queries to the
+database alias named by the ``DATABASE_READ_REPLICA`` setting; everything
+else, and every write, stays on ``default``. A client that has just written
+carries a short-lived cookie set by :func:`replica_stickiness_middleware`,
+and its reads go to the primary until the cookie expires so it never sees
+its own change missing because of replication lag.
+
+Responses cached by :mod:`registers.cache` are keyed on the alias they
+were read from, so pinned clients never get a copy read from the replica;
+replica copies may trail the primary by up to the replication lag until
+their entry expires.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+STICKY_COOKIE = "db_primary_until"
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+_read_alias: ContextVar[str | None] = ContextVar("registers_read_alias", default=None)
+
+
+def replica_alias() -> str | None:
+    """The configured replica alias, or ``None`` when reads stay on the primary."""
+
+    alias = getattr(settings, "DATABASE_READ_REPLICA", "")
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def current_read_alias() -> str:
+    """The alias reads of the current request go to."""
+
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+def _sticky_seconds() -> int:
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 15)
+
+
+def is_pinned_to_primary(request: HttpRequest) -> bool:
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _alias_for(request: HttpRequest) -> str | None:
+    if is_pinned_to_primary(request):
+        return None
+    return replica_alias()
+
+
+def read_from_replica(view):
+    """Send the view's queries to the replica unless the client just wrote."""
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            # Async ORM calls run in sync_to_async, which copies this context.
+            token = _read_alias.set(_alias_for(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        token = _read_alias.set(_alias_for(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+def _pin(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    if request.method in UNSAFE_METHODS and response.status_code < 400 and replica_alias():
+        seconds = _sticky_seconds()
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(int(time.time()) + seconds),
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_stickiness_middleware(get_response):
+    """Pin a client's reads to the primary for a while after it writes."""
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request: HttpRequest) -> HttpResponse:
+            return _pin(request, await get_response(request))
+
+    else:
+
+        def middleware(request: HttpRequest) -> HttpResponse:
+            return _pin(request, get_response(request))
+
+    return middleware
+
+
+class ReplicaRouter:
+    """Read from the replica inside :func:`read_from_replica`, write to the primary."""
+
+    def db_for_read(self, model, **hints) -> str | None:
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints) -> str | None:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        # The replica holds the same rows, so objects from either side relate.
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,107 @@
+"""Daily completion rollups maintained incrementally from ``updated_at``.
+
+A refresh recomputes whole days, but only days that changed: days holding
+an entry whose ``updated_at`` is newer than the previous refresh (minus a
+safety window for transactions that committed late), plus days recorded in
+:class:`StaleRollupDay` by deletions and reschedules. Days that have passed
+since the previous refresh get their outstanding entries counted as overdue
+with a single UPDATE. ``full=True`` rebuilds the table from scratch.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from django.db.models import Count, F, Q, QuerySet
+from django.utils import timezone
+
+from .models import CompletionRollup, RollupState, ScheduleEntry, StaleRollupDay
+from .transactions import write_atomic
+
+ROLLUP_NAME = "completion"
+SAFETY_WINDOW = timedelta(minutes=5)
+DAY_BATCH_SIZE = 200
+INSERT_BATCH_SIZE = 500
+
+
+def _grouped_counts(entries: QuerySet[ScheduleEntry]) -> QuerySet:
+    return (
+        entries.order_by()
+        .values("register_id", "bundle_type", "scheduled_for")
+        .annotate(scheduled=Count("id"), completed=Count("id", filter=Q(completed=True)))
+    )
+
+
+def _rollups(rows: Iterable[dict], today: date) -> Iterable[CompletionRollup]:
+    for row in rows:
+        day = row["scheduled_for"]
+        yield CompletionRollup(
+            register_id=row["register_id"],
+            bundle_type=row["bundle_type"],
+            day=day,
+            scheduled=row["scheduled"],
+            completed=row["completed"],
+            overdue=row["scheduled"] - row["completed"] if day < today else 0,
+        )
+
+
+def _recompute_days(days: Iterable[date], today: date) -> None:
+    ordered = sorted(days)
+    for start in range(0, len(ordered), DAY_BATCH_SIZE):
+        batch = ordered[start : start + DAY_BATCH_SIZE]
+        rows = _grouped_counts(ScheduleEntry.objects.filter(scheduled_for__in=batch))
+        CompletionRollup.objects.filter(day__in=batch).delete()
+        CompletionRollup.objects.bulk_create(_rollups(rows, today), batch_size=INSERT_BATCH_SIZE)
+
+
+def _rebuild(today: date) -> None:
+    CompletionRollup.objects.all().delete()
+    StaleRollupDay.objects.all().delete()
+    rows = _grouped_counts(ScheduleEntry.objects.all()).iterator(chunk_size=INSERT_BATCH_SIZE)
+    CompletionRollup.objects.bulk_create(_rollups(rows, today), batch_size=INSERT_BATCH_SIZE)
+
+
+def refresh_rollups(*, full: bool = False, now: datetime | None = None) -> int | None:
+    """Bring the rollup table up to date.
+
+    Returns the number of days recomputed, or ``None`` after a full rebuild.
+    """
+
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    with write_atomic():
+        # The row lock serialises refreshes running on several nodes.
+        state, _ = RollupState.objects.select_for_update().get_or_create(name=ROLLUP_NAME)
+        if full or state.refreshed_at is None:
+            _rebuild(today)
+            recomputed = None
+        else:
+            days = set(
+                ScheduleEntry.objects.filter(updated_at__gte=state.refreshed_at - SAFETY_WINDOW)
+                .order_by()
+                .values_list("scheduled_for", flat=True)
+                .distinct()
+            )
+            stale = list(StaleRollupDay.objects.values_list("pk", "day"))
+            days.update(day for _, day in stale)
+            _recompute_days(days, today)
+            if stale:
+                # Days marked while this refresh ran have higher ids and stay queued.
+                StaleRollupDay.objects.filter(pk__lte=max(pk for pk, _ in stale)).delete()
+            if state.refreshed_on and state.refreshed_on < today:
+                CompletionRollup.objects.filter(
+                    day__gte=state.refreshed_on, day__lt=today
+                ).update(overdue=F("scheduled") - F("completed"))
+            recomputed = len(days)
+
+        state.refreshed_at = now
+        state.refreshed_on = today
+        state.save(update_fields=["refreshed_at", "refreshed_on"])
+    return recomputed
+
+
+def last_refreshed_at() -> datetime | None:
+    return (
+        RollupState.objects.filter(name=ROLLUP_NAME).values_list("refreshed_at", flat=True).first()
+    )
@@ -0,0 +1,126 @@
+"""Projection-based serialization for the JSON list endpoints.
+
+A :class:`Projection` declares the output fields of an endpoint as ORM
+lookups or expressions. Rows are read with ``values_list()`` so no model
+instances are built, and turned into dicts by a builder prepared once per
+projection. :func:`json_response` encodes the payload with a module-level
+encoder instead of constructing one per response like ``JsonResponse``.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Union
+
+from django.db.models import Expression, QuerySet
+from django.http import HttpRequest, HttpResponse
+
+Field = Union[str, Expression]
+FieldSpec = dict[str, Union[Field, "FieldSpec"]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Built once: the C encoder is used because neither indent nor sort_keys is set.
+ENCODER = json.JSONEncoder(default=_default, ensure_ascii=False)
+
+
+def json_response(payload: Any, *, status: int = 200) -> HttpResponse:
+    return HttpResponse(
+        ENCODER.encode(payload).encode("utf-8"),
+        status=status,
+        content_type="application/json",
+    )
+
+
+class FieldSelectionError(ValueError):
+    """A ``fields`` parameter named fields the endpoint does not have."""
+
+
+class Projection:
+    """Output shape of one endpoint, mapping field names to lookups.
+
+    Values are lookups such as ``"register__name"``, expressions such as
+    ``Count(...)``, or nested dicts of either, which become nested objects.
+    """
+
+    def __init__(self, fields: FieldSpec) -> None:
+        self.fields = fields
+        self.columns: list[Field] = []
+        self._build = self._builder(fields)
+        self._selections: dict[frozenset[str], Projection] = {}
+
+    def select(self, names: Iterable[str]) -> Projection:
+        """The projection restricted to the top-level fields in ``names``.
+
+        Lookups of fields left out are not selected either, so joins only
+        they needed disappear from the query.
+        """
+
+        wanted = frozenset(names)
+        unknown = wanted - self.fields.keys()
+        if unknown:
+            raise FieldSelectionError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. "
+                f"Choose from: {', '.join(self.fields)}."
+            )
+        if wanted == self.fields.keys():
+            return self
+        if wanted not in self._selections:
+            self._selections[wanted] = Projection(
+                {name: field for name, field in self.fields.items() if name in wanted}
+            )
+        return self._selections[wanted]
+
+    def for_request(self, request: HttpRequest) -> Projection:
+        """Apply a comma separated ``fields`` query parameter, if given."""
+
+        names = [name.strip() for name in request.GET.get("fields", "").split(",")]
+        names = [name for name in names if name]
+        return self.select(names) if names else self
+
+    def _builder(self, fields: FieldSpec) -> Callable[[tuple], dict[str, Any]]:
+        parts: list[tuple[str, Any]] = []
+        for name, field in fields.items():
+            if isinstance(field, dict):
+                parts.append((name, self._builder(field)))
+            else:
+                parts.append((name, len(self.columns)))
+                self.columns.append(field)
+
+        if all(isinstance(part, int) for _, part in parts):
+            names = [name for name, _ in parts]
+            positions = [part for _, part in parts]
+            if positions == list(range(positions[0], positions[0] + len(positions))):
+                start, stop = positions[0], positions[0] + len(positions)
+                return lambda row: dict(zip(names, row[start:stop]))
+        return lambda row: {
+            name: part(row) if callable(part) else row[part] for name, part in parts
+        }
+
+    def queryset(self, qs: QuerySet) -> QuerySet:
+        # Expressions such as aggregates need an alias to be selected.
+        annotations = {
+            f"projection_{index}": column
+            for index, column in enumerate(self.columns)
+            if not isinstance(column, str)
+        }
+        lookups = [
+            column if isinstance(column, str) else f"projection_{index}"
+            for index, column in enumerate(self.columns)
+        ]
+        return qs.annotate(**annotations).values_list(*lookups)
+
+    def rows(self, qs: QuerySet) -> list[dict[str, Any]]:
+        return [self._build(row) for row in self.queryset(qs)]
+
+    async def arows(self, qs: QuerySet) -> list[dict[str, Any]]:
+        return [self._build(row) async for row in self.queryset(qs)]
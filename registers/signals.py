@@ -0,0 +1,81 @@
+"""Signal handlers for the registers application."""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import typeahead
+from .cache import bump_generations
+from .events import notify_reminder_saved
+from .models import (
+    Document,
+    DocumentVersion,
+    Register,
+    Reminder,
+    ScheduleEntry,
+    StaleRollupDay,
+    StoredBlob,
+    Tombstone,
+)
+from .sync import SOURCE_NAMES
+
+
+@receiver(post_delete, sender=DocumentVersion)
+def release_document_blob(sender, instance: DocumentVersion, **kwargs) -> None:
+    if instance.sha256:
+        StoredBlob.release(instance.sha256)
+
+
+@receiver(post_save, sender=Reminder)
+def announce_reminder(sender, instance: Reminder, **kwargs) -> None:
+    transaction.on_commit(lambda: notify_reminder_saved(instance.pk))
+
+
+@receiver(post_save, sender=ScheduleEntry)
+def mark_rescheduled_day_stale(sender, instance: ScheduleEntry, created: bool, **kwargs) -> None:
+    previous = getattr(instance, "_stored_scheduled_for", None)
+    if not created and previous and previous != instance.scheduled_for:
+        StaleRollupDay.mark(previous)
+    instance._stored_scheduled_for = instance.scheduled_for
+
+
+@receiver(post_delete, sender=ScheduleEntry)
+def mark_deleted_day_stale(sender, instance: ScheduleEntry, **kwargs) -> None:
+    StaleRollupDay.mark(instance.scheduled_for)
+
+
+@receiver(post_delete, sender=Register)
+@receiver(post_delete, sender=ScheduleEntry)
+@receiver(post_delete, sender=Reminder)
+@receiver(post_delete, sender=Document)
+def record_tombstone(sender, instance, **kwargs) -> None:
+    Tombstone.objects.create(model=SOURCE_NAMES[sender], object_id=instance.pk)
+
+
+@receiver(post_save, sender=Register)
+@receiver(post_delete, sender=Register)
+def invalidate_register_cache(sender, instance: Register, **kwargs) -> None:
+    bump_generations([instance.pk])
+
+
+@receiver(post_save, sender=Register)
+@receiver(post_delete, sender=Register)
+def invalidate_typeahead_index(sender, instance: Register, update_fields=None, **kwargs) -> None:
+    # Saves that leave the name alone keep the index valid.
+    if update_fields is not None and "name" not in update_fields:
+        return
+    typeahead.mark_changed([instance.pk])
+
+
+@receiver(post_save, sender=ScheduleEntry)
+@receiver(post_delete, sender=ScheduleEntry)
+@receiver(post_save, sender=Reminder)
+@receiver(post_delete, sender=Reminder)
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_related_register_cache(sender, instance, **kwargs) -> None:
+    # A moved row also changes the lists of the register it left.
+    bump_generations([instance.register_id, getattr(instance, "_stored_register_id", None)])
+    instance._stored_register_id = instance.register_id
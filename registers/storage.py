@@ -0,0 +1,109 @@
+"""Content-addressed file storage for document scans."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator
+
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+from .transactions import write_atomic
+
+BLOB_PREFIX = "blobs"
+
+
+def file_sha256(content: File) -> str:
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store each distinct file once, keyed by its SHA-256 digest.
+
+    Blobs live under ``blobs/<aa>/<bb>/<digest>`` so no single directory grows
+    unbounded. Saving content that is already present returns the existing
+    name without writing anything; reference counting of shared blobs is
+    handled by :class:`registers.models.StoredBlob`, whose garbage collection
+    is the only thing that deletes blobs.
+    """
+
+    def blob_name(self, sha256: str) -> str:
+        return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def digest_from_name(self, name: str) -> str:
+        """Return the digest encoded in a blob name, or ``""`` for legacy paths."""
+
+        if not name or not name.startswith(f"{BLOB_PREFIX}/"):
+            return ""
+        return name.rsplit("/", 1)[-1]
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        # Chunked uploads already hashed their bytes while receiving them.
+        sha256 = getattr(content, "sha256", "") or file_sha256(content)
+        blob = self.blob_name(sha256)
+        from .models import StoredBlob  # models imports this module
+
+        # Hold the blob's row while deciding whether to skip the write, so a
+        # garbage collection cannot delete the file between the check and the
+        # caller retaining it.
+        with write_atomic():
+            StoredBlob.claim(sha256, content.size)
+            if not self.exists(blob):
+                self._write_blob(blob, content)
+        return blob
+
+    def iter_blobs(self) -> Iterator[tuple[str, datetime]]:
+        """Yield ``(digest, modified_at)`` for every blob file on disk."""
+
+        for directory, _, files in os.walk(self.path(BLOB_PREFIX)):
+            for filename in files:
+                # Previews and half-written temporaries carry a suffix.
+                if "." in filename:
+                    continue
+                modified = os.path.getmtime(os.path.join(directory, filename))
+                yield filename, datetime.fromtimestamp(modified, tz=timezone.utc)
+
+    def _write_blob(self, name: str, content: File) -> None:
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        if hasattr(content, "temporary_file_path"):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            # Write beside the target and rename so readers never observe a
+            # half-written blob; concurrent writers of the same digest produce
+            # identical bytes, so whichever rename lands last is harmless.
+            temp_path = f"{full_path}.{uuid.uuid4().hex}.incoming"
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+            fd = os.open(temp_path, flags, 0o666)
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    for chunk in content.chunks():
+                        handle.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+                os.replace(temp_path, full_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+
+document_storage = ContentAddressedStorage()
+
+
+def get_document_storage() -> ContentAddressedStorage:
+    return document_storage
@@ -0,0 +1,235 @@
+"""Delta sync of registers, schedule entries, reminders and documents.
+
+Every collection is read in ``(updated_at, id)`` order from its index,
+starting after the position stored for it in the client's cursor, and
+deletions come from :class:`~registers.models.Tombstone` rows in
+``(deleted_at, id)`` order. The cursor is an opaque token holding one
+position per collection, so a sync costs the size of the delta.
+
+Rows changed within the last ``SYNC_SAFETY_LAG`` seconds are held back
+until the next request: ``updated_at`` is set before a transaction
+commits, so a row from a slow transaction could otherwise become visible
+behind a cursor that has already moved past it. The lag must exceed the
+longest write transaction and any replica lag.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import Document, Register, Reminder, ScheduleEntry, Tombstone
+from .serializers import Projection
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+DELETIONS = "deleted"
+
+Position = tuple[datetime, int]
+
+
+class SyncSource(NamedTuple):
+    model: type[models.Model]
+    projection: Projection
+
+
+SOURCES: dict[str, SyncSource] = {
+    "registers": SyncSource(
+        Register,
+        Projection(
+            {
+                "id": "id",
+                "name": "name",
+                "description": "description",
+                "is_active": "is_active",
+                "updated_at": "updated_at",
+            }
+        ),
+    ),
+    "schedule_entries": SyncSource(
+        ScheduleEntry,
+        Projection(
+            {
+                "id": "id",
+                "register_id": "register_id",
+                "bundle_type": "bundle_type",
+                "scheduled_for": "scheduled_for",
+                "completed": "completed",
+                "completed_at": "completed_at",
+                "notes": "notes",
+                "updated_at": "updated_at",
+            }
+        ),
+    ),
+    "reminders": SyncSource(
+        Reminder,
+        Projection(
+            {
+                "id": "id",
+                "register_id": "register_id",
+                "schedule_entry_id": "schedule_entry_id",
+                "remind_at": "remind_at",
+                "message": "message",
+                "is_sent": "is_sent",
+                "updated_at": "updated_at",
+            }
+        ),
+    ),
+    "documents": SyncSource(
+        Document,
+        Projection(
+            {
+                "id": "id",
+                "register_id": "register_id",
+                "title": "title",
+                "description": "description",
+                "updated_at": "updated_at",
+            }
+        ),
+    ),
+}
+SOURCE_NAMES = {source.model: name for name, source in SOURCES.items()}
+TOMBSTONES = Projection(
+    {"id": "id", "model": "model", "object_id": "object_id", "at": "deleted_at"}
+)
+
+
+class InvalidCursor(ValueError):
+    """The cursor token could not be decoded."""
+
+
+class ExpiredCursor(Exception):
+    """The cursor is older than the retained tombstones."""
+
+
+def encode_cursor(cursor: dict[str, Position]) -> str:
+    data = {name: [at.isoformat(), pk] for name, (at, pk) in cursor.items()}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(token: str) -> dict[str, Position]:
+    if not token:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+        cursor = {}
+        for name, (at, pk) in data.items():
+            if name not in SOURCES and name != DELETIONS:
+                raise InvalidCursor(f"unknown collection {name!r}")
+            cursor[name] = (datetime.fromisoformat(at), int(pk))
+        return cursor
+    except (binascii.Error, UnicodeDecodeError, AttributeError, TypeError, ValueError) as exc:
+        raise InvalidCursor("The cursor is not valid.") from exc
+
+
+def safety_lag() -> timedelta:
+    return timedelta(seconds=getattr(settings, "SYNC_SAFETY_LAG", 5))
+
+
+def tombstone_ttl() -> timedelta:
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", 90))
+
+
+def _after(qs: models.QuerySet, field: str, position: Position | None) -> models.QuerySet:
+    if position is None:
+        return qs
+    at, pk = position
+    # A range on the leading index column, then a cheap filter for ties.
+    return qs.filter(**{f"{field}__gte": at}).exclude(**{field: at, "id__lte": pk})
+
+
+async def _page(
+    projection: Projection,
+    qs: models.QuerySet,
+    field: str,
+    position: Position | None,
+    horizon: datetime,
+    limit: int,
+) -> tuple[list[dict[str, Any]], bool]:
+    qs = _after(qs, field, position).filter(**{f"{field}__lt": horizon})
+    rows = await projection.arows(qs.order_by(field, "id")[: limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+async def _tombstones_purged_after(position: Position, now: datetime) -> bool:
+    """Whether tombstones the client has not seen yet may have been purged.
+
+    Purging removes every tombstone older than ``now - SYNC_TOMBSTONE_DAYS``,
+    so a position newer than that is always safe, and so is an older one
+    while a tombstone at or before it is still retained.
+    """
+
+    at, _ = position
+    if at >= now - tombstone_ttl():
+        return False
+    oldest = await (
+        Tombstone.objects.order_by("deleted_at", "id").values_list("deleted_at", flat=True).afirst()
+    )
+    return oldest is None or oldest > at
+
+
+async def changes_since(
+    cursor: dict[str, Position], *, limit: int = DEFAULT_LIMIT, now: datetime | None = None
+) -> dict[str, Any]:
+    """One page of changes after ``cursor``, with the cursor for the next page.
+
+    Each collection contributes up to ``limit`` rows; ``has_more`` tells the
+    client to ask again straight away with the new cursor.
+    """
+
+    now = now or timezone.now()
+    horizon = now - safety_lag()
+    if DELETIONS in cursor and await _tombstones_purged_after(cursor[DELETIONS], now):
+        raise ExpiredCursor()
+
+    next_cursor = dict(cursor)
+    # A first sync only needs deletions that happen while it is paging.
+    next_cursor.setdefault(DELETIONS, (horizon, 0))
+    has_more = False
+    changes = {}
+    for name, source in SOURCES.items():
+        rows, more = await _page(
+            source.projection,
+            source.model._default_manager.all(),
+            "updated_at",
+            cursor.get(name),
+            horizon,
+            limit,
+        )
+        if rows:
+            next_cursor[name] = (rows[-1]["updated_at"], rows[-1]["id"])
+        changes[name] = rows
+        has_more |= more
+
+    tombstones, more = await _page(
+        TOMBSTONES, Tombstone.objects.all(), "deleted_at", next_cursor[DELETIONS], horizon, limit
+    )
+    if more:
+        next_cursor[DELETIONS] = (tombstones[-1]["at"], tombstones[-1]["id"])
+    elif next_cursor[DELETIONS][0] < horizon:
+        # Every tombstone before the horizon has been sent, so skip ahead to it;
+        # otherwise a client that sees no deletions would age out of the TTL.
+        next_cursor[DELETIONS] = (horizon, 0)
+    has_more |= more
+    deleted: dict[str, list[int]] = {name: [] for name in SOURCES}
+    for tombstone in tombstones:
+        deleted[tombstone["model"]].append(tombstone["object_id"])
+
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "cursor": encode_cursor(next_cursor),
+        "has_more": has_more,
+    }
+
+
+def purge_tombstones() -> int:
+    cutoff = timezone.now() - tombstone_ttl()
+    return Tombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
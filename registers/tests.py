@@ -1,29 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import gzip
+import hashlib
+import json
 import shutil
 import tempfile
+import threading
+import time
+import uuid
 import zipfile
+from io import BytesIO, StringIO
+from datetime import date, timedelta
 from pathlib import Path
+from unittest import mock, skipUnless
 
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.core.management import call_command
-from django.test import TestCase, override_settings
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Count, Q, QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
+from PIL import Image
 
+from .admin import EstimatedCountPaginator
+from .admission import AdmissionLimiter, Rejected
+from .events import ReminderBroadcaster, _LoopChannel, fetch_reminder_events, format_event
 from .forms import DigitalEntryForm, RegisterSearchForm
 from .models import (
     ActivityLog,
+    CompletionRollup,
     Document,
     DocumentVersion,
+    IdempotencyRecord,
+    PreviewJob,
+    RecurrenceRule,
     Register,
     Reminder,
     ScheduleEntry,
+    StoredBlob,
+    Tombstone,
+    UploadSession,
 )
 from .pdf import render_register_pdf
+from .imports import import_csv
+from .recurrence import materialize_rules
+from .rollups import refresh_rollups
+from .reminders import ReminderBackend, dispatch_due_reminders
+from .replicas import STICKY_COOKIE
+from .serializers import Projection, json_response
+from .sync import changes_since, decode_cursor, encode_cursor
+from .transactions import write_atomic
+from . import typeahead
+from .typeahead import TrigramIndex, trigrams
+from .uploads import UploadOffsetMismatch, partial_path, write_chunk
 
 
 class MediaRootCleanupMixin:
@@ -194,6 +232,1911 @@ class ActivityLogIntegrationTests(MediaRootCleanupMixin, TestCase):
         )
 
 
+@override_settings(MEDIA_ROOT=settings.BASE_DIR / "test_media")
+class ContentAddressedStorageTests(MediaRootCleanupMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        register = Register.objects.create(name="Blob Register")
+        self.document = Document.objects.create(register=register, title="Permit")
+
+    def test_identical_uploads_share_one_sharded_blob(self) -> None:
+        first = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("scan.pdf", b"same scan")
+        )
+        second = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("rescan.pdf", b"same scan")
+        )
+
+        digest = hashlib.sha256(b"same scan").hexdigest()
+        self.assertEqual(first.file.name, f"blobs/{digest[:2]}/{digest[2:4]}/{digest}")
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(second.filename, "rescan.pdf")
+        self.assertEqual(StoredBlob.objects.get(sha256=digest).ref_count, 2)
+        self.assertEqual(len(list(Path(first.file.path).parent.iterdir())), 1)
+
+    def test_blob_is_collected_after_its_last_reference(self) -> None:
+        first = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("scan.pdf", b"shared")
+        )
+        second = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("scan.pdf", b"shared")
+        )
+        blob_path = Path(first.file.path)
+
+        first.delete()
+        self.assertEqual(StoredBlob.collect_garbage(grace=timedelta(0)), 0)
+        self.assertTrue(blob_path.exists())
+        self.assertEqual(StoredBlob.objects.get(sha256=second.sha256).ref_count, 1)
+
+        second.delete()
+        self.assertTrue(blob_path.exists())
+        self.assertEqual(StoredBlob.collect_garbage(grace=timedelta(0)), 1)
+        self.assertFalse(blob_path.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_unreferenced_blob_survives_the_grace_period(self) -> None:
+        version = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("scan.pdf", b"re-uploaded")
+        )
+        blob_path = Path(version.file.path)
+        version.delete()
+
+        # An upload of the same bytes claims the row before it commits a reference.
+        self.assertEqual(StoredBlob.collect_garbage(), 0)
+        self.assertTrue(blob_path.exists())
+
+    def test_blob_from_a_rolled_back_save_is_collected(self) -> None:
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            version = DocumentVersion.objects.create(
+                document=self.document, file=SimpleUploadedFile("scan.pdf", b"abandoned")
+            )
+            raise RuntimeError("request failed")
+        blob_path = Path(version.file.path)
+        self.assertTrue(blob_path.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+        call_command("collect_blobs", stdout=StringIO())
+        self.assertTrue(blob_path.exists())
+
+        with override_settings(BLOB_GC_GRACE=0):
+            call_command("collect_blobs", stdout=StringIO())
+        self.assertFalse(blob_path.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=settings.BASE_DIR / "test_media", DOCUMENT_DOWNLOAD_ACCEL="")
+class DocumentDownloadTests(MediaRootCleanupMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        register = Register.objects.create(name="Download Register")
+        document = Document.objects.create(register=register, title="Deed")
+        self.version = DocumentVersion.objects.create(
+            document=document, file=SimpleUploadedFile("deed.pdf", b"0123456789")
+        )
+        self.url = reverse("registers:document-download", args=[self.version.pk])
+
+    def test_full_download_sends_strong_etag(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["ETag"], f'"{self.version.sha256}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("deed.pdf", response["Content-Disposition"])
+
+    def test_matching_if_none_match_returns_not_modified(self) -> None:
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.version.sha256}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests_return_partial_content(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+
+        suffix = self.client.get(self.url, HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(suffix.streaming_content), b"789")
+
+        unsatisfiable = self.client.get(self.url, HTTP_RANGE="bytes=20-")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable["Content-Range"], "bytes */10")
+
+    def test_stale_if_range_serves_whole_file(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DOCUMENT_DOWNLOAD_ACCEL="nginx", DOCUMENT_ACCEL_REDIRECT_PREFIX="/protected/")
+    def test_nginx_acceleration_delegates_transfer(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected/{self.version.file.name}")
+
+
+@override_settings(MEDIA_ROOT=settings.BASE_DIR / "test_media")
+class DocumentPreviewTests(MediaRootCleanupMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        register = Register.objects.create(name="Preview Register")
+        self.document = Document.objects.create(register=register, title="Survey")
+
+    def _tiff_upload(self, colour: str) -> SimpleUploadedFile:
+        buffer = tempfile.SpooledTemporaryFile()
+        pages = [Image.new("RGB", (1200, 1600), colour), Image.new("RGB", (1200, 1600), "white")]
+        pages[0].save(buffer, "TIFF", save_all=True, append_images=pages[1:])
+        buffer.seek(0)
+        return SimpleUploadedFile("survey.tiff", buffer.read(), content_type="image/tiff")
+
+    def test_upload_only_queues_preview_job(self) -> None:
+        version = DocumentVersion.objects.create(document=self.document, file=self._tiff_upload("red"))
+
+        self.assertEqual(version.preview_job.status, PreviewJob.PENDING)
+        self.assertFalse(version.has_preview())
+        response = self.client.get(reverse("registers:document-preview", args=[version.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["status"], PreviewJob.PENDING)
+
+    def test_worker_renders_first_page_thumbnail_in_process_pool(self) -> None:
+        version = DocumentVersion.objects.create(document=self.document, file=self._tiff_upload("red"))
+        unsupported = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("notes.pdf", b"%PDF-1.4 text")
+        )
+
+        call_command("generate_previews", workers=2, stdout=StringIO())
+
+        version.preview_job.refresh_from_db()
+        self.assertEqual(version.preview_job.status, PreviewJob.DONE)
+        self.assertEqual(
+            PreviewJob.objects.get(version=unsupported).status, PreviewJob.UNSUPPORTED
+        )
+        response = self.client.get(reverse("registers:document-preview", args=[version.pk]))
+        self.assertEqual(response.status_code, 200)
+        with Image.open(version.file.storage.path(version.preview_name)) as preview:
+            self.assertLessEqual(max(preview.size), 256)
+            self.assertEqual(preview.getpixel((0, 0)), (255, 0, 0))
+
+    def test_replacing_a_version_file_requeues_its_preview(self) -> None:
+        version = DocumentVersion.objects.create(document=self.document, file=self._tiff_upload("red"))
+        call_command("generate_previews", workers=0, stdout=StringIO())
+
+        version.file = self._tiff_upload("blue")
+        version.save()
+
+        self.assertFalse(version.has_preview())
+        self.assertEqual(PreviewJob.objects.get(version=version).status, PreviewJob.PENDING)
+
+
+@override_settings(MEDIA_ROOT=settings.BASE_DIR / "test_media")
+class ConcurrentVersionAllocationTests(MediaRootCleanupMixin, TransactionTestCase):
+    workers = 8
+    uploads_per_worker = 5
+
+    def test_concurrent_uploads_receive_distinct_versions(self) -> None:
+        register = Register.objects.create(name="Busy Register")
+        document = Document.objects.create(register=register, title="Daily Scan")
+        barrier = threading.Barrier(self.workers)
+        errors: list[Exception] = []
+
+        def upload(worker: int) -> None:
+            try:
+                barrier.wait()
+                for index in range(self.uploads_per_worker):
+                    DocumentVersion.objects.create(
+                        document=Document.objects.get(pk=document.pk),
+                        file=SimpleUploadedFile("scan.pdf", f"{worker}-{index}".encode()),
+                    )
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=upload, args=(n,)) for n in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = self.workers * self.uploads_per_worker
+        versions = sorted(document.versions.values_list("version", flat=True))
+        self.assertEqual(versions, list(range(1, total + 1)))
+        document.refresh_from_db()
+        self.assertEqual(document.version_counter, total)
+        self.assertEqual(document.latest_version().version, total)
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite lock modes only")
+class SqliteWriteLockTests(TransactionTestCase):
+    def _begins(self, action) -> list[str]:
+        with CaptureQueriesContext(connection) as queries:
+            action()
+        return [query["sql"] for query in queries if query["sql"].startswith("BEGIN")]
+
+    def _read_in_transaction(self) -> None:
+        with transaction.atomic():
+            Register.objects.count()
+
+    def _write_in_transaction(self) -> None:
+        with write_atomic():
+            Register.objects.count()
+
+    def test_only_writes_take_the_lock_up_front(self) -> None:
+        register = Register.objects.create(name="Locking Register")
+
+        self.assertEqual(self._begins(self._read_in_transaction), ["BEGIN"])
+        self.assertEqual(self._begins(self._write_in_transaction), ["BEGIN IMMEDIATE"])
+
+        created = self._begins(
+            lambda: self.client.post(
+                reverse("registers:bundle-list-create"),
+                {
+                    "register": register.pk,
+                    "bundle_type": ScheduleEntry.DAILY,
+                    "scheduled_for": timezone.now().date(),
+                },
+            )
+        )
+        self.assertEqual(created, ["BEGIN IMMEDIATE"])
+        self.assertNotIn(
+            "BEGIN IMMEDIATE",
+            self._begins(lambda: self.client.get(reverse("registers:bundle-list-create"))),
+        )
+        # The middleware restores the configured mode after the request.
+        self.assertEqual(self._begins(self._read_in_transaction), ["BEGIN"])
+
+
+@override_settings(
+    MEDIA_ROOT=settings.BASE_DIR / "test_media",
+    CHUNKED_UPLOAD_ROOT=settings.BASE_DIR / "test_media" / "partial",
+)
+class ChunkedUploadTests(MediaRootCleanupMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.register = Register.objects.create(name="Scanned Register")
+        self.document = Document.objects.create(register=self.register, title="Ledger")
+        self.content = b"0123456789" * 10
+
+    def _open_session(self) -> str:
+        response = self.client.post(
+            reverse("registers:upload-session-create"),
+            {
+                "document": self.document.pk,
+                "filename": "ledger.tiff",
+                "total_size": len(self.content),
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["upload_id"]
+
+    def _put(self, token: str, offset: int, data: bytes):
+        url = reverse("registers:upload-session-detail", args=[token])
+        return self.client.put(
+            f"{url}?offset={offset}", data=data, content_type="application/octet-stream"
+        )
+
+    @override_settings(CHUNKED_UPLOAD_MAX_SIZE=50)
+    def test_session_larger_than_the_limit_is_refused(self) -> None:
+        response = self.client.post(
+            reverse("registers:upload-session-create"),
+            {"document": self.document.pk, "filename": "huge.tiff", "total_size": 51},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("total_size", response.json()["errors"])
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_chunk_body_is_read_before_the_session_is_locked(self) -> None:
+        session = UploadSession.objects.get(token=self._open_session())
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        class Body(BytesIO):
+            def read(self, size=-1):
+                depths.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        self.assertEqual(write_chunk(session, 0, Body(self.content[:40]), 40), 40)
+        self.assertEqual(set(depths), {depth})
+        self.assertEqual(UploadSession.objects.get(pk=session.pk).received, 40)
+
+    def test_chunk_loses_to_one_stored_while_it_was_received(self) -> None:
+        session = UploadSession.objects.get(token=self._open_session())
+
+        class Body(BytesIO):
+            def read(self, size=-1):
+                UploadSession.objects.filter(pk=session.pk).update(received=20)
+                return super().read(size)
+
+        with self.assertRaises(UploadOffsetMismatch) as caught:
+            write_chunk(session, 0, Body(self.content[:40]), 40)
+        self.assertEqual(caught.exception.offset, 20)
+        self.assertEqual(UploadSession.objects.get(pk=session.pk).received, 20)
+        self.assertEqual(list(partial_path(session).parent.glob("*.chunk")), [])
+
+    def test_chunks_resume_and_finalize_into_version(self) -> None:
+        token = self._open_session()
+
+        self.assertEqual(self._put(token, 0, self.content[:40]).json()["offset"], 40)
+        # A retried chunk is acknowledged without duplicating data.
+        self.assertEqual(self._put(token, 0, self.content[:40]).json()["offset"], 40)
+        # An overlapping chunk only contributes its new tail.
+        self.assertEqual(self._put(token, 30, self.content[30:70]).json()["offset"], 70)
+        self.assertEqual(self._put(token, 70, self.content[70:]).json()["offset"], 100)
+        self.assertFalse(DocumentVersion.objects.exists())
+        self.assertFalse(ActivityLog.objects.exists())
+
+        response = self.client.post(
+            reverse("registers:upload-session-complete", args=[token]),
+            {"sha256": hashlib.sha256(self.content).hexdigest()},
+        )
+        self.assertEqual(response.status_code, 201)
+
+        version = DocumentVersion.objects.get(document=self.document)
+        with version.file.open("rb") as handle:
+            self.assertEqual(handle.read(), self.content)
+        self.assertEqual(ActivityLog.objects.filter(action="document_uploaded").count(), 1)
+        session = UploadSession.objects.get(token=token)
+        self.assertEqual(session.version, version)
+        self.assertEqual(session.sha256, hashlib.sha256(self.content).hexdigest())
+
+        replay = self.client.post(reverse("registers:upload-session-complete", args=[token]))
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(DocumentVersion.objects.count(), 1)
+
+    def test_chunk_past_stored_offset_is_rejected(self) -> None:
+        token = self._open_session()
+        self._put(token, 0, self.content[:20])
+
+        response = self._put(token, 50, self.content[50:60])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], 20)
+
+    def test_incomplete_upload_cannot_be_finalized(self) -> None:
+        token = self._open_session()
+        self._put(token, 0, self.content[:20])
+
+        response = self.client.post(reverse("registers:upload-session-complete", args=[token]))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(DocumentVersion.objects.exists())
+        self.assertFalse(ActivityLog.objects.exists())
+
+    def test_chunked_version_keeps_shared_blob_alive(self) -> None:
+        form_version = DocumentVersion.objects.create(
+            document=self.document, file=SimpleUploadedFile("ledger.tiff", self.content)
+        )
+        token = self._open_session()
+        self._put(token, 0, self.content)
+        self.client.post(reverse("registers:upload-session-complete", args=[token]))
+        chunked = DocumentVersion.objects.exclude(pk=form_version.pk).get()
+
+        digest = hashlib.sha256(self.content).hexdigest()
+        self.assertEqual(chunked.sha256, digest)
+        self.assertEqual(chunked.size, len(self.content))
+        self.assertEqual(chunked.filename, "ledger.tiff")
+        self.assertEqual(StoredBlob.objects.get(sha256=digest).ref_count, 2)
+
+        form_version.delete()
+        StoredBlob.collect_garbage(grace=timedelta(0))
+        with chunked.file.open("rb") as handle:
+            self.assertEqual(handle.read(), self.content)
+
+    def test_finalized_upload_queues_preview_and_has_etag(self) -> None:
+        token = self._open_session()
+        self._put(token, 0, self.content)
+        self.client.post(reverse("registers:upload-session-complete", args=[token]))
+        version = DocumentVersion.objects.get(document=self.document)
+
+        self.assertEqual(version.preview_job.status, PreviewJob.PENDING)
+        with override_settings(DOCUMENT_DOWNLOAD_ACCEL=""):
+            response = self.client.get(reverse("registers:document-download", args=[version.pk]))
+        self.assertEqual(response["ETag"], f'"{hashlib.sha256(self.content).hexdigest()}"')
+
+    def test_finalizing_again_after_version_deletion_is_gone(self) -> None:
+        token = self._open_session()
+        self._put(token, 0, self.content)
+        complete_url = reverse("registers:upload-session-complete", args=[token])
+        self.assertEqual(self.client.post(complete_url).status_code, 201)
+        DocumentVersion.objects.get(document=self.document).delete()
+
+        response = self.client.post(complete_url)
+
+        self.assertEqual(response.status_code, 410)
+        self.assertFalse(DocumentVersion.objects.exists())
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self) -> None:
+        self.register = Register.objects.create(name="Async Register")
+        self.entry = ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=timezone.now().date(),
+        )
+        Reminder.objects.create(
+            register=self.register,
+            schedule_entry=self.entry,
+            remind_at=timezone.now() + timedelta(days=1),
+            message="Check the daily bundle",
+        )
+
+    async def test_bundle_list_and_reminders_served_asynchronously(self) -> None:
+        bundles = await self.async_client.get(reverse("registers:bundle-list-create"))
+        self.assertEqual(bundles.status_code, 200)
+        self.assertEqual(bundles.json()["results"][0]["register"], "Async Register")
+
+        reminders = await self.async_client.get(reverse("registers:pending-reminders"))
+        self.assertEqual(reminders.json()["results"][0]["message"], "Check the daily bundle")
+
+        health = await self.async_client.get(reverse("registers:health"))
+        self.assertEqual(health.json()["status"], "ok")
+
+    async def test_bundle_creation_still_logs_activity(self) -> None:
+        response = await self.async_client.post(
+            reverse("registers:bundle-list-create"),
+            {
+                "register": self.register.pk,
+                "bundle_type": ScheduleEntry.WEEKLY,
+                "scheduled_for": timezone.now().date().isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            await ActivityLog.objects.filter(schedule_entry_id=response.json()["id"]).aexists()
+        )
+
+    def test_pdf_view_renders_off_the_event_loop(self) -> None:
+        response = self.client.get(reverse("registers:register-pdf", args=[self.register.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response.content.startswith(b"%PDF"))
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.register = Register.objects.create(name="Cached Register")
+        Reminder.objects.create(
+            register=self.register,
+            remind_at=timezone.now() + timedelta(hours=2),
+            message="First",
+        )
+
+    def test_repeat_reads_are_served_from_cache(self) -> None:
+        url = reverse("registers:pending-reminders")
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+
+    def test_writes_invalidate_cached_responses(self) -> None:
+        search_url = reverse("registers:search")
+        reminders_url = reverse("registers:pending-reminders")
+        self.client.get(search_url, {"query": "cached"})
+        self.client.get(reminders_url)
+
+        Register.objects.create(name="Cached Register Two")
+        Reminder.objects.create(
+            register=self.register,
+            remind_at=timezone.now() + timedelta(hours=3),
+            message="Second",
+        )
+
+        search = self.client.get(search_url, {"query": "cached"})
+        reminders = self.client.get(reminders_url)
+        self.assertEqual(search["X-Cache"], "MISS")
+        self.assertEqual(len(search.json()["results"]), 2)
+        self.assertEqual(
+            [row["message"] for row in reminders.json()["results"]], ["First", "Second"]
+        )
+
+    def test_unused_register_parameter_does_not_narrow_invalidation(self) -> None:
+        other = Register.objects.create(name="Other Register")
+        url = reverse("registers:pending-reminders")
+        self.client.get(url, {"register": self.register.pk})
+
+        Reminder.objects.create(
+            register=other, remind_at=timezone.now() + timedelta(hours=3), message="Other"
+        )
+
+        response = self.client.get(url, {"register": self.register.pk})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [row["message"] for row in response.json()["results"]], ["First", "Other"]
+        )
+
+    def test_entry_list_for_one_register_ignores_writes_to_others(self) -> None:
+        other = Register.objects.create(name="Other Register")
+        url = reverse("registers:bundle-list-create")
+        params = {"register": self.register.pk}
+        self.client.get(url, params)
+
+        moved = ScheduleEntry.objects.create(
+            register=other, bundle_type=ScheduleEntry.DAILY, scheduled_for=date(2024, 5, 1)
+        )
+        self.assertEqual(self.client.get(url, params)["X-Cache"], "HIT")
+
+        moved.register = self.register
+        moved.save()
+        response = self.client.get(url, params)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual([row["id"] for row in response.json()["results"]], [moved.pk])
+
+        # Moving it away again changes the old register's list as well.
+        moved.register = other
+        moved.save()
+        self.assertEqual(self.client.get(url, params).json()["results"], [])
+
+    def test_hit_rates_are_reported(self) -> None:
+        url = reverse("registers:pending-reminders")
+        for _ in range(4):
+            self.client.get(url)
+
+        stats = self.client.get(reverse("registers:cache-stats")).json()["results"]
+
+        self.assertEqual(stats["reminders"], {"hits": 3, "misses": 1, "hit_rate": 0.75})
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.register = Register.objects.create(name="Conditional Register")
+        self.entry = ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=timezone.now().date(),
+        )
+        Reminder.objects.create(
+            register=self.register,
+            remind_at=timezone.now() + timedelta(hours=2),
+            message="Check",
+        )
+
+    def _revalidate(self, url: str, params: dict[str, str] | None = None):
+        first = self.client.get(url, params or {})
+        self.assertEqual(first.status_code, 200)
+        return first["ETag"], self.client.get(
+            url, params or {}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+    def test_unchanged_lists_return_not_modified(self) -> None:
+        for name, params in [
+            ("registers:bundle-list-create", {"bundle_type": ScheduleEntry.DAILY}),
+            ("registers:search", {"query": "conditional"}),
+            ("registers:pending-reminders", None),
+        ]:
+            with self.subTest(name=name):
+                etag, second = self._revalidate(reverse(name), params)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second["ETag"], etag)
+                self.assertEqual(second.content, b"")
+
+    def test_validator_tracks_filters_edits_and_deletions(self) -> None:
+        url = reverse("registers:bundle-list-create")
+        etag, _ = self._revalidate(url)
+        weekly, _ = self._revalidate(url, {"bundle_type": ScheduleEntry.WEEKLY})
+        self.assertNotEqual(etag, weekly)
+
+        self.entry.mark_complete()
+        edited = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(edited.status_code, 200)
+        self.assertTrue(edited.json()["results"][0]["completed"])
+
+        ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.WEEKLY,
+            scheduled_for=timezone.now().date(),
+        )
+        etag, _ = self._revalidate(url)
+        ScheduleEntry.objects.filter(bundle_type=ScheduleEntry.WEEKLY).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_register_rename_and_entry_changes_revalidate_search(self) -> None:
+        url = reverse("registers:search")
+        params = {"query": "conditional"}
+        etag, _ = self._revalidate(url, params)
+
+        ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.WEEKLY,
+            scheduled_for=timezone.now().date(),
+        )
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["bundle_counts"]["weekly"], 1)
+
+        etag = response["ETag"]
+        reminders = reverse("registers:pending-reminders")
+        reminder_etag = self.client.get(reminders)["ETag"]
+        self.register.name = "Conditional Register Renamed"
+        self.register.save()
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        renamed = self.client.get(reminders, HTTP_IF_NONE_MATCH=reminder_etag)
+        self.assertEqual(renamed.status_code, 200)
+        self.assertEqual(renamed.json()["results"][0]["register"], self.register.name)
+
+
+def _has_separate_replica() -> bool:
+    replica = settings.DATABASES.get("replica")
+    return bool(replica) and not replica.get("TEST", {}).get("MIRROR")
+
+
+@skipUnless(_has_separate_replica(), "requires a separate replica database")
+@override_settings(DATABASE_READ_REPLICA="replica", REPLICA_STICKY_SECONDS=30)
+class ReadReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        # Distinct rows in each SQLite file show which one a view read.
+        self.primary = Register.objects.create(name="Primary Only")
+        replica = Register.objects.using("replica").create(name="Replica Only")
+        ScheduleEntry.objects.using("replica").create(
+            register=replica,
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=timezone.now().date(),
+        )
+
+    def _search_names(self) -> list[str]:
+        response = self.client.get(reverse("registers:search"), {"query": "only"})
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_read_only_views_use_the_replica(self) -> None:
+        self.assertEqual(self._search_names(), ["Replica Only"])
+        bundles = self.client.get(reverse("registers:bundle-list-create")).json()
+        self.assertEqual([row["register"] for row in bundles["results"]], ["Replica Only"])
+        # Outside the decorated views reads stay on the primary.
+        self.assertEqual(list(Register.objects.values_list("name", flat=True)), ["Primary Only"])
+
+    def test_writes_pin_the_client_to_the_primary(self) -> None:
+        response = self.client.post(
+            reverse("registers:bundle-list-create"),
+            {
+                "register": self.primary.pk,
+                "bundle_type": ScheduleEntry.WEEKLY,
+                "scheduled_for": timezone.now().date().isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 30)
+        self.assertEqual(ScheduleEntry.objects.using("replica").count(), 1)
+
+        self.assertEqual(self._search_names(), ["Primary Only"])
+        bundles = self.client.get(reverse("registers:bundle-list-create")).json()
+        self.assertEqual([row["register"] for row in bundles["results"]], ["Primary Only"])
+
+        self.client.cookies.pop(STICKY_COOKIE)
+        self.assertEqual(self._search_names(), ["Replica Only"])
+
+    def test_pinned_clients_skip_responses_cached_from_the_replica(self) -> None:
+        self.assertEqual(self._search_names(), ["Replica Only"])
+
+        self.client.cookies[STICKY_COOKIE] = str(int(time.time()) + 30)
+
+        self.assertEqual(self._search_names(), ["Primary Only"])
+
+
+class FailingReminderBackend(ReminderBackend):
+    def send(self, reminder: Reminder) -> None:
+        if "fail" in reminder.message:
+            raise ConnectionError("Delivery refused")
+
+
+@override_settings(REMINDER_RECIPIENTS=["office@example.com"])
+class ReminderDispatchTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.register = Register.objects.create(name="Dispatch Register")
+        now = timezone.now()
+        for offset, message in [(-2, "First due"), (-1, "Second due"), (1, "Later")]:
+            Reminder.objects.create(
+                register=self.register,
+                remind_at=now + timedelta(hours=offset),
+                message=message,
+            )
+
+    def test_due_reminders_are_emailed_and_marked_sent_in_batches(self) -> None:
+        url = reverse("registers:pending-reminders")
+        self.assertEqual(len(self.client.get(url).json()["results"]), 3)
+
+        stdout = StringIO()
+        call_command("dispatch_reminders", batch_size=1, workers=2, stdout=stdout)
+
+        self.assertIn("Sent 2 reminders.", stdout.getvalue())
+        self.assertEqual(
+            sorted(message.body for message in mail.outbox), ["First due", "Second due"]
+        )
+        self.assertEqual(mail.outbox[0].to, ["office@example.com"])
+        self.assertEqual(
+            list(Reminder.objects.filter(is_sent=False).values_list("message", flat=True)),
+            ["Later"],
+        )
+        # The bulk update bypasses signals but still invalidates cached lists.
+        self.assertEqual(
+            [row["message"] for row in self.client.get(url).json()["results"]], ["Later"]
+        )
+
+    def test_failed_deliveries_stay_pending(self) -> None:
+        Reminder.objects.filter(message="Second due").update(message="Second due, will fail")
+
+        sent, failed = dispatch_due_reminders(backend=FailingReminderBackend(), batch_size=1)
+
+        self.assertEqual((sent, failed), (1, 1))
+        self.assertEqual(
+            list(Reminder.objects.filter(is_sent=True).values_list("message", flat=True)),
+            ["First due"],
+        )
+
+    def test_delivery_runs_outside_the_claiming_transaction(self) -> None:
+        # Resolved here: the worker threads have connections of their own.
+        dispatcher = transaction.get_connection()
+        depth = len(dispatcher.atomic_blocks)
+        seen = []
+
+        class RecordingBackend(ReminderBackend):
+            def send(self, reminder: Reminder) -> None:
+                seen.append((reminder.claimed_by is not None, len(dispatcher.atomic_blocks)))
+
+        self.assertEqual(dispatch_due_reminders(backend=RecordingBackend()), (2, 0))
+
+        self.assertEqual(seen, [(True, depth), (True, depth)])
+        self.assertEqual(
+            list(Reminder.objects.filter(is_sent=True).values_list("claimed_by", flat=True)),
+            [None, None],
+        )
+
+    def test_claims_by_other_runs_are_skipped_until_they_go_stale(self) -> None:
+        first = Reminder.objects.get(message="First due")
+        Reminder.objects.filter(pk=first.pk).update(
+            claimed_at=timezone.now(), claimed_by=uuid.uuid4()
+        )
+
+        self.assertEqual(dispatch_due_reminders(), (1, 0))
+        self.assertFalse(Reminder.objects.get(pk=first.pk).is_sent)
+
+        with override_settings(REMINDER_CLAIM_TIMEOUT=0):
+            self.assertEqual(dispatch_due_reminders(), (1, 0))
+        self.assertTrue(Reminder.objects.get(pk=first.pk).is_sent)
+
+    def test_failed_deliveries_release_their_claim(self) -> None:
+        Reminder.objects.filter(message="Second due").update(message="Second due, will fail")
+
+        dispatch_due_reminders(backend=FailingReminderBackend())
+
+        failed = Reminder.objects.get(message="Second due, will fail")
+        self.assertFalse(failed.is_sent)
+        self.assertEqual((failed.claimed_at, failed.claimed_by), (None, None))
+
+    @override_settings(REMINDER_RECIPIENTS=[])
+    def test_refuses_to_run_without_recipients(self) -> None:
+        with self.assertRaisesMessage(CommandError, "REMINDER_RECIPIENTS is empty"):
+            call_command("dispatch_reminders", stdout=StringIO())
+
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Reminder.objects.filter(is_sent=True).exists())
+
+
+class BulkCompletionTests(TestCase):
+    def setUp(self) -> None:
+        self.url = reverse("registers:bundle-complete")
+        self.day = date(2024, 3, 4)
+        self.first = Register.objects.create(name="Sign-off One")
+        self.second = Register.objects.create(name="Sign-off Two")
+        self.entries = {
+            (register.name, bundle_type, offset): ScheduleEntry.objects.create(
+                register=register,
+                bundle_type=bundle_type,
+                scheduled_for=self.day + timedelta(days=offset),
+            )
+            for register in (self.first, self.second)
+            for bundle_type in (ScheduleEntry.DAILY, ScheduleEntry.WEEKLY)
+            for offset in (0, 1)
+        }
+
+    def _post(self, payload: dict):
+        return self.client.post(self.url, data=payload, content_type="application/json")
+
+    def test_filter_completes_a_day_across_registers(self) -> None:
+        earlier = timezone.now() - timedelta(days=3)
+        signed_off = self.entries[("Sign-off One", ScheduleEntry.DAILY, 0)]
+        ScheduleEntry.objects.filter(pk=signed_off.pk).update(completed=True, completed_at=earlier)
+
+        response = self._post(
+            {
+                "bundle_type": ScheduleEntry.DAILY,
+                "date_from": self.day.isoformat(),
+                "date_to": self.day.isoformat(),
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+        expected = self.entries[("Sign-off Two", ScheduleEntry.DAILY, 0)]
+        self.assertEqual(response.json()["ids"], [expected.pk])
+        expected.refresh_from_db()
+        signed_off.refresh_from_db()
+        self.assertTrue(expected.completed)
+        self.assertIsNotNone(expected.completed_at)
+        self.assertEqual(signed_off.completed_at, earlier)
+        logs = ActivityLog.objects.filter(action="completed")
+        self.assertEqual(list(logs.values_list("schedule_entry", flat=True)), [expected.pk])
+        self.assertEqual(ScheduleEntry.objects.filter(completed=True).count(), 2)
+
+    def test_ids_complete_only_outstanding_entries_once(self) -> None:
+        ids = [entry.pk for entry in self.entries.values() if entry.register == self.first]
+
+        first = self._post({"ids": ids})
+        again = self._post({"ids": ids})
+
+        self.assertEqual(first.json()["completed"], 4)
+        self.assertEqual(again.json()["completed"], 0)
+        self.assertEqual(ActivityLog.objects.filter(action="completed").count(), 4)
+        self.assertFalse(self.second.schedule_entries.filter(completed=True).exists())
+
+    def test_entries_matching_after_the_lock_are_left_alone(self) -> None:
+        day = self.day + timedelta(days=5)
+        locked = ScheduleEntry.objects.create(
+            register=self.first, bundle_type=ScheduleEntry.DAILY, scheduled_for=day
+        )
+        update = QuerySet.update
+        late = []
+
+        def update_after_another_writer(queryset, **kwargs):
+            if queryset.model is ScheduleEntry and not late:
+                # Another request adds a matching entry once the rows are locked.
+                late.append(None)  # Claimed first: create()'s signals may update too.
+                late[0] = ScheduleEntry.objects.create(
+                    register=self.second, bundle_type=ScheduleEntry.DAILY, scheduled_for=day
+                )
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", update_after_another_writer):
+            ids = ScheduleEntry.complete_many(ScheduleEntry.objects.filter(scheduled_for=day))
+
+        self.assertEqual(ids, [locked.pk])
+        late[0].refresh_from_db()
+        self.assertFalse(late[0].completed)
+        logged = ActivityLog.objects.filter(action="completed")
+        self.assertEqual(list(logged.values_list("schedule_entry_id", flat=True)), [locked.pk])
+
+    def test_requests_without_a_selection_are_rejected(self) -> None:
+        self.assertEqual(self._post({}).status_code, 400)
+        self.assertEqual(self._post({"ids": ["one"]}).status_code, 400)
+        self.assertFalse(ScheduleEntry.objects.filter(completed=True).exists())
+
+
+class CompletionRollupTests(TestCase):
+    def setUp(self) -> None:
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+        self.first = Register.objects.create(name="Rollup One")
+        self.second = Register.objects.create(name="Rollup Two")
+
+        def entry(register, bundle_type, days):
+            return ScheduleEntry.objects.create(
+                register=register,
+                bundle_type=bundle_type,
+                scheduled_for=self.today + timedelta(days=days),
+            )
+
+        self.old = entry(self.first, ScheduleEntry.DAILY, -8)
+        self.yesterday = entry(self.first, ScheduleEntry.DAILY, -1)
+        self.yesterday_weekly = entry(self.second, ScheduleEntry.WEEKLY, -1)
+        self.tomorrow = entry(self.first, ScheduleEntry.DAILY, 1)
+        self.later = entry(self.second, ScheduleEntry.DAILY, 3)
+        # Pretend the history predates the first refresh.
+        ScheduleEntry.objects.update(updated_at=self.now - timedelta(hours=2))
+        refresh_rollups(now=self.now - timedelta(hours=1))
+
+    def _rollup(self, entry: ScheduleEntry) -> CompletionRollup:
+        return CompletionRollup.objects.get(
+            register=entry.register, bundle_type=entry.bundle_type, day=entry.scheduled_for
+        )
+
+    def test_first_refresh_builds_daily_counts(self) -> None:
+        self.assertEqual(CompletionRollup.objects.count(), 5)
+        old = self._rollup(self.old)
+        self.assertEqual((old.scheduled, old.completed, old.overdue), (1, 0, 1))
+        self.assertEqual(self._rollup(self.tomorrow).overdue, 0)
+
+    def test_refresh_recomputes_only_touched_days(self) -> None:
+        ScheduleEntry.complete_many(ScheduleEntry.objects.filter(pk=self.yesterday.pk))
+        self.old.delete()
+        previous_day = self.later.scheduled_for
+        self.later.scheduled_for = self.today + timedelta(days=5)
+        self.later.save()
+
+        recomputed = refresh_rollups(now=self.now)
+
+        # Yesterday, the new and old day of the rescheduled entry, and the deleted entry's day.
+        self.assertEqual(recomputed, 4)
+        stale_days = [self.old.scheduled_for, previous_day]
+        self.assertFalse(CompletionRollup.objects.filter(day__in=stale_days).exists())
+        yesterday = self._rollup(self.yesterday)
+        self.assertEqual((yesterday.scheduled, yesterday.completed, yesterday.overdue), (1, 1, 0))
+        self.assertEqual(self._rollup(self.yesterday_weekly).overdue, 1)
+        self.assertEqual(self._rollup(self.later).scheduled, 1)
+
+    def test_days_passing_become_overdue(self) -> None:
+        call_command("refresh_rollups", stdout=StringIO())
+        self.assertEqual(self._rollup(self.tomorrow).overdue, 0)
+
+        refresh_rollups(now=self.now + timedelta(days=3))
+
+        self.assertEqual(self._rollup(self.tomorrow).overdue, 1)
+        self.assertEqual(self._rollup(self.later).overdue, 0)
+
+    def test_analytics_groups_rollups_by_period(self) -> None:
+        url = reverse("registers:completion-analytics")
+        params = {
+            "date_from": (self.today - timedelta(days=10)).isoformat(),
+            "date_to": (self.today + timedelta(days=10)).isoformat(),
+            "register": self.first.pk,
+        }
+        daily = self.client.get(url, {**params, "group": "day"}).json()
+        self.assertEqual(
+            [(row["period"], row["overdue"]) for row in daily["results"]],
+            [
+                (self.old.scheduled_for.isoformat(), 1),
+                (self.yesterday.scheduled_for.isoformat(), 1),
+                (self.tomorrow.scheduled_for.isoformat(), 0),
+            ],
+        )
+        self.assertIsNotNone(daily["refreshed_at"])
+
+        weekly = self.client.get(url, params).json()
+        self.assertEqual(weekly["group"], "week")
+        self.assertEqual(sum(row["scheduled"] for row in weekly["results"]), 3)
+        periods = [date.fromisoformat(row["period"]) for row in weekly["results"]]
+        self.assertTrue(all(period.weekday() == 0 for period in periods))
+        self.assertEqual(self.client.get(url, {"date_from": "2024-02-01"}).status_code, 400)
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self) -> None:
+        self.register = Register.objects.create(name="Export Register")
+        other = Register.objects.create(name="Other Register")
+        for offset in range(5):
+            for register in (self.register, other):
+                ScheduleEntry.objects.create(
+                    register=register,
+                    bundle_type=ScheduleEntry.DAILY,
+                    scheduled_for=date(2024, 5, 1) + timedelta(days=offset),
+                    notes='Line with "quotes", commas',
+                )
+        ActivityLog.log(register=self.register, action="updated", details="Exported")
+
+    async def _stream(self, dataset: str, params: dict | None = None):
+        response = await self.async_client.get(
+            reverse("registers:export", args=[dataset]), params or {}
+        )
+        chunks = [chunk async for chunk in response.streaming_content]
+        return response, chunks
+
+    async def test_csv_export_streams_in_chunks(self) -> None:
+        with mock.patch("registers.exports.CHUNK_SIZE", 200):
+            response, chunks = await self._stream("schedule-entries")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("schedule-entries.csv", response["Content-Disposition"])
+        self.assertTrue(chunks[0].startswith(b"id,register_id,register,bundle_type"))
+        self.assertGreater(len(chunks), 3)
+        rows = list(csv.DictReader(StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]["notes"], 'Line with "quotes", commas')
+        self.assertEqual(rows[0]["scheduled_for"], "2024-05-01")
+
+    async def test_gzipped_jsonl_export_applies_filters(self) -> None:
+        response, chunks = await self._stream(
+            "schedule-entries",
+            {
+                "format": "jsonl",
+                "gzip": "1",
+                "register": self.register.pk,
+                "date_from": "2024-05-02",
+                "date_to": "2024-05-03",
+            },
+        )
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["scheduled_for"] for row in rows], ["2024-05-02", "2024-05-03"])
+        self.assertEqual({row["register"] for row in rows}, {"Export Register"})
+
+    def test_wsgi_export_streams_without_buffering(self) -> None:
+        with mock.patch("registers.exports.CHUNK_SIZE", 200):
+            response = self.client.get(reverse("registers:export", args=["schedule-entries"]))
+            self.assertFalse(response.is_async)
+            chunks = list(response.streaming_content)
+
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(len(list(csv.DictReader(StringIO(b"".join(chunks).decode())))), 10)
+
+    async def test_unknown_datasets_are_not_found(self) -> None:
+        response = await self.async_client.get(reverse("registers:export", args=["users"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_command_writes_compressed_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            target = Path(directory) / "logs.jsonl.gz"
+            call_command(
+                "export_rows", "activity-logs", format="jsonl", gzip=True, output=str(target)
+            )
+            lines = gzip.decompress(target.read_bytes()).splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["details"] for row in rows], ["Exported"])
+
+        stdout = StringIO()
+        call_command("export_rows", "schedule-entries", register=self.register.pk, stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 6)
+
+
+class ImportRegistersCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        Register.objects.create(name="Existing Register")
+
+    def _csv(self, name: str, header: list[str], rows: list[list[str]]) -> str:
+        path = Path(self.directory.name) / name
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return str(path)
+
+    def test_imports_files_in_batches_and_reports_invalid_rows(self) -> None:
+        registers = self._csv(
+            "registers.csv",
+            ["name", "description", "is_active"],
+            [
+                ["Births 1901", "Ledger", "yes"],
+                ["Deaths 1901", "", "no"],
+                ["Existing Register", "", ""],
+                ["Births 1901", "Duplicate row", ""],
+            ],
+        )
+        entries = self._csv(
+            "entries.csv",
+            ["register", "bundle_type", "scheduled_for", "completed", "completed_at", "notes"],
+            [
+                ["Births 1901", "daily", "1901-01-02", "", "1901-01-02T10:00:00", ""],
+                ["Deaths 1901", "Weekly", "1901-01-07", "false", "", "Late"],
+                ["Existing Register", "daily", "1901-01-03", "", "", ""],
+                ["Unknown", "daily", "1901-01-04", "", "", ""],
+                ["Births 1901", "hourly", "1901-01-04", "", "", ""],
+            ],
+        )
+        reminders = self._csv(
+            "reminders.csv",
+            ["register", "remind_at", "message", "is_sent"],
+            [["Deaths 1901", "1901-01-06 09:00", "Collect ledger", "1"]],
+        )
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command(
+            "import_registers",
+            registers=registers,
+            entries=entries,
+            reminders=reminders,
+            batch_size=2,
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        self.assertEqual(Register.objects.count(), 3)
+        self.assertFalse(Register.objects.get(name="Deaths 1901").is_active)
+        births = ScheduleEntry.objects.get(register__name="Births 1901")
+        self.assertTrue(births.completed)
+        self.assertEqual(ScheduleEntry.objects.count(), 3)
+        self.assertEqual(ScheduleEntry.objects.get(notes="Late").bundle_type, ScheduleEntry.WEEKLY)
+        self.assertTrue(Reminder.objects.get(message="Collect ledger").is_sent)
+        self.assertIn("row 4: unknown register 'Unknown'", stderr.getvalue())
+        self.assertIn("row 5: bundle_type must be one of", stderr.getvalue())
+        self.assertIn("Imported 2 registers (2 already present, 0 invalid).", stdout.getvalue())
+
+    def test_failed_import_resumes_after_last_committed_batch(self) -> None:
+        rows = [
+            ["Existing Register", "daily", (date(1950, 1, 1) + timedelta(days=day)).isoformat()]
+            for day in range(5)
+        ]
+        entries = self._csv("entries.csv", ["register", "bundle_type", "scheduled_for"], rows)
+        calls = []
+
+        def fail_on_second_batch(register_ids=()):
+            calls.append(register_ids)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+
+        with mock.patch("registers.imports.invalidate_after_bulk_write", fail_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                import_csv("entries", entries, batch_size=2)
+        self.assertEqual(ScheduleEntry.objects.count(), 2)
+
+        result = import_csv("entries", entries, batch_size=2)
+
+        self.assertEqual(result.imported, 3)
+        self.assertEqual(ScheduleEntry.objects.count(), 5)
+        self.assertEqual(ScheduleEntry.objects.values("scheduled_for").distinct().count(), 5)
+
+
+class AdminChangelistScalingTests(TestCase):
+    def setUp(self) -> None:
+        self.register = Register.objects.create(name="Admin Register")
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+
+    def _add_entries(self, count: int) -> None:
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(
+                register=self.register,
+                bundle_type=ScheduleEntry.DAILY,
+                scheduled_for=date(2024, 1, 1) + timedelta(days=offset),
+            )
+            for offset in range(count)
+        )
+        for entry in ScheduleEntry.objects.all():
+            ActivityLog.log(register=self.register, schedule_entry=entry, action="updated")
+
+    @skipUnless(connection.vendor in {"sqlite", "postgresql"}, "needs planner statistics")
+    def test_unfiltered_counts_come_from_planner_statistics(self) -> None:
+        self._add_entries(3)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self._add_entries(2)
+
+        with mock.patch("registers.admin.ESTIMATED_COUNT_THRESHOLD", 1):
+            estimated = EstimatedCountPaginator(ScheduleEntry.objects.all(), 100)
+            filtered = EstimatedCountPaginator(
+                ScheduleEntry.objects.filter(bundle_type=ScheduleEntry.DAILY), 100
+            )
+            self.assertEqual(estimated.count, 3)
+            self.assertEqual(filtered.count, 5)
+        self.assertEqual(EstimatedCountPaginator(ScheduleEntry.objects.all(), 100).count, 5)
+
+    def test_changelist_queries_do_not_grow_with_rows(self) -> None:
+        urls = [
+            reverse("admin:registers_scheduleentry_changelist"),
+            reverse("admin:registers_activitylog_changelist"),
+        ]
+
+        def queries() -> list[int]:
+            counts = []
+            for url in urls:
+                with CaptureQueriesContext(connection) as captured:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                counts.append(len(captured))
+            return counts
+
+        self._add_entries(2)
+        few = queries()
+        self._add_entries(10)
+        self.assertEqual(queries(), few)
+
+        response = self.client.get(urls[0], {"q": "Admin"})
+        self.assertContains(response, "Admin Register")
+
+    def test_search_still_covers_notes_and_details(self) -> None:
+        ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=date(2024, 1, 1),
+            notes="water damage on folio 12",
+        )
+        ActivityLog.log(register=self.register, action="updated", details="rebound spine")
+
+        entries = self.client.get(
+            reverse("admin:registers_scheduleentry_changelist"), {"q": "folio"}
+        )
+        logs = self.client.get(reverse("admin:registers_activitylog_changelist"), {"q": "spine"})
+
+        self.assertEqual(entries.context["cl"].result_count, 1)
+        self.assertEqual(logs.context["cl"].result_count, 1)
+
+
+class RegisterTypeaheadTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        # A cleared change log makes each test start from a fresh index.
+        cache.clear()
+        for name in ("Births 1901", "Burials 1850", "Marriages 1920", "Baptisms 1788"):
+            Register.objects.create(name=name)
+
+    def _names(self, **params) -> list[str]:
+        response = self.client.get(reverse("registers:typeahead"), params)
+        self.assertEqual(response.status_code, 200)
+        return [result["name"] for result in response.json()["results"]]
+
+    def test_ranks_misspelled_name_first(self) -> None:
+        self.assertEqual(self._names(q="mariages")[0], "Marriages 1920")
+        self.assertEqual(self._names(q="burails 1850")[0], "Burials 1850")
+
+    def test_matches_partial_input_and_respects_limit(self) -> None:
+        self.assertEqual(self._names(q="bapt", limit=1), ["Baptisms 1788"])
+
+    def test_index_follows_register_changes(self) -> None:
+        self.assertEqual(self._names(q="births")[0], "Births 1901")
+
+        register = Register.objects.get(name="Births 1901")
+        register.name = "Christenings 1901"
+        register.save()
+        Register.objects.create(name="Confirmations 1930")
+
+        self.assertEqual(self._names(q="christenings")[0], "Christenings 1901")
+        self.assertEqual(self._names(q="confirmation")[0], "Confirmations 1930")
+        self.assertNotIn("Births 1901", self._names(q="births"))
+
+    def test_register_changes_update_the_index_in_place(self) -> None:
+        index = typeahead.get_index()
+        register = Register.objects.get(name="Births 1901")
+        register.name = "Christenings 1901"
+        with self.captureOnCommitCallbacks(execute=True):
+            register.save()
+            Register.objects.get(name="Burials 1850").delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            refreshed = typeahead.get_index()
+
+        self.assertIs(refreshed, index)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(refreshed.search("christenings")[0][1], "Christenings 1901")
+        self.assertNotIn("Burials 1850", [name for _, name, _ in refreshed.search("burials")])
+        self.assertEqual(len(refreshed), 3)
+
+    def test_rejects_missing_query_and_large_limit(self) -> None:
+        url = reverse("registers:typeahead")
+        self.assertEqual(self.client.get(url).status_code, 400)
+        response = self.client.get(url, {"q": "births", "limit": 500})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit", response.json()["errors"])
+
+
+class TrigramIndexTests(TestCase):
+    def test_trigrams_pad_each_word(self) -> None:
+        self.assertEqual(trigrams("Ab c"), {"  a", " ab", "ab ", "  c", " c "})
+
+    def test_updates_replace_names_and_compact_away_gaps(self) -> None:
+        index = TrigramIndex([(1, "Parish Births"), (2, "Parish Burials")])
+
+        index.update(1, "Parish Baptisms")
+        index.discard(2)
+
+        self.assertEqual(index.search("baptisms"), [(1, "Parish Baptisms", 1.0)])
+        self.assertNotIn("Parish Burials", [name for _, name, _ in index.search("burials")])
+        compacted = index.compacted()
+        self.assertEqual((len(compacted), compacted.gaps), (1, 0))
+        self.assertEqual(compacted.names, ["Parish Baptisms"])
+
+    def test_search_scores_share_of_query_found(self) -> None:
+        index = TrigramIndex([(1, "Parish Births"), (2, "Parish Burials"), (3, "Census")])
+
+        results = index.search("births", limit=2)
+
+        self.assertEqual(results[0], (1, "Parish Births", 1.0))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(index.search("!!"), [])
+
+
+class PdfAdmissionControlTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_rejects_when_slots_and_queue_are_full(self) -> None:
+        limiter = AdmissionLimiter("test", process_slots=1, queue=0, wait=1)
+        slot = limiter.acquire()
+
+        with self.assertRaises(Rejected):
+            limiter.acquire()
+        limiter.release(slot)
+        limiter.release(limiter.acquire())
+
+        stats = limiter.stats()
+        self.assertEqual(stats["process"], {"active": 0, "queued": 0, "admitted": 2, "rejected": 1})
+        self.assertEqual(stats["rejected_total"], 1)
+
+    def test_queued_request_gets_freed_slot(self) -> None:
+        limiter = AdmissionLimiter("test", process_slots=1, queue=1, wait=5)
+        slot = limiter.acquire()
+        admitted = threading.Event()
+
+        def wait_for_slot() -> None:
+            limiter.release(limiter.acquire())
+            admitted.set()
+
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        while limiter.stats()["process"]["queued"] == 0:
+            time.sleep(0.01)
+        # The queue is full, so a third request is turned away at once.
+        with self.assertRaises(Rejected):
+            limiter.acquire()
+        limiter.release(slot)
+        waiter.join(5)
+
+        self.assertTrue(admitted.is_set())
+
+    def test_global_slots_are_shared_through_lock_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = (
+                AdmissionLimiter(
+                    "test", process_slots=2, queue=2, wait=0.1, global_slots=1, lock_dir=directory
+                )
+                for _ in range(2)
+            )
+            slot = first.acquire()
+            with self.assertRaises(Rejected):
+                second.acquire()
+            self.assertEqual(second.stats()["process"]["active"], 0)
+            first.release(slot)
+            second.release(second.acquire())
+
+    def test_saturated_view_answers_503_with_retry_after(self) -> None:
+        register = Register.objects.create(name="Busy")
+        limiter = AdmissionLimiter("pdf-test", process_slots=1, queue=0, wait=0)
+        slot = limiter.acquire()
+
+        with mock.patch("registers.views._pdf_limiter", return_value=limiter):
+            with override_settings(PDF_RENDER_RETRY_AFTER=7):
+                response = self.client.get(reverse("registers:register-pdf", args=[register.pk]))
+            stats = self.client.get(reverse("registers:pdf-stats")).json()["results"]
+        limiter.release(slot)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+        self.assertEqual(stats["process"]["rejected"], 1)
+
+
+class ProjectionSerializerTests(TestCase):
+    def test_projection_reads_values_without_model_instances(self) -> None:
+        register = Register.objects.create(name="Projected")
+        today = timezone.now().date()
+        for bundle_type in (ScheduleEntry.DAILY, ScheduleEntry.DAILY, ScheduleEntry.WEEKLY):
+            ScheduleEntry.objects.create(
+                register=register, bundle_type=bundle_type, scheduled_for=today
+            )
+        projection = Projection(
+            {
+                "name": "name",
+                "counts": {
+                    "daily": Count(
+                        "schedule_entries",
+                        filter=Q(schedule_entries__bundle_type=ScheduleEntry.DAILY),
+                    ),
+                    "all": Count("schedule_entries"),
+                },
+            }
+        )
+
+        with mock.patch.object(Register, "from_db", side_effect=AssertionError):
+            rows = projection.rows(Register.objects.all())
+
+        self.assertEqual(rows, [{"name": "Projected", "counts": {"daily": 2, "all": 3}}])
+
+    def test_json_response_encodes_dates_as_iso_format(self) -> None:
+        moment = timezone.now()
+        response = json_response({"day": moment.date(), "at": moment}, status=201)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(response.content),
+            {"day": moment.date().isoformat(), "at": moment.isoformat()},
+        )
+
+    def test_search_results_use_one_query_for_bundle_counts(self) -> None:
+        for index in range(5):
+            register = Register.objects.create(name=f"Counted {index}")
+            ScheduleEntry.objects.create(
+                register=register,
+                bundle_type=ScheduleEntry.WEEKLY,
+                scheduled_for=timezone.now().date(),
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("registers:search"), {"query": "counted"})
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]["bundle_counts"][ScheduleEntry.WEEKLY], 1)
+        # Validator (2), results (1) and facets (1), plus cache bookkeeping.
+        self.assertLessEqual(len(queries), 4)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.register = Register.objects.create(name="Sparse")
+        ScheduleEntry.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=timezone.now().date(),
+        )
+
+    def test_bundle_fields_restrict_output_and_drop_register_join(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("registers:bundle-list-create"),
+                {"fields": "completed,id,scheduled_for"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.json()["results"][0]), ["id", "scheduled_for", "completed"]
+        )
+        listing = [q["sql"] for q in queries if "scheduled_for" in q["sql"] and "LIMIT" in q["sql"]]
+        self.assertEqual(len(listing), 1)
+        self.assertNotIn("JOIN", listing[0].upper())
+
+    def test_search_without_bundle_counts_skips_aggregation(self) -> None:
+        response = self.client.get(
+            reverse("registers:search"), {"query": "sparse", "fields": "id,name"}
+        )
+
+        self.assertEqual(response.json()["results"], [{"id": self.register.pk, "name": "Sparse"}])
+
+    def test_unknown_field_is_rejected(self) -> None:
+        names = ("registers:bundle-list-create", "registers:search", "registers:pending-reminders")
+        for name in names:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name), {"fields": "id,password"})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("password", response.json()["errors"]["fields"][0])
+
+
+class BatchEndpointTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.register = Register.objects.create(name="Batched")
+        self.today = timezone.now().date().isoformat()
+
+    def _batch(self, operations: list[dict], **extra):
+        return self.client.post(
+            reverse("registers:batch"),
+            {"operations": operations, **extra},
+            content_type="application/json",
+        )
+
+    def _entry(self, notes: str) -> dict:
+        return {
+            "method": "POST",
+            "path": reverse("registers:bundle-list-create"),
+            "body": {
+                "register": self.register.pk,
+                "bundle_type": ScheduleEntry.DAILY,
+                "scheduled_for": self.today,
+                "notes": notes,
+            },
+        }
+
+    def test_operations_run_in_order_and_failures_roll_back_alone(self) -> None:
+        response = self._batch(
+            [
+                self._entry("first"),
+                {
+                    "method": "POST",
+                    "path": reverse("registers:document-create"),
+                    "body": {"register": self.register.pk, "title": "Minutes"},
+                },
+                {"method": "POST", "path": reverse("registers:digital-entry"), "body": {}},
+                self._entry("second"),
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], [201, 201, 400, 201])
+        self.assertIn("message", results[2]["body"]["errors"])
+        self.assertEqual(
+            list(ScheduleEntry.objects.order_by("pk").values_list("notes", flat=True)),
+            ["first", "second"],
+        )
+        self.assertTrue(Document.objects.filter(title="Minutes").exists())
+        self.assertEqual(ActivityLog.objects.filter(action="created").count(), 3)
+
+    def test_atomic_batch_rolls_back_everything_on_failure(self) -> None:
+        response = self._batch(
+            [self._entry("kept?"), {"method": "POST", "path": "/nowhere/", "body": {}}],
+            atomic=True,
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["status"] for result in response.json()["results"]], [201, 404])
+        self.assertFalse(ScheduleEntry.objects.exists())
+
+    def test_rejects_nested_batches_and_read_methods(self) -> None:
+        nested = self._batch(
+            [{"method": "POST", "path": reverse("registers:batch"), "body": {}}]
+        )
+        self.assertEqual(nested.json()["results"][0]["status"], 403)
+
+        read = self._batch([{"method": "GET", "path": reverse("registers:search")}])
+        self.assertEqual(read.status_code, 400)
+        self.assertIn("operations", read.json()["errors"])
+
+
+class IdempotencyKeyTests(MediaRootCleanupMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.register = Register.objects.create(name="Retried")
+        self.url = reverse("registers:bundle-list-create")
+        self.payload = {
+            "register": self.register.pk,
+            "bundle_type": ScheduleEntry.DAILY,
+            "scheduled_for": timezone.now().date().isoformat(),
+        }
+
+    def _post(self, payload: dict, key: str = "retry-1"):
+        return self.client.post(
+            self.url, payload, content_type="application/json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_stored_response_without_domain_queries(self) -> None:
+        first = self._post(self.payload)
+        with CaptureQueriesContext(connection) as queries:
+            retry = self._post(self.payload)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+        self.assertEqual(ActivityLog.objects.count(), 1)
+        touched = " ".join(query["sql"] for query in queries)
+        self.assertNotIn("registers_scheduleentry", touched)
+        self.assertNotIn("registers_activitylog", touched)
+
+    def test_key_reused_with_other_payload_is_rejected(self) -> None:
+        self._post(self.payload)
+        response = self._post({**self.payload, "notes": "different"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+    def test_upload_retry_keeps_one_version(self) -> None:
+        document = Document.objects.create(register=self.register, title="Scan")
+        for _ in range(2):
+            response = self.client.post(
+                reverse("registers:document-upload"),
+                {"document": document.pk, "file": SimpleUploadedFile("scan.pdf", b"%PDF-1.4")},
+                HTTP_IDEMPOTENCY_KEY="upload-1",
+            )
+            self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(DocumentVersion.objects.filter(document=document).count(), 1)
+
+    def test_expired_keys_are_purged_and_run_again(self) -> None:
+        self._post(self.payload)
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(self._post(self.payload).status_code, 201)
+        self.assertEqual(ScheduleEntry.objects.count(), 2)
+
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_batch_operations_carry_their_own_keys(self) -> None:
+        operation = {
+            "method": "POST",
+            "path": self.url,
+            "body": self.payload,
+            "idempotency_key": "batched-1",
+        }
+        for _ in range(2):
+            response = self.client.post(
+                reverse("registers:batch"),
+                {"operations": [operation]},
+                content_type="application/json",
+                HTTP_IDEMPOTENCY_KEY="outer",
+            )
+            self.assertEqual(response.json()["results"][0]["status"], 201)
+
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+
+@override_settings(SYNC_SAFETY_LAG=0)
+class DeltaSyncTests(TestCase):
+    def _sync(self, cursor: str = "", **params):
+        response = self.client.get(reverse("registers:sync"), {"cursor": cursor, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_changes_and_then_reports_only_the_delta(self) -> None:
+        registers = [Register.objects.create(name=f"Field {index}") for index in range(3)]
+        entry = ScheduleEntry.objects.create(
+            register=registers[0],
+            bundle_type=ScheduleEntry.DAILY,
+            scheduled_for=timezone.now().date(),
+        )
+
+        first = self._sync(limit=2)
+        second = self._sync(first["cursor"], limit=2)
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        synced = first["changes"]["registers"] + second["changes"]["registers"]
+        self.assertEqual([row["id"] for row in synced], [register.pk for register in registers])
+        self.assertEqual(first["changes"]["schedule_entries"][0]["id"], entry.pk)
+
+        registers[1].description = "Renamed in the field"
+        registers[1].save()
+        entry_id = entry.pk
+        entry.delete()
+        delta = self._sync(second["cursor"])
+
+        self.assertEqual(
+            [row["description"] for row in delta["changes"]["registers"]],
+            ["Renamed in the field"],
+        )
+        self.assertEqual(delta["changes"]["schedule_entries"], [])
+        self.assertEqual(delta["deleted"]["schedule_entries"], [entry_id])
+        self.assertEqual(self._sync(delta["cursor"])["changes"]["registers"], [])
+
+    def test_response_is_gzip_compressed(self) -> None:
+        for index in range(10):
+            Register.objects.create(name=f"Compressed {index}", description="x" * 50)
+
+        response = self.client.get(reverse("registers:sync"), HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        page = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(page["changes"]["registers"]), 10)
+
+    @override_settings(SYNC_SAFETY_LAG=60)
+    def test_recent_changes_wait_for_the_safety_lag(self) -> None:
+        Register.objects.create(name="Just saved")
+
+        self.assertEqual(self._sync()["changes"]["registers"], [])
+
+    def test_rejects_bad_and_expired_cursors(self) -> None:
+        url = reverse("registers:sync")
+        self.assertEqual(self.client.get(url, {"cursor": "not-a-cursor"}).status_code, 400)
+
+        old = timezone.now() - timedelta(days=365)
+        expired = encode_cursor({"deleted": (old, 0)})
+        self.assertEqual(self.client.get(url, {"cursor": expired}).status_code, 410)
+
+    async def test_daily_syncs_without_deletions_never_expire(self) -> None:
+        start = timezone.now()
+        page = await changes_since({}, now=start)
+
+        for day in range(1, 120):
+            cursor = decode_cursor(page["cursor"])
+            page = await changes_since(cursor, now=start + timedelta(days=day))
+
+        self.assertEqual(decode_cursor(page["cursor"])["deleted"][0], start + timedelta(days=119))
+
+    async def test_old_cursor_is_kept_while_its_tombstones_are_retained(self) -> None:
+        register = await Register.objects.acreate(name="Gone")
+        register_id = register.pk
+        await register.adelete()
+        tombstone = await Tombstone.objects.aget()
+        old = timezone.now() - timedelta(days=365)
+        tombstone.deleted_at = old
+        await tombstone.asave()
+
+        page = await changes_since({"deleted": (old, 0)})
+
+        self.assertEqual(page["deleted"]["registers"], [register_id])
+
+    def test_purge_removes_old_tombstones(self) -> None:
+        Register.objects.create(name="Gone").delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+
+        call_command("purge_sync_tombstones", stdout=StringIO())
+
+        self.assertFalse(Tombstone.objects.exists())
+
+
+class RecurrenceMaterializationTests(TestCase):
+    def setUp(self) -> None:
+        self.register = Register.objects.create(name="Recurring Register")
+        self.today = date(2024, 1, 29)  # A Monday.
+
+    def _dates(self, rule: RecurrenceRule) -> list[date]:
+        return list(
+            rule.schedule_entries.order_by("scheduled_for").values_list("scheduled_for", flat=True)
+        )
+
+    def test_weekly_and_monthly_rules_materialize_over_the_horizon(self) -> None:
+        weekly = RecurrenceRule.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.WEEKLY,
+            frequency=RecurrenceRule.WEEKLY,
+            weekdays="1,4",
+            starts_on=date(2023, 1, 1),
+        )
+        monthly = RecurrenceRule.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.PENDING,
+            frequency=RecurrenceRule.MONTHLY,
+            day_of_month=31,
+            starts_on=date(2024, 1, 1),
+        )
+
+        materialize_rules(days=10, today=self.today)
+
+        # Past dates are not backfilled and short months clamp to their last day.
+        self.assertEqual(
+            self._dates(weekly),
+            [date(2024, 1, 29), date(2024, 2, 1), date(2024, 2, 5), date(2024, 2, 8)],
+        )
+        self.assertEqual(self._dates(monthly), [date(2024, 1, 31)])
+        weekly.refresh_from_db()
+        self.assertEqual(weekly.materialized_through, date(2024, 2, 8))
+
+        materialize_rules(days=31, today=self.today)
+        self.assertEqual(self._dates(monthly), [date(2024, 1, 31), date(2024, 2, 29)])
+
+    def test_reruns_are_idempotent_and_incremental(self) -> None:
+        today = timezone.localdate()
+        rule = RecurrenceRule.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            frequency=RecurrenceRule.DAILY,
+            starts_on=today,
+            ends_on=today + timedelta(days=20),
+        )
+        self.assertEqual(materialize_rules(days=6, today=today), 7)
+        self.assertEqual(materialize_rules(days=6, today=today), 0)
+
+        # A lost watermark makes the run repeat dates; only new ones are counted.
+        RecurrenceRule.objects.filter(pk=rule.pk).update(materialized_through=None)
+        stdout = StringIO()
+        call_command("materialize_schedule", days=9, stdout=stdout)
+        self.assertIn("Materialized 3 schedule entries.", stdout.getvalue())
+        self.assertEqual(rule.schedule_entries.count(), 10)
+
+        self.assertEqual(materialize_rules(days=30, today=today + timedelta(days=5)), 11)
+        self.assertEqual(self._dates(rule)[-1], rule.ends_on)
+        self.assertEqual(rule.schedule_entries.count(), 21)
+
+
+    def test_reactivated_rules_do_not_backfill_the_dates_they_missed(self) -> None:
+        rule = RecurrenceRule.objects.create(
+            register=self.register,
+            bundle_type=ScheduleEntry.DAILY,
+            frequency=RecurrenceRule.DAILY,
+            starts_on=self.today,
+        )
+        self.assertEqual(materialize_rules(days=2, today=self.today), 3)
+        RecurrenceRule.objects.filter(pk=rule.pk).update(is_active=False)
+
+        later = self.today + timedelta(days=30)
+        self.assertEqual(materialize_rules(days=2, today=later), 0)
+        RecurrenceRule.objects.filter(pk=rule.pk).update(is_active=True)
+
+        self.assertEqual(materialize_rules(days=2, today=later), 3)
+        self.assertEqual(
+            self._dates(rule)[3:], [later, later + timedelta(days=1), later + timedelta(days=2)]
+        )
+
+
+class ReminderStreamTests(TestCase):
+    def test_events_cover_created_and_due_reminders(self) -> None:
+        register = Register.objects.create(name="Stream Register")
+        now = timezone.now()
+        due = Reminder.objects.create(
+            register=register, remind_at=now - timedelta(seconds=5), message="Due now"
+        )
+        Reminder.objects.filter(pk=due.pk).update(created_at=now - timedelta(days=1))
+        upcoming = Reminder.objects.create(
+            register=register, remind_at=now + timedelta(days=2), message="Upcoming"
+        )
+        Reminder.objects.create(
+            register=register, remind_at=now + timedelta(days=30), message="Far away"
+        )
+
+        events = fetch_reminder_events(now - timedelta(minutes=1), now + timedelta(seconds=1))
+
+        self.assertEqual(
+            [(event["id"], event["event"]) for event in events],
+            [(due.id, "due"), (upcoming.id, "created")],
+        )
+        self.assertTrue(format_event(events[0]).startswith(f"id: {due.id}\nevent: due\n"))
+
+    async def test_failed_listens_back_off_to_plain_polling(self) -> None:
+        broadcaster = ReminderBroadcaster(interval=0.01)
+        channel = _LoopChannel()
+        refused = mock.AsyncMock(side_effect=TypeError("notifies() got an unexpected keyword"))
+
+        with (
+            mock.patch("registers.events.connection") as database,
+            mock.patch.object(broadcaster, "_wait_for_notification", refused),
+            self.assertLogs("registers.events", "WARNING"),
+        ):
+            database.vendor = "postgresql"
+            await broadcaster._wait(channel)
+            await broadcaster._wait(channel)
+
+        self.assertEqual(refused.await_count, 1)
+        self.assertEqual(channel.listen_failures, 1)
+
+    async def test_one_poll_is_shared_by_every_subscriber(self) -> None:
+        calls = []
+
+        def fetch(since, until):
+            calls.append(until)
+            return [{"event": "due", "id": len(calls)}]
+
+        hub = ReminderBroadcaster(interval=0.01, fetch=fetch)
+        queues = [hub.subscribe() for _ in range(50)]
+
+        received = [await asyncio.wait_for(queue.get(), timeout=2) for queue in queues]
+        for queue in queues:
+            hub.unsubscribe(queue)
+
+        self.assertEqual({event["id"] for event in received}, {1})
+        self.assertEqual(hub.subscriber_count, 0)
+
+    async def test_polls_look_back_for_late_commits_without_repeats(self) -> None:
+        windows = []
+
+        def fetch(since, until):
+            windows.append((since, until))
+            # Committed late: only visible from the second poll on.
+            return [{"event": "created", "id": 7}] if len(windows) > 1 else []
+
+        hub = ReminderBroadcaster(interval=0.01, safety_lag=30, fetch=fetch)
+        queue = hub.subscribe()
+        event = await asyncio.wait_for(queue.get(), timeout=2)
+        while len(windows) < 5:
+            await asyncio.sleep(0.01)
+        hub.unsubscribe(queue)
+
+        self.assertEqual(event["id"], 7)
+        self.assertTrue(queue.empty())
+        self.assertLessEqual(windows[1][0], windows[0][1] - timedelta(seconds=30))
+
+    async def test_streams_on_other_loops_keep_their_subscribers(self) -> None:
+        hub = ReminderBroadcaster(
+            interval=0.01, fetch=lambda since, until: [{"event": "due", "id": 1}]
+        )
+        queue = hub.subscribe()
+
+        async def elsewhere():
+            other = hub.subscribe()
+            try:
+                return await asyncio.wait_for(other.get(), timeout=2)
+            finally:
+                hub.unsubscribe(other)
+
+        other_event = await asyncio.to_thread(asyncio.run, elsewhere())
+        event = await asyncio.wait_for(queue.get(), timeout=2)
+        hub.unsubscribe(queue)
+
+        self.assertEqual((other_event["id"], event["id"]), (1, 1))
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_stream_is_refused_under_wsgi(self) -> None:
+        response = self.client.get(reverse("registers:reminder-stream"))
+
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+    @override_settings(REMINDER_STREAM_INTERVAL=0.01)
+    async def test_stream_pushes_new_reminders(self) -> None:
+        register = await Register.objects.acreate(name="Live Register")
+        response = await self.async_client.get(reverse("registers:reminder-stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        reminder = await Reminder.objects.acreate(
+            register=register, remind_at=timezone.now() + timedelta(hours=1), message="Prepare"
+        )
+        chunk = await asyncio.wait_for(anext(stream), timeout=2)
+        await stream.aclose()
+
+        self.assertIn(f"id: {reminder.id}\nevent: created".encode(), chunk)
+
+
 class RegisterSearchTests(TestCase):
     def test_cleaned_filters_returns_expected_mapping(self) -> None:
         form = RegisterSearchForm(
@@ -215,6 +2158,14 @@ class RegisterSearchTests(TestCase):
         )
         self.assertNotIn("query", filters)
 
+    def test_search_view_without_completion_filter(self) -> None:
+        Register.objects.create(name="Omega")
+
+        response = self.client.get(reverse("registers:search"), {"query": "ome"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result["name"] for result in response.json()["results"]], ["Omega"])
+
     def test_search_view_filters_by_bundle_completion_and_query(self) -> None:
         alpha = Register.objects.create(name="Alpha")
         ScheduleEntry.objects.create(
@@ -262,6 +2213,41 @@ class RegisterSearchTests(TestCase):
         self.assertEqual(result["bundle_counts"][ScheduleEntry.DAILY], 1)
         self.assertEqual(result["bundle_counts"][ScheduleEntry.WEEKLY], 0)
 
+    def test_search_facets_count_each_value_in_one_query(self) -> None:
+        today = timezone.now().date()
+        for name, entries in (
+            ("Parish North", [(ScheduleEntry.DAILY, True), (ScheduleEntry.WEEKLY, False)]),
+            ("Parish South", [(ScheduleEntry.DAILY, False)]),
+            ("Parish East", []),
+            ("Census West", [(ScheduleEntry.DAILY, True)]),
+        ):
+            register = Register.objects.create(name=name)
+            for bundle_type, completed in entries:
+                ScheduleEntry.objects.create(
+                    register=register,
+                    bundle_type=bundle_type,
+                    scheduled_for=today,
+                    completed=completed,
+                )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("registers:search"), {"query": "parish", "bundle_type": "daily"}
+            )
+        facets = response.json()["facets"]
+
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(
+            {key: facet["count"] for key, facet in facets["bundle_type"].items()},
+            {ScheduleEntry.DAILY: 2, ScheduleEntry.WEEKLY: 1, ScheduleEntry.PENDING: 0},
+        )
+        self.assertTrue(facets["bundle_type"][ScheduleEntry.DAILY]["selected"])
+        # Completion counts keep the bundle filter but not their own.
+        self.assertEqual(facets["completed"]["true"], {"count": 1, "selected": False})
+        self.assertEqual(facets["completed"]["false"], {"count": 1, "selected": False})
+        facet_queries = [q for q in queries if "COUNT(DISTINCT" in q["sql"].upper()]
+        self.assertEqual(len(facet_queries), 1)
+
 
 class WeeklyBackupCommandTests(TestCase):
     def setUp(self) -> None:
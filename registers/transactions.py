@@ -0,0 +1,93 @@
+"""Take SQLite's write lock up front, but only for transactions that write.
+
+A deferred SQLite transaction that reads before it writes has to upgrade
+its lock, and when another connection is already writing the upgrade
+fails straight away with "database is locked" instead of waiting out the
+busy timeout. Starting such transactions with ``BEGIN IMMEDIATE`` makes
+writers queue behind each other. Doing that for every connection would
+also serialize plain reads, so it is limited to requests with an unsafe
+method (:func:`sqlite_write_lock_middleware`) and to code outside requests
+that opts in with :func:`write_atomic`. Other databases are left alone.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+from .replicas import UNSAFE_METHODS
+
+
+@contextmanager
+def immediate_transactions(connection: BaseDatabaseWrapper) -> Iterator[None]:
+    """Begin transactions on ``connection`` with ``BEGIN IMMEDIATE`` while active."""
+
+    if connection.vendor != "sqlite":
+        yield
+        return
+    # Connecting resets transaction_mode from the settings, so connect first.
+    connection.ensure_connection()
+    previous = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        yield
+    finally:
+        connection.transaction_mode = previous
+
+
+@contextmanager
+def write_atomic(using: str | None = None) -> Iterator[None]:
+    """``transaction.atomic`` for blocks that read and then write.
+
+    Inside an existing transaction this is a plain savepoint: the lock mode
+    was decided when the outer transaction began.
+    """
+
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    with immediate_transactions(connection), transaction.atomic(using=using):
+        yield
+
+
+def _lock_for(request: HttpRequest):
+    if request.method in UNSAFE_METHODS:
+        return immediate_transactions(connections[DEFAULT_DB_ALIAS])
+    return None
+
+
+@sync_and_async_middleware
+def sqlite_write_lock_middleware(get_response):
+    """Begin the transactions of write requests with SQLite's write lock."""
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request: HttpRequest) -> HttpResponse:
+            lock = _lock_for(request)
+            if lock is None:
+                return await get_response(request)
+            # Connections are per thread: set the mode on the one the ORM uses.
+            await sync_to_async(lock.__enter__)()
+            try:
+                return await get_response(request)
+            finally:
+                await sync_to_async(lock.__exit__)(None, None, None)
+
+    else:
+
+        def middleware(request: HttpRequest) -> HttpResponse:
+            lock = _lock_for(request)
+            if lock is None:
+                return get_response(request)
+            with lock:
+                return get_response(request)
+
+    return middleware
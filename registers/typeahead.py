@@ -0,0 +1,261 @@
+"""Fuzzy register name lookup ranked by trigram similarity.
+
+On PostgreSQL the query runs against a ``pg_trgm`` GIN index using
+``word_similarity``, which scores how well the typed text matches any part
+of a name and so suits prefix typing as well as typos. Other databases use
+:class:`TrigramIndex`, an in-process inverted index over the same kind of
+trigrams. Register signals bump a generation counter in the cache and log
+the changed ids under the new generation; on its next lookup every process
+re-reads just those registers into its index. Bulk imports, and change logs
+that were evicted or have grown too long, make it rebuild instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Any, Iterable
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from .models import Register
+
+GENERATION_KEY = "registers:typeahead:generation"
+CHANGE_KEY = "registers:typeahead:changes:{}"
+# Longer gaps are cheaper to close with a rebuild than by replaying changes.
+MAX_REPLAYED_GENERATIONS = 1000
+CHANGE_TIMEOUT = 24 * 60 * 60
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Candidates are gathered from the rarest query trigrams until this many
+# posting entries have been counted, then scored exactly.
+POSTING_BUDGET = 50_000
+CANDIDATES_PER_RESULT = 5
+PG_THRESHOLD = 0.3
+
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm style trigrams: lower-cased words padded with two spaces before, one after."""
+
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update([padded[i : i + 3] for i in range(len(padded) - 2)])
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigram to the positions of the names containing it.
+
+    Changed names are appended and their old position is left as a gap, so
+    searches running in other threads never see postings shift under them.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, str]] = ()) -> None:
+        self.ids = array("q")
+        self.names: list[str | None] = []
+        self.postings: dict[str, array] = {}
+        self.positions: dict[int, int] = {}
+        self.gaps = 0
+        for pk, name in rows:
+            self._add(pk, name)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _add(self, pk: int, name: str) -> None:
+        position = len(self.names)
+        self.ids.append(pk)
+        self.names.append(name)
+        self.positions[pk] = position
+        postings = self.postings
+        for gram in trigrams(name):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("l")
+            posting.append(position)
+
+    def discard(self, pk: int) -> None:
+        position = self.positions.pop(pk, None)
+        if position is not None:
+            self.names[position] = None
+            self.gaps += 1
+
+    def update(self, pk: int, name: str) -> None:
+        """Index ``name`` for ``pk``, replacing the name indexed before."""
+
+        position = self.positions.get(pk)
+        if position is not None and self.names[position] == name:
+            return
+        self.discard(pk)
+        self._add(pk, name)
+
+    def needs_compaction(self) -> bool:
+        return self.gaps > 1000 and self.gaps > len(self.positions) // 4
+
+    def compacted(self) -> TrigramIndex:
+        return TrigramIndex(
+            (self.ids[position], self.names[position])
+            for position in sorted(self.positions.values())
+        )
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[tuple[int, str, float]]:
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+
+        counts: Counter[int] = Counter()
+        counted = 0
+        for posting in sorted(
+            (self.postings[gram] for gram in wanted if gram in self.postings), key=len
+        ):
+            # Common trigrams add little once the rare ones found candidates.
+            if counted and counted + len(posting) > POSTING_BUDGET:
+                break
+            counts.update(posting)
+            counted += len(posting)
+
+        wanted_candidates = limit * CANDIDATES_PER_RESULT
+        scored = []
+        # Over-fetch by the number of gaps so they cannot crowd out live names.
+        for position, _ in counts.most_common(wanted_candidates + self.gaps):
+            name = self.names[position]
+            if name is None:
+                continue
+            grams = trigrams(name)
+            shared = len(wanted & grams)
+            # Share of the query found in the name, like word_similarity(),
+            # with whole-name similarity to break ties.
+            score = shared / len(wanted)
+            similarity = shared / len(wanted | grams)
+            scored.append((score, similarity, position, name))
+            if len(scored) == wanted_candidates:
+                break
+
+        best = heapq.nlargest(limit, scored)
+        return [
+            (self.ids[position], name, round(score, 4)) for score, _, position, name in best
+        ]
+
+
+_index: TrigramIndex | None = None
+_index_generation: Any = None
+_index_lock = threading.Lock()
+
+
+def _next_generation() -> int:
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Seeded from the clock so an evicted counter never repeats a value.
+        seed = time.time_ns() // 1000
+        if cache.add(GENERATION_KEY, seed, None):
+            return seed
+        return cache.incr(GENERATION_KEY)
+
+
+def _log_change(pks: list[int] | None) -> None:
+    # None asks for a rebuild; so does a generation whose entry is missing.
+    cache.set(CHANGE_KEY.format(_next_generation()), pks, CHANGE_TIMEOUT)
+
+
+def _log_now_and_on_commit(pks: list[int] | None) -> None:
+    # Logged again on commit, so an index refreshed while the write was
+    # still uncommitted re-reads the committed names.
+    _log_change(pks)
+    transaction.on_commit(lambda: _log_change(pks))
+
+
+def mark_changed(pks: Iterable[int]) -> None:
+    """Have every process re-read these registers before its next lookup."""
+
+    _log_now_and_on_commit(sorted(set(pks)))
+
+
+def mark_stale() -> None:
+    """Make every process rebuild its index before the next lookup."""
+
+    _log_now_and_on_commit(None)
+
+
+def _changes_between(old: Any, new: Any) -> set[int] | None:
+    """Ids changed after generation ``old`` up to ``new``, or ``None`` to rebuild."""
+
+    if not isinstance(old, int) or not isinstance(new, int):
+        return None
+    if not 0 < new - old <= MAX_REPLAYED_GENERATIONS:
+        return None
+    keys = [CHANGE_KEY.format(generation) for generation in range(old + 1, new + 1)]
+    logged = cache.get_many(keys)
+    changed: set[int] = set()
+    for key in keys:
+        pks = logged.get(key)
+        if pks is None:
+            return None
+        changed.update(pks)
+    return changed
+
+
+def get_index(using: str | None = None) -> TrigramIndex:
+    global _index, _index_generation
+
+    generation = cache.get(GENERATION_KEY)
+    with _index_lock:
+        if _index is not None and generation == _index_generation:
+            return _index
+        changed = None if _index is None else _changes_between(_index_generation, generation)
+        if changed is None:
+            rows = Register.objects.using(using).values_list("pk", "name").iterator(chunk_size=5000)
+            _index = TrigramIndex(rows)
+        else:
+            names = dict(
+                Register.objects.using(using).filter(pk__in=changed).values_list("pk", "name")
+            )
+            for pk in changed:
+                if pk in names:
+                    _index.update(pk, names[pk])
+                else:
+                    _index.discard(pk)
+            if _index.needs_compaction():
+                _index = _index.compacted()
+        _index_generation = generation
+        return _index
+
+
+def _search_postgresql(connection, query: str, limit: int) -> list[tuple[int, str, float]]:
+    table = connection.ops.quote_name(Register._meta.db_table)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # <% filters on this setting (0.6 by default), not on a WHERE clause;
+        # is_local=true confines it to this transaction.
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(PG_THRESHOLD)],
+        )
+        # <% lets the planner use the gin_trgm_ops index on name.
+        cursor.execute(
+            f"SELECT id, name, word_similarity(%s, name) AS score FROM {table} "
+            "WHERE %s <%% name ORDER BY score DESC, name LIMIT %s",
+            [query, query, limit],
+        )
+        return [(pk, name, round(score, 4)) for pk, name, score in cursor.fetchall()]
+
+
+def search_register_names(
+    query: str, limit: int = DEFAULT_LIMIT, using: str | None = None
+) -> list[tuple[int, str, float]]:
+    """The ``limit`` register names closest to ``query`` as ``(id, name, score)``."""
+
+    query = query.strip()
+    if not query:
+        return []
+    connection = connections[using or "default"]
+    if connection.vendor == "postgresql":
+        return _search_postgresql(connection, query, limit)
+    return get_index(using).search(query, limit)
@@ -0,0 +1,241 @@
+"""Resumable chunked uploads for large document scans.
+
+Chunks are streamed from the request to disk and appended to a partial file,
+and the SHA-256 digest is updated as the bytes arrive, so a 200 MB scan never
+sits in memory and an interrupted upload can resume from the last stored
+offset. Only :func:`finalize_upload` touches :class:`DocumentVersion`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityLog, DocumentVersion, UploadSession
+from .transactions import write_atomic
+
+CHUNK_READ_SIZE = 64 * 1024
+
+# Running digests keyed by session id, together with the offset they cover.
+# A digest is only reused when its offset still matches the stored session,
+# otherwise it is rebuilt from the partial file (e.g. after a restart or when
+# another worker process accepted the previous chunk).
+_digests: dict[int, tuple[int, "hashlib._Hash"]] = {}
+_digests_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Raised when a chunk or finalize request cannot be applied."""
+
+    status_code = 400
+
+    def __init__(self, message: str, *, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadOffsetMismatch(UploadError):
+    """The client sent a chunk that does not continue the stored data."""
+
+    status_code = 409
+
+
+class UploadGone(UploadError):
+    """The session was finalized but the version it produced no longer exists."""
+
+    status_code = 410
+
+
+def upload_root() -> Path:
+    root = getattr(settings, "CHUNKED_UPLOAD_ROOT", None)
+    if root is None:
+        root = Path(settings.BASE_DIR) / ".tmp" / "uploads"
+    return Path(root)
+
+
+def partial_path(session: UploadSession) -> Path:
+    return upload_root() / f"{session.token}.part"
+
+
+def _running_digest(session: UploadSession, path: Path) -> "hashlib._Hash":
+    with _digests_lock:
+        cached = _digests.get(session.pk)
+    if cached and cached[0] == session.received:
+        return cached[1].copy()
+
+    digest = hashlib.sha256()
+    if session.received and path.exists():
+        remaining = session.received
+        with path.open("rb") as handle:
+            while remaining:
+                block = handle.read(min(CHUNK_READ_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+    return digest
+
+
+def _remember_digest(session: UploadSession, digest: "hashlib._Hash") -> None:
+    with _digests_lock:
+        _digests[session.pk] = (session.received, digest)
+
+
+def _forget_digest(session: UploadSession) -> None:
+    with _digests_lock:
+        _digests.pop(session.pk, None)
+
+
+def _check_chunk(session: UploadSession, offset: int, length: int) -> None:
+    if session.completed_at:
+        raise UploadError("Upload has already been finalized.", offset=session.received)
+    if offset < 0 or length < 0:
+        raise UploadError("Offset and length must be positive.", offset=session.received)
+    if offset > session.received:
+        raise UploadOffsetMismatch(
+            f"Expected a chunk starting at offset {session.received}.",
+            offset=session.received,
+        )
+    if offset + length > session.total_size:
+        raise UploadError("Chunk extends beyond the declared file size.", offset=session.received)
+
+
+def write_chunk(session: UploadSession, offset: int, stream: BinaryIO, length: int) -> int:
+    """Store ``length`` bytes read from ``stream`` at ``offset``.
+
+    Re-sending a chunk that is already stored is a no-op, and a chunk that
+    overlaps the stored data only contributes its new tail. Returns the number
+    of bytes now stored for the session.
+
+    The request body is read into a staging file before any lock is taken, so
+    a slow client never holds the database write lock. Only the append of the
+    staged bytes and the update of ``received`` run under the session's row
+    lock, and they fail with :class:`UploadOffsetMismatch` if another request
+    stored data in the meantime. Must not be called inside a transaction.
+    """
+
+    _check_chunk(session, offset, length)
+    if offset + length <= session.received:
+        return session.received
+
+    start = session.received
+    path = partial_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = _running_digest(session, path)
+    staged = path.with_name(f"{path.name}.{uuid.uuid4().hex}.chunk")
+    skip = start - offset
+    remaining = length
+    written = 0
+
+    try:
+        with staged.open("wb") as handle:
+            while remaining:
+                block = stream.read(min(CHUNK_READ_SIZE, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                if skip:
+                    dropped = min(skip, len(block))
+                    block = block[dropped:]
+                    skip -= dropped
+                if block:
+                    handle.write(block)
+                    digest.update(block)
+                    written += len(block)
+
+        with write_atomic():
+            locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+            session.received, session.completed_at = locked.received, locked.completed_at
+            if locked.received != start:
+                _check_chunk(locked, offset, length)
+                if offset + length <= locked.received:
+                    return locked.received
+                raise UploadOffsetMismatch(
+                    f"Expected a chunk starting at offset {locked.received}.",
+                    offset=locked.received,
+                )
+            with path.open("r+b" if path.exists() else "wb") as handle:
+                # Anything past the stored offset belongs to an interrupted write.
+                handle.seek(start)
+                handle.truncate()
+                with staged.open("rb") as chunk:
+                    shutil.copyfileobj(chunk, handle, CHUNK_READ_SIZE)
+            locked.received = start + written
+            locked.save(update_fields=["received", "updated_at"])
+    finally:
+        staged.unlink(missing_ok=True)
+
+    session.received = locked.received
+    _remember_digest(session, digest)
+    return session.received
+
+
+class _PartialUploadFile(File):
+    """Expose a completed partial file so storage can move it into place."""
+
+    def __init__(self, path: Path, name: str, sha256: str) -> None:
+        super().__init__(path.open("rb"), name=name)
+        self._path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self) -> str:
+        return str(self._path)
+
+
+def finalize_upload(session: UploadSession, *, user=None, sha256: str = "") -> DocumentVersion:
+    """Turn a fully received session into a :class:`DocumentVersion`."""
+
+    if session.completed_at and session.version_id:
+        return session.version
+    if session.completed_at:
+        # The chunks were discarded when the session was finalized.
+        raise UploadGone("The uploaded version was deleted; start a new upload.")
+    if session.received != session.total_size:
+        raise UploadOffsetMismatch(
+            f"Upload incomplete: {session.received} of {session.total_size} bytes received.",
+            offset=session.received,
+        )
+
+    path = partial_path(session)
+    digest = _running_digest(session, path).hexdigest()
+    if sha256 and sha256.lower() != digest:
+        raise UploadError("Checksum mismatch; upload must be restarted.", offset=session.received)
+
+    with transaction.atomic():
+        version = DocumentVersion(
+            document=session.document,
+            original_filename=session.filename,
+            sha256=digest,
+            size=session.total_size,
+            notes=session.notes,
+            uploaded_by=user,
+        )
+        upload = _PartialUploadFile(path, session.filename, digest)
+        try:
+            version.file.save(session.filename, upload, save=False)
+        finally:
+            upload.close()
+        version.save()
+        ActivityLog.log(
+            register=session.document.register,
+            action="document_uploaded",
+            details=f"Uploaded version {version.version} of {session.document.title}",
+            user=user,
+        )
+        session.sha256 = digest
+        session.version = version
+        session.completed_at = timezone.now()
+        session.save(update_fields=["sha256", "version", "completed_at", "updated_at"])
+
+    _forget_digest(session)
+    path.unlink(missing_ok=True)
+    return version
@@ -7,12 +7,42 @@ from . import views
 app_name = "registers"
 
 urlpatterns = [
+    path("batch/", views.batch_operations, name="batch"),
     path("bundles/", views.ScheduleEntryView.as_view(), name="bundle-list-create"),
+    path("bundles/complete/", views.BundleCompletionView.as_view(), name="bundle-complete"),
     path("digital-entry/", views.DigitalEntryView.as_view(), name="digital-entry"),
     path("documents/", views.DocumentView.as_view(), name="document-create"),
     path("documents/upload/", views.DocumentUploadView.as_view(), name="document-upload"),
+    path("documents/uploads/", views.UploadSessionView.as_view(), name="upload-session-create"),
+    path(
+        "documents/uploads/<uuid:token>/",
+        views.UploadChunkView.as_view(),
+        name="upload-session-detail",
+    ),
+    path(
+        "documents/uploads/<uuid:token>/complete/",
+        views.UploadCompleteView.as_view(),
+        name="upload-session-complete",
+    ),
+    path(
+        "documents/versions/<int:pk>/download/",
+        views.download_document_version,
+        name="document-download",
+    ),
+    path(
+        "documents/versions/<int:pk>/preview/",
+        views.document_version_preview,
+        name="document-preview",
+    ),
     path("registers/<int:pk>/pdf/", views.generate_register_pdf_view, name="register-pdf"),
+    path("analytics/completion/", views.completion_analytics, name="completion-analytics"),
+    path("exports/<slug:dataset>/", views.export_dataset, name="export"),
     path("search/", views.search_registers, name="search"),
+    path("sync/", views.sync_changes, name="sync"),
+    path("typeahead/", views.typeahead_registers, name="typeahead"),
     path("reminders/", views.pending_reminders, name="pending-reminders"),
+    path("reminders/stream/", views.reminder_stream, name="reminder-stream"),
+    path("cache-stats/", views.response_cache_stats, name="cache-stats"),
+    path("pdf-stats/", views.pdf_render_stats, name="pdf-stats"),
     path("health/", views.health_view, name="health"),
 ]
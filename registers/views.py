@@ -2,27 +2,80 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from functools import lru_cache
 from typing import Any
 
-from django.db.models import Q
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router, transaction
+from django.db.models import Count, F, Max, Q, QuerySet, Sum
+from django.db.models.functions import TruncWeek
+from django.http import (
+    FileResponse,
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_POST, require_safe
 
+from .admission import AdmissionLimiter, Rejected
+from .batch import BatchFailed, not_batchable, run_batch
+from .cache import all_registers, cache_stats, cached_response, register_scope
+from .conditional import conditional_list
+from .downloads import accelerated_response, file_response
+from .events import broadcaster, format_event
+from .exports import (
+    EXPORTS,
+    FORMATS,
+    encode_export,
+    export_filename,
+    export_rows,
+    iterate_in_thread,
+)
 from .forms import (
+    BatchForm,
+    BulkCompletionForm,
+    CompletionAnalyticsForm,
     DigitalEntryForm,
     DocumentForm,
     DocumentVersionForm,
+    ExportForm,
     RegisterSearchForm,
     ScheduleEntryForm,
+    SyncForm,
+    TypeaheadForm,
+    UploadSessionForm,
+)
+from .idempotency import idempotent
+from .models import (
+    ActivityLog,
+    CompletionRollup,
+    DocumentVersion,
+    PreviewJob,
+    Register,
+    Reminder,
+    ScheduleEntry,
+    UploadSession,
 )
-from .models import ActivityLog, Register, ScheduleEntry
-from .pdf import render_register_pdf
+from .pdf import collect_register_summaries, render_summaries_pdf
+from .replicas import read_from_replica
+from .rollups import last_refreshed_at
+from .serializers import FieldSelectionError, Projection, json_response
+from .sync import ExpiredCursor, changes_since
+from .typeahead import search_register_names
+from .uploads import UploadError, finalize_upload, write_chunk
 
 
 def _data_from_request(request: HttpRequest) -> dict[str, Any]:
@@ -44,30 +97,109 @@ def _current_user(request: HttpRequest):
     return None
 
 
+@lru_cache(maxsize=1)
+def _pdf_executor() -> ThreadPoolExecutor:
+    # Bounded so a burst of PDF requests cannot spawn unlimited render threads.
+    workers = getattr(settings, "PDF_RENDER_WORKERS", 2)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-render")
+
+
+@lru_cache(maxsize=1)
+def _pdf_limiter() -> AdmissionLimiter:
+    # One slot per render thread, so admitted requests never queue in the executor.
+    return AdmissionLimiter(
+        "pdf",
+        process_slots=getattr(settings, "PDF_RENDER_WORKERS", 2),
+        queue=getattr(settings, "PDF_RENDER_QUEUE", 4),
+        wait=getattr(settings, "PDF_RENDER_QUEUE_TIMEOUT", 2.0),
+        global_slots=getattr(settings, "PDF_RENDER_GLOBAL_SLOTS", 0),
+        lock_dir=getattr(settings, "PDF_RENDER_LOCK_DIR", None),
+    )
+
+
+SCHEDULE_ENTRY_LIST = Projection(
+    {
+        "id": "id",
+        "register": "register__name",
+        "bundle_type": "bundle_type",
+        "scheduled_for": "scheduled_for",
+        "completed": "completed",
+    }
+)
+REGISTER_SEARCH_RESULT = Projection(
+    {
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "bundle_counts": {
+            key: Count("schedule_entries", filter=Q(schedule_entries__bundle_type=key))
+            for key, _ in ScheduleEntry.BUNDLE_CHOICES
+        },
+    }
+)
+PENDING_REMINDER_LIST = Projection(
+    {
+        "register": "register__name",
+        "remind_at": "remind_at",
+        "message": "message",
+    }
+)
+
+
+def _schedule_entry_queryset(request: HttpRequest) -> QuerySet[ScheduleEntry]:
+    qs = ScheduleEntry.objects.all()
+    bundle_type = request.GET.get("bundle_type")
+    if bundle_type:
+        qs = qs.filter(bundle_type=bundle_type)
+    if request.GET.get("register"):
+        qs = qs.filter(register_id=request.GET["register"])
+    return qs
+
+
+def _register_names_modified() -> Any:
+    # Lists embed register names; checking the registers table separately
+    # keeps the per-list aggregate free of a join so it can stay index-only.
+    return Register.objects.aggregate(modified=Max("updated_at"))["modified"]
+
+
+def _bundle_list_validator(request: HttpRequest, *args, **kwargs) -> dict[str, Any]:
+    values = _schedule_entry_queryset(request).aggregate(
+        count=Count("id"), modified=Max("updated_at")
+    )
+    values["registers_modified"] = _register_names_modified()
+    return values
+
+
+# Async views opt out of ATOMIC_REQUESTS, which Django only supports for sync
+# views; their writes open transactions explicitly instead. Each handler does
+# all of its database and cache work in a single sync_to_async call: hopping
+# to the ORM thread once per query made these endpoints slower under ASGI
+# than under WSGI.
 @method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
 class ScheduleEntryView(View):
     """Create or list schedule entries, grouped by bundle type."""
 
-    def get(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
-        bundle_type = request.GET.get("bundle_type")
-        qs = ScheduleEntry.objects.select_related("register")
-        if bundle_type:
-            qs = qs.filter(bundle_type=bundle_type)
-        if request.GET.get("register"):
-            qs = qs.filter(register_id=request.GET["register"])
-        data = [
-            {
-                "id": entry.id,
-                "register": entry.register.name,
-                "bundle_type": entry.bundle_type,
-                "scheduled_for": entry.scheduled_for.isoformat(),
-                "completed": entry.completed,
-            }
-            for entry in qs.order_by("-scheduled_for")[:50]
-        ]
-        return JsonResponse({"results": data})
+    async def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        return await sync_to_async(self._list)(request)
 
-    def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+    @method_decorator(read_from_replica)
+    @method_decorator(conditional_list(_bundle_list_validator))
+    @method_decorator(cached_response("bundles", scope=register_scope))
+    def _list(self, request: HttpRequest) -> HttpResponse:
+        try:
+            projection = SCHEDULE_ENTRY_LIST.for_request(request)
+        except FieldSelectionError as exc:
+            return JsonResponse({"errors": {"fields": [str(exc)]}}, status=400)
+        qs = _schedule_entry_queryset(request).order_by("-scheduled_for")[:50]
+        return json_response({"results": projection.rows(qs)})
+
+    async def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        return await sync_to_async(self._create)(request)
+
+    @method_decorator(idempotent)
+    @transaction.atomic
+    def _create(self, request: HttpRequest) -> JsonResponse:
         payload = _data_from_request(request)
         form = ScheduleEntryForm(payload)
         if form.is_valid():
@@ -88,6 +220,44 @@ class ScheduleEntryView(View):
         return JsonResponse({"errors": form.errors}, status=400)
 
 
+@method_decorator(csrf_exempt, name="dispatch")
+class BundleCompletionView(View):
+    """Sign off many schedule entries at once, by id or by filter."""
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        form = BulkCompletionForm(_data_from_request(request))
+        if form.is_valid():
+            ids = ScheduleEntry.complete_many(form.queryset(), user=_current_user(request))
+            return JsonResponse(
+                {"completed": len(ids), "ids": ids, "message": "Schedule entries completed"}
+            )
+        return JsonResponse({"errors": form.errors}, status=400)
+
+
+@not_batchable
+@csrf_exempt
+@require_POST
+def batch_operations(request: HttpRequest) -> JsonResponse:
+    """Run an ordered list of writes against the other endpoints in one request."""
+
+    form = BatchForm(_data_from_request(request))
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    try:
+        results = run_batch(
+            request, form.cleaned_data["operations"], atomic=form.cleaned_data["atomic"]
+        )
+    except BatchFailed as exc:
+        return JsonResponse(
+            {
+                "errors": {"operations": [f"{exc}; no operation was applied."]},
+                "results": exc.results,
+            },
+            status=400,
+        )
+    return JsonResponse({"results": results})
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class DigitalEntryView(View):
     """Capture digital register entries and store them as activity logs."""
@@ -107,6 +277,7 @@ class DigitalEntryView(View):
 class DocumentUploadView(View):
     """Handle scanned document uploads with automatic versioning."""
 
+    @method_decorator(idempotent)
     def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
         data = request.POST.copy()
         form = DocumentVersionForm(data, request.FILES)
@@ -130,10 +301,101 @@ class DocumentUploadView(View):
         return JsonResponse({"errors": form.errors}, status=400)
 
 
+def _upload_session_payload(session: UploadSession) -> dict[str, Any]:
+    return {
+        "upload_id": str(session.token),
+        "offset": session.received,
+        "total_size": session.total_size,
+        "complete": session.completed_at is not None,
+    }
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadSessionView(View):
+    """Open a resumable upload session for a large scan."""
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        payload = _data_from_request(request)
+        form = UploadSessionForm(payload)
+        if form.is_valid():
+            session = form.save(user=_current_user(request))
+            return JsonResponse(_upload_session_payload(session), status=201)
+        return JsonResponse({"errors": form.errors}, status=400)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class UploadChunkView(View):
+    """Report progress for, or append a chunk to, an upload session.
+
+    Chunks are sent as the raw request body of a ``PUT`` with the byte offset
+    in the ``offset`` query parameter. Repeating a chunk is harmless, so
+    clients can simply resend from the ``offset`` returned by ``GET``. The
+    view runs outside ``ATOMIC_REQUESTS`` so receiving a chunk holds no lock.
+    """
+
+    def get(self, request: HttpRequest, token, *args, **kwargs) -> JsonResponse:
+        session = get_object_or_404(UploadSession, token=token)
+        return JsonResponse(_upload_session_payload(session))
+
+    def put(self, request: HttpRequest, token, *args, **kwargs) -> JsonResponse:
+        try:
+            offset = int(request.GET.get("offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return JsonResponse({"errors": {"offset": ["An integer offset is required."]}}, status=400)
+
+        session = get_object_or_404(UploadSession, token=token)
+        try:
+            write_chunk(session, offset, request, length)
+        except UploadError as exc:
+            return JsonResponse(
+                {"errors": {"chunk": [str(exc)]}, "offset": exc.offset},
+                status=exc.status_code,
+            )
+        return JsonResponse(_upload_session_payload(session))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadCompleteView(View):
+    """Finalize an upload session into a new document version."""
+
+    def post(self, request: HttpRequest, token, *args, **kwargs) -> JsonResponse:
+        payload = _data_from_request(request)
+        with transaction.atomic():
+            session = get_object_or_404(
+                UploadSession.objects.select_for_update().select_related("document__register"),
+                token=token,
+            )
+            created = session.completed_at is None
+            try:
+                version = finalize_upload(
+                    session,
+                    user=_current_user(request),
+                    sha256=str(payload.get("sha256", "")),
+                )
+            except UploadError as exc:
+                return JsonResponse(
+                    {"errors": {"upload": [str(exc)]}, "offset": exc.offset},
+                    status=exc.status_code,
+                )
+        return JsonResponse(
+            {
+                "id": version.id,
+                "version": version.version,
+                "filename": version.filename,
+                "sha256": session.sha256,
+                "message": "Document uploaded",
+            },
+            status=201 if created else 200,
+        )
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class DocumentView(View):
     """Create base document containers prior to uploading scans."""
 
+    @method_decorator(idempotent)
     def post(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
         payload = _data_from_request(request)
         form = DocumentForm(payload)
@@ -149,65 +411,354 @@ class DocumentView(View):
         return JsonResponse({"errors": form.errors}, status=400)
 
 
-def generate_register_pdf_view(request: HttpRequest, pk: int) -> HttpResponse:
-    register = get_object_or_404(Register, pk=pk)
-    pdf_bytes = render_register_pdf(register)
+def _document_version_etag(request: HttpRequest, pk: int) -> str | None:
+    # Identical content shares a digest, so it is a natural strong validator.
+    return DocumentVersion.objects.filter(pk=pk).values_list("sha256", flat=True).first() or None
+
+
+@require_safe
+@condition(etag_func=_document_version_etag)
+def download_document_version(request: HttpRequest, pk: int) -> HttpResponse:
+    version = get_object_or_404(DocumentVersion, pk=pk)
+    accel = getattr(settings, "DOCUMENT_DOWNLOAD_ACCEL", "")
+    if accel:
+        return accelerated_response(version, accel)
+
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range.strip('"') != version.sha256:
+        # The client's partial copy is stale, so send the whole file.
+        range_header = ""
+    return file_response(version, range_header)
+
+
+@require_safe
+@condition(etag_func=_document_version_etag)
+def document_version_preview(request: HttpRequest, pk: int) -> HttpResponse:
+    version = get_object_or_404(DocumentVersion, pk=pk)
+    if not version.has_preview():
+        job = PreviewJob.objects.filter(version=version).values_list("status", flat=True).first()
+        return JsonResponse(
+            {"errors": {"preview": ["Preview not available."]}, "status": job or "missing"},
+            status=404,
+        )
+    return FileResponse(version.file.storage.open(version.preview_name), content_type="image/png")
+
+
+@transaction.non_atomic_requests
+@read_from_replica
+async def generate_register_pdf_view(request: HttpRequest, pk: int) -> HttpResponse:
+    register = await aget_object_or_404(Register, pk=pk)
+    limiter = _pdf_limiter()
+    try:
+        slot = await limiter.aacquire()
+    except Rejected:
+        response = JsonResponse(
+            {"errors": {"pdf": ["Too many PDFs are being generated; retry shortly."]}},
+            status=503,
+        )
+        response["Retry-After"] = str(getattr(settings, "PDF_RENDER_RETRY_AFTER", 5))
+        return response
+    try:
+        summaries = await sync_to_async(collect_register_summaries)(register)
+        # Rendering is CPU bound, so keep it off the event loop and its thread pool.
+        loop = asyncio.get_running_loop()
+        pdf_bytes = await loop.run_in_executor(
+            _pdf_executor(), render_summaries_pdf, register, *summaries
+        )
+    finally:
+        limiter.release(slot)
     response = HttpResponse(pdf_bytes, content_type="application/pdf")
     filename = f"register-{register.pk}.pdf"
     response["Content-Disposition"] = f"attachment; filename={filename}"
     return response
 
 
-def search_registers(request: HttpRequest) -> JsonResponse:
+def _query_queryset(form: RegisterSearchForm) -> QuerySet[Register]:
+    qs = Register.objects.all()
+    query = form.cleaned_data.get("query")
+    if query:
+        qs = qs.filter(Q(name__icontains=query) | Q(description__icontains=query))
+    return qs
+
+
+def _search_queryset(form: RegisterSearchForm) -> QuerySet[Register]:
+    # Filter mappings are handled in cleaned_filters; query filtering occurs above.
+    return _query_queryset(form).filter(**form.cleaned_filters()).distinct()
+
+
+def _facet_count(**filters: Any) -> Count:
+    # Every condition names the same entry, so they share one join.
+    return Count("pk", distinct=True, filter=Q(**filters) if filters else None)
+
+
+def _search_facets(form: RegisterSearchForm) -> dict[str, Any]:
+    """Result counts per facet value, in one aggregate over the query matches.
+
+    Each facet is counted with the other facet's filter applied but not its
+    own, so the numbers say what choosing that value would return.
+    """
+
+    filters = form.cleaned_filters()
+    without_bundle = dict(filters)
+    bundle_type = without_bundle.pop("schedule_entries__bundle_type", None)
+    without_completed = dict(filters)
+    completed = without_completed.pop("schedule_entries__completed", None)
+
+    aggregates = {"total": _facet_count(**filters)}
+    for key, _ in ScheduleEntry.BUNDLE_CHOICES:
+        aggregates[f"bundle_type_{key}"] = _facet_count(
+            **without_bundle, schedule_entries__bundle_type=key
+        )
+    for value in (True, False):
+        aggregates[f"completed_{value}"] = _facet_count(
+            **without_completed, schedule_entries__completed=value
+        )
+    counts = _query_queryset(form).aggregate(**aggregates)
+
+    return {
+        "total": counts["total"],
+        "bundle_type": {
+            key: {"count": counts[f"bundle_type_{key}"], "selected": key == bundle_type}
+            for key, _ in ScheduleEntry.BUNDLE_CHOICES
+        },
+        "completed": {
+            str(value).lower(): {
+                "count": counts[f"completed_{value}"],
+                "selected": value is completed,
+            }
+            for value in (True, False)
+        },
+    }
+
+
+def _search_validator(request: HttpRequest) -> dict[str, Any] | None:
     form = RegisterSearchForm(request.GET or None)
-    results: list[dict[str, Any]] = []
-    if form.is_valid():
-        filters = form.cleaned_filters()
-        qs = Register.objects.prefetch_related("schedule_entries").filter(**filters)
-        query = form.cleaned_data.get("query")
-        if query:
-            qs = qs.filter(Q(name__icontains=query) | Q(description__icontains=query))
-        # Filter mappings are handled in cleaned_filters; query filtering occurs above.
-        qs = qs.distinct()
-        for register in qs[:50]:
-            results.append(
-                {
-                    "id": register.id,
-                    "name": register.name,
-                    "description": register.description,
-                    "bundle_counts": {
-                        key: register.schedule_entries.filter(bundle_type=key).count()
-                        for key, _ in ScheduleEntry.BUNDLE_CHOICES
-                    },
-                }
-            )
-    else:
+    if not form.is_valid():
+        return None
+    # Facet counts ignore the facet filters, so validate every query match.
+    matches = _query_queryset(form)
+    values = matches.aggregate(count=Count("id"), modified=Max("updated_at"))
+    # Results carry bundle counts, so their schedule entries count as well.
+    entries = ScheduleEntry.objects.filter(register__in=matches).aggregate(
+        entries=Count("id"), entries_modified=Max("updated_at")
+    )
+    return {**values, **entries}
+
+
+@transaction.non_atomic_requests
+async def search_registers(request: HttpRequest) -> HttpResponse:
+    return await sync_to_async(_search_registers)(request)
+
+
+@read_from_replica
+@conditional_list(_search_validator)
+@cached_response("search", scope=all_registers)
+def _search_registers(request: HttpRequest) -> HttpResponse:
+    form = RegisterSearchForm(request.GET or None)
+    if not form.is_valid():
         return JsonResponse({"errors": form.errors}, status=400)
-    return JsonResponse({"results": results})
+    try:
+        projection = REGISTER_SEARCH_RESULT.for_request(request)
+    except FieldSelectionError as exc:
+        return JsonResponse({"errors": {"fields": [str(exc)]}}, status=400)
+    # Counting over a fresh join keeps the search filters from narrowing the counts.
+    matches = Register.objects.filter(pk__in=_search_queryset(form).values("pk"))
+    results = projection.rows(matches[:50])
+    return json_response({"results": results, "facets": _search_facets(form)})
+
+
+@transaction.non_atomic_requests
+@read_from_replica
+async def typeahead_registers(request: HttpRequest) -> JsonResponse:
+    form = TypeaheadForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    matches = await sync_to_async(search_register_names)(
+        form.cleaned_data["q"],
+        form.cleaned_data["limit"],
+        using=router.db_for_read(Register),
+    )
+    return JsonResponse(
+        {"results": [{"id": pk, "name": name, "score": score} for pk, name, score in matches]}
+    )
+
+
+@transaction.non_atomic_requests
+@gzip_page
+@read_from_replica
+async def sync_changes(request: HttpRequest) -> HttpResponse:
+    """Changes and deletions since the client's cursor, one page at a time."""
+
+    form = SyncForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    try:
+        page = await changes_since(form.cleaned_data["cursor"], limit=form.cleaned_data["limit"])
+    except ExpiredCursor:
+        return JsonResponse(
+            {"errors": {"cursor": ["The cursor has expired; sync again without one."]}},
+            status=410,
+        )
+    return json_response(page)
 
 
-def health_view(request: HttpRequest) -> JsonResponse:
+@transaction.non_atomic_requests
+async def health_view(request: HttpRequest) -> JsonResponse:
     now = timezone.now()
     return JsonResponse({"status": "ok", "timestamp": now.isoformat()})
 
 
-def pending_reminders(request: HttpRequest) -> JsonResponse:
+def _pending_reminder_queryset() -> QuerySet[Reminder]:
     upcoming = timezone.now() + timedelta(days=7)
-    reminders = (
-        Register.objects.prefetch_related("reminders")
-        .filter(reminders__remind_at__lte=upcoming, reminders__is_sent=False)
-        .distinct()
+    return Reminder.objects.filter(remind_at__lte=upcoming, is_sent=False)
+
+
+def _pending_reminders_validator(request: HttpRequest) -> dict[str, Any]:
+    # Reminders entering the moving window change the count, so the
+    # validator follows the clock like the list itself.
+    values = _pending_reminder_queryset().aggregate(count=Count("id"), modified=Max("updated_at"))
+    values["registers_modified"] = _register_names_modified()
+    return values
+
+
+@transaction.non_atomic_requests
+async def pending_reminders(request: HttpRequest) -> HttpResponse:
+    return await sync_to_async(_pending_reminders)(request)
+
+
+# The seven-day window moves with the clock, so entries also expire quickly.
+@read_from_replica
+@conditional_list(_pending_reminders_validator)
+@cached_response("reminders", scope=all_registers, timeout=60)
+def _pending_reminders(request: HttpRequest) -> HttpResponse:
+    try:
+        projection = PENDING_REMINDER_LIST.for_request(request)
+    except FieldSelectionError as exc:
+        return JsonResponse({"errors": {"fields": [str(exc)]}}, status=400)
+    reminders = _pending_reminder_queryset().order_by("register__name", "register_id", "remind_at")
+    return json_response({"results": projection.rows(reminders)})
+
+
+@transaction.non_atomic_requests
+@read_from_replica
+async def completion_analytics(request: HttpRequest) -> JsonResponse:
+    """Completion counts and rates per register and bundle type, from the rollups."""
+
+    form = CompletionAnalyticsForm(request.GET or None)
+    # Validating the register choice queries the database.
+    if not await sync_to_async(form.is_valid)():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    data = form.cleaned_data
+    qs = CompletionRollup.objects.filter(day__range=(data["date_from"], data["date_to"]))
+    if data.get("register"):
+        qs = qs.filter(register=data["register"])
+    if data.get("bundle_type"):
+        qs = qs.filter(bundle_type=data["bundle_type"])
+    period = TruncWeek("day") if data["group"] == "week" else F("day")
+    rows = (
+        qs.annotate(period=period)
+        .values("period", "register_id", "register__name", "bundle_type")
+        .annotate(scheduled=Sum("scheduled"), completed=Sum("completed"), overdue=Sum("overdue"))
+        .order_by("period", "register__name", "register_id", "bundle_type")
     )
-    data = []
-    for register in reminders:
-        for reminder in register.reminders.filter(
-            remind_at__lte=upcoming, is_sent=False
-        ).order_by("remind_at"):
-            data.append(
-                {
-                    "register": register.name,
-                    "remind_at": reminder.remind_at.isoformat(),
-                    "message": reminder.message,
-                }
-            )
-    return JsonResponse({"results": data})
+    results = [
+        {
+            "period": row["period"].isoformat(),
+            "register": row["register_id"],
+            "register_name": row["register__name"],
+            "bundle_type": row["bundle_type"],
+            "scheduled": row["scheduled"],
+            "completed": row["completed"],
+            "overdue": row["overdue"],
+            "completion_rate": round(row["completed"] / row["scheduled"], 4)
+            if row["scheduled"]
+            else None,
+        }
+        async for row in rows
+    ]
+    refreshed_at = await sync_to_async(last_refreshed_at)()
+    return JsonResponse(
+        {
+            "group": data["group"],
+            "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+            "results": results,
+        }
+    )
+
+
+@transaction.non_atomic_requests
+@read_from_replica
+async def export_dataset(request: HttpRequest, dataset: str) -> HttpResponse:
+    """Stream every matching row of ``dataset`` as CSV or JSON Lines."""
+
+    spec = EXPORTS.get(dataset)
+    if spec is None:
+        return JsonResponse({"errors": {"dataset": [f"Unknown export {dataset!r}."]}}, status=404)
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    data = form.cleaned_data
+    fmt, compress = data["format"], data["gzip"]
+    rows = export_rows(
+        spec,
+        register=data.get("register"),
+        date_from=data.get("date_from"),
+        date_to=data.get("date_to"),
+        # Streaming outlives this view, so pin the database chosen now.
+        using=router.db_for_read(spec.model),
+    )
+    chunks = encode_export(spec, rows, fmt, compress=compress)
+    # WSGI collects an async body into memory before sending it, so only
+    # ASGI gets the threaded async wrapper; WSGI iterates the rows directly.
+    response = StreamingHttpResponse(
+        iterate_in_thread(chunks) if isinstance(request, ASGIRequest) else chunks,
+        content_type="application/gzip" if compress else FORMATS[fmt][0],
+    )
+    filename = export_filename(dataset, fmt, compress=compress)
+    response["Content-Disposition"] = f"attachment; filename={filename}"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def response_cache_stats(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({"results": cache_stats()})
+
+
+def pdf_render_stats(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({"results": _pdf_limiter().stats()})
+
+
+@transaction.non_atomic_requests
+async def reminder_stream(request: HttpRequest) -> StreamingHttpResponse:
+    """Push reminders to the client as they are created or fall due."""
+
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would buffer this endless stream and hold a worker forever.
+        return JsonResponse(
+            {"errors": {"stream": ["Event streams are only served by the ASGI server."]}},
+            status=501,
+        )
+    heartbeat = getattr(settings, "REMINDER_STREAM_HEARTBEAT", 15.0)
+
+    async def events():
+        queue = broadcaster.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment lines keep idle connections open through proxies.
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response